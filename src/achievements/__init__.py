@@ -0,0 +1,294 @@
+"""
+Event-driven achievement engine.
+Each sighting from the ingest path updates a user's running counters
+(distinct species, nocturnal finds, biome coverage, rare finds, streaks)
+in O(1); achievement progress is evaluated from those counters only and
+snapshotted to the datastore, so nothing is ever recomputed from history.
+"""
+
+import math
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+try:
+    from ..core import AnimalRarity
+    from ..species import SpeciesCatalog
+except ImportError:  # imported as the top-level ``achievements`` package by the Flet app
+    from core import AnimalRarity
+    from species import SpeciesCatalog
+
+# Local capture hours counted as night
+NIGHT_START_HOUR = 20
+NIGHT_END_HOUR = 5
+RARE_RARITIES = {AnimalRarity.RARE, AnimalRarity.EPIC, AnimalRarity.LEGENDARY, AnimalRarity.MYTHICAL}
+FLYING_GROUPS = {"bird", "insect"}
+NORTHERN_SEASONS = {12: "winter", 1: "winter", 2: "winter", 3: "spring", 4: "spring", 5: "spring",
+                    6: "summer", 7: "summer", 8: "summer", 9: "autumn", 10: "autumn", 11: "autumn"}
+OPPOSITE_SEASON = {"winter": "summer", "summer": "winter", "spring": "autumn", "autumn": "spring"}
+
+
+@dataclass(slots=True)
+class UserProgress:
+    """Running per-user counters; every update is O(1)."""
+    sightings: int = 0
+    species: Set[int] = field(default_factory=set)
+    night_sightings: int = 0
+    night_species: Set[int] = field(default_factory=set)
+    biome_species: Dict[str, Set[int]] = field(default_factory=dict)
+    rare_finds: int = 0
+    flying_finds: int = 0
+    audio_ids: int = 0
+    night_audio_ids: int = 0
+    uncatalogued: int = 0
+    seasons: Set[str] = field(default_factory=set)
+    last_day: Optional[date] = None
+    streak: int = 0
+    best_streak: int = 0
+    unlocked: Dict[str, str] = field(default_factory=dict)  # achievement key -> ISO time
+
+    def to_snapshot(self) -> dict:
+        return {
+            "sightings": self.sightings,
+            "species": sorted(self.species),
+            "nightSightings": self.night_sightings,
+            "nightSpecies": sorted(self.night_species),
+            "biomeSpecies": {biome: sorted(ids) for biome, ids in self.biome_species.items()},
+            "rareFinds": self.rare_finds,
+            "flyingFinds": self.flying_finds,
+            "audioIds": self.audio_ids,
+            "nightAudioIds": self.night_audio_ids,
+            "uncatalogued": self.uncatalogued,
+            "seasons": sorted(self.seasons),
+            "lastDay": self.last_day.isoformat() if self.last_day else None,
+            "streak": self.streak,
+            "bestStreak": self.best_streak,
+            "unlocked": dict(self.unlocked),
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict) -> "UserProgress":
+        last_day = snapshot.get("lastDay")
+        return cls(
+            sightings=snapshot.get("sightings", 0),
+            species=set(snapshot.get("species", ())),
+            night_sightings=snapshot.get("nightSightings", 0),
+            night_species=set(snapshot.get("nightSpecies", ())),
+            biome_species={biome: set(ids) for biome, ids in snapshot.get("biomeSpecies", {}).items()},
+            rare_finds=snapshot.get("rareFinds", 0),
+            flying_finds=snapshot.get("flyingFinds", 0),
+            audio_ids=snapshot.get("audioIds", 0),
+            night_audio_ids=snapshot.get("nightAudioIds", 0),
+            uncatalogued=snapshot.get("uncatalogued", 0),
+            seasons=set(snapshot.get("seasons", ())),
+            last_day=date.fromisoformat(last_day) if last_day else None,
+            streak=snapshot.get("streak", 0),
+            best_streak=snapshot.get("bestStreak", 0),
+            unlocked=dict(snapshot.get("unlocked", {})),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogStats:
+    size: int
+    biome_totals: Dict[str, int]
+
+
+@dataclass(frozen=True, slots=True)
+class AchievementRule:
+    key: str
+    title: str
+    description: str
+    # Fraction complete (may exceed 1; clamped when reported)
+    progress: Callable[[UserProgress, CatalogStats], float]
+
+
+def _biome_mastery(p: UserProgress, stats: CatalogStats) -> float:
+    best = 0.0
+    for biome, found in p.biome_species.items():
+        total = stats.biome_totals.get(biome)
+        if total:
+            best = max(best, len(found) / total)
+    return best / 0.75
+
+
+RULES: List[AchievementRule] = [
+    AchievementRule("first_catch", "First Catch", "Find your first animal.",
+                    lambda p, s: p.sightings),
+    AchievementRule("first_flight", "First Flight", "Find a flying animal.",
+                    lambda p, s: p.flying_finds),
+    AchievementRule("biodex_beginner", "Biodex Beginner", "Complete 10% of your Biodex.",
+                    lambda p, s: len(p.species) / max(1, math.ceil(0.1 * s.size))),
+    AchievementRule("biodex_master", "Biodex Master", "Complete 75% of your Biodex in a biome.",
+                    _biome_mastery),
+    AchievementRule("ears_of_the_wild", "Ears of the Wild", "Identify an animal using only its sound.",
+                    lambda p, s: p.audio_ids),
+    AchievementRule("night_explorer", "Night Explorer", "Find an animal at night.",
+                    lambda p, s: p.night_sightings),
+    AchievementRule("night_stalker", "Night Stalker", "Capture 10 different nocturnal animals.",
+                    lambda p, s: len(p.night_species) / 10),
+    AchievementRule("nocturnal_listener", "Nocturnal Listener", "Identify an animal at night using sound recognition.",
+                    lambda p, s: p.night_audio_ids),
+    AchievementRule("citizen_scientist", "Citizen Scientist", "Log a rare or endangered species.",
+                    lambda p, s: p.rare_finds),
+    AchievementRule("trailblazer", "Trailblazer", "Discover 10 different species.",
+                    lambda p, s: len(p.species) / 10),
+    AchievementRule("data_contributor", "Data Contributor", "Submit 50 valid sightings.",
+                    lambda p, s: p.sightings / 50),
+    AchievementRule("master_tracker", "Master Tracker", "Capture 100 different species",
+                    lambda p, s: len(p.species) / 100),
+    AchievementRule("on_a_roll", "On a Roll", "Capture an animal every day for a week.",
+                    lambda p, s: p.best_streak / 7),
+    AchievementRule("wildlife_warrior", "Wildlife Warrior", "Maintain a daily streak for a month.",
+                    lambda p, s: p.best_streak / 30),
+    AchievementRule("evolutionary_mystery", "Evolutionary Mystery", "Capture a visually distinct species never cataloged before.",
+                    lambda p, s: p.uncatalogued),
+    AchievementRule("seasonal_explorer", "Seasonal Explorer", "Capture an animal in each season.",
+                    lambda p, s: len(p.seasons) / 4),
+]
+
+
+def _parse_time(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return datetime.now()
+
+
+def _captured(sighting: dict) -> datetime:
+    return _parse_time(sighting.get("timestamp") or sighting.get("createdAt"))
+
+
+class AchievementEngine:
+    def __init__(self, store, catalog: SpeciesCatalog, rules: List[AchievementRule] = RULES):
+        """
+        :param store: DataStore used to persist progress snapshots
+        """
+        self.store = store
+        self.catalog = catalog
+        self.rules = rules
+        self.stats = CatalogStats(size=len(catalog), biome_totals=catalog.count_by_biome())
+        self._users: Dict[str, UserProgress] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._users)
+
+    def load(self):
+        """Restore every user's counters from their saved snapshots."""
+        users = {user_id: UserProgress.from_snapshot(snapshot) for user_id, snapshot in self.store.iter_progress()}
+        with self._lock:
+            self._users = users
+
+    def rebuild(self, sightings: Iterable[dict]):
+        """
+        Replay a full sighting history once (e.g. for data that predates the
+        engine). Stores return sightings by ID, so they are replayed in
+        capture order for the streaks to come out as if recorded live.
+        """
+        users: Dict[str, UserProgress] = {}
+        for sighting in sorted(sightings, key=lambda s: _captured(s).timestamp()):
+            self._apply(users, sighting, "camera")
+        snapshots = {}
+        for user_id, progress in users.items():
+            self._evaluate(progress)
+            snapshots[user_id] = progress.to_snapshot()
+        with self._lock:
+            self._users = users
+        for user_id, snapshot in snapshots.items():
+            self.store.save_progress(user_id, snapshot)
+
+    def _apply(self, users: Dict[str, UserProgress], sighting: dict, source: str) -> Optional[UserProgress]:
+        user_id = str(sighting.get("userID") or "")
+        if not user_id:
+            return None
+        p = users.get(user_id)
+        if p is None:
+            p = users[user_id] = UserProgress()
+
+        captured = _captured(sighting)
+        species_id = sighting.get("speciesID")
+        if species_id is None:
+            match = self.catalog.match(sighting.get("species"))
+            species_id = match.species.id if match else None
+        species = self.catalog.get(species_id) if species_id is not None else None
+        night = captured.hour >= NIGHT_START_HOUR or captured.hour < NIGHT_END_HOUR
+
+        p.sightings += 1
+        if night:
+            p.night_sightings += 1
+        if source == "audio":
+            p.audio_ids += 1
+            if night:
+                p.night_audio_ids += 1
+
+        if species is None:
+            p.uncatalogued += 1
+        else:
+            p.species.add(species.id)
+            p.biome_species.setdefault(species.biome, set()).add(species.id)
+            if night:
+                p.night_species.add(species.id)
+            if species.rarity in RARE_RARITIES:
+                p.rare_finds += 1
+            if species.group in FLYING_GROUPS:
+                p.flying_finds += 1
+
+        season = NORTHERN_SEASONS[captured.month]
+        latitude = (sighting.get("coordinates") or {}).get("lat")
+        if latitude is not None and latitude < 0:
+            season = OPPOSITE_SEASON[season]
+        p.seasons.add(season)
+
+        # Daily streak; late-arriving (older) captures do not rewrite history
+        day = captured.date()
+        if p.last_day is None or day > p.last_day + timedelta(days=1):
+            p.streak = 1
+        elif day == p.last_day + timedelta(days=1):
+            p.streak += 1
+        if p.last_day is None or day > p.last_day:
+            p.last_day = day
+        p.best_streak = max(p.best_streak, p.streak)
+        return p
+
+    def _evaluate(self, p: UserProgress) -> List[str]:
+        """Mark newly completed achievements; returns their keys."""
+        newly = []
+        now = datetime.now().isoformat()
+        for rule in self.rules:
+            if rule.key not in p.unlocked and rule.progress(p, self.stats) >= 1:
+                p.unlocked[rule.key] = now
+                newly.append(rule.key)
+        return newly
+
+    def record(self, sighting: dict, source: str = "camera") -> List[str]:
+        """Consume one sighting event; returns the keys of achievements it unlocked."""
+        with self._lock:
+            p = self._apply(self._users, sighting, source)
+            if p is None:
+                return []
+            newly = self._evaluate(p)
+            snapshot = p.to_snapshot()
+        self.store.save_progress(str(sighting["userID"]), snapshot)
+        return newly
+
+    def achievements(self, user_id: str) -> List[dict]:
+        """Progress for every achievement, straight from the counters."""
+        with self._lock:
+            p = self._users.get(str(user_id)) or UserProgress()
+            return [
+                {
+                    "key": rule.key,
+                    "title": rule.title,
+                    "description": rule.description,
+                    "progress": min(1.0, float(rule.progress(p, self.stats))),
+                    "unlocked": rule.key in p.unlocked,
+                    "unlockedAt": p.unlocked.get(rule.key),
+                }
+                for rule in self.rules
+            ]
@@ -0,0 +1,211 @@
+"""
+Columnar in-memory sighting store for analytics.
+Keeps lat, lng, timestamp, species and user as parallel NumPy arrays so
+heatmaps, species counts and per-user stats are vectorized scans instead
+of per-document reads. Species and user IDs are dictionary-encoded to
+dense integer codes, which makes group-bys a single np.bincount.
+"""
+
+import math
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_M = 6_371_008.8
+
+
+def _timestamp(value) -> float:
+    """Epoch seconds from a stored timestamp (datetime or ISO string); NaN if missing."""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            return math.nan
+    return math.nan
+
+
+class _Dictionary:
+    """Interns strings to dense integer codes."""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: str) -> int:
+        """Code for value, or -1 if it has never been seen."""
+        return self.codes.get(value, -1)
+
+
+@dataclass(frozen=True)
+class Columns:
+    """A consistent, read-only view of the store at one point in time."""
+    lat: np.ndarray
+    lng: np.ndarray
+    ts: np.ndarray
+    species: np.ndarray
+    user: np.ndarray
+
+    def __len__(self):
+        return len(self.lat)
+
+
+class SightingColumns:
+    def __init__(self, capacity: int = 1024):
+        self._lock = threading.Lock()
+        self.species_dict = _Dictionary()
+        self.user_dict = _Dictionary()
+        self._size = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        self._lat = np.full(capacity, np.nan)
+        self._lng = np.full(capacity, np.nan)
+        self._ts = np.full(capacity, np.nan)
+        self._species = np.zeros(capacity, dtype=np.int32)
+        self._user = np.zeros(capacity, dtype=np.int32)
+
+    def _grow(self, needed: int):
+        capacity = len(self._lat)
+        if needed <= capacity:
+            return
+        # New arrays rather than resizing in place: snapshots keep the old ones
+        new_capacity = max(needed, capacity * 2)
+        old = (self._lat, self._lng, self._ts, self._species, self._user)
+        self._allocate(new_capacity)
+        for new, prev in zip((self._lat, self._lng, self._ts, self._species, self._user), old):
+            new[:self._size] = prev[:self._size]
+
+    def __len__(self):
+        return self._size
+
+    # Ingest
+    def _row(self, sighting: dict) -> Tuple[float, float, float, int, int]:
+        coordinates = sighting.get('coordinates') or {}
+        lat = coordinates.get('lat')
+        lng = coordinates.get('lng')
+        return (
+            math.nan if lat is None else float(lat),
+            math.nan if lng is None else float(lng),
+            _timestamp(sighting.get('timestamp') or sighting.get('createdAt')),
+            self.species_dict.encode(str(sighting.get('species') or 'Unknown')),
+            self.user_dict.encode(str(sighting.get('userID') or '')),
+        )
+
+    def load(self, sightings: Iterable[dict]):
+        """Replace the contents with the given sightings."""
+        with self._lock:
+            self.species_dict = _Dictionary()
+            self.user_dict = _Dictionary()
+            rows = [self._row(s) for s in sightings]
+            self._size = 0
+            self._allocate(max(1024, len(rows)))
+            if rows:
+                lat, lng, ts, species, user = zip(*rows)
+                n = len(rows)
+                self._lat[:n] = lat
+                self._lng[:n] = lng
+                self._ts[:n] = ts
+                self._species[:n] = species
+                self._user[:n] = user
+                self._size = n
+
+    def append(self, sighting: dict):
+        """Add one sighting from the ingest path: amortized O(1)."""
+        with self._lock:
+            row = self._row(sighting)
+            self._grow(self._size + 1)
+            i = self._size
+            self._lat[i], self._lng[i], self._ts[i], self._species[i], self._user[i] = row
+            self._size += 1
+
+    def snapshot(self) -> Columns:
+        """Views over the filled rows; later appends do not change them."""
+        with self._lock:
+            n = self._size
+            return Columns(self._lat[:n], self._lng[:n], self._ts[:n], self._species[:n], self._user[:n])
+
+    # Filters
+    def mask(
+        self,
+        columns: Columns,
+        user_id: Optional[str] = None,
+        species: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+    ) -> np.ndarray:
+        """Boolean row mask; bbox is (west, south, east, north)."""
+        selected = np.ones(len(columns), dtype=bool)
+        if user_id is not None:
+            selected &= columns.user == self.user_dict.lookup(str(user_id))
+        if species is not None:
+            selected &= columns.species == self.species_dict.lookup(species)
+        if since is not None:
+            selected &= columns.ts >= since.timestamp()
+        if until is not None:
+            selected &= columns.ts < until.timestamp()
+        if bbox is not None:
+            west, south, east, north = bbox
+            in_lng = (columns.lng >= west) & (columns.lng <= east) if west <= east else (columns.lng >= west) | (columns.lng <= east)
+            selected &= in_lng & (columns.lat >= south) & (columns.lat <= north)
+        return selected
+
+    def within(self, columns: Columns, lat: float, lng: float, radius_m: float) -> np.ndarray:
+        """Boolean row mask of sightings within radius_m (haversine)."""
+        lat1, lng1 = math.radians(lat), math.radians(lng)
+        lat2, lng2 = np.radians(columns.lat), np.radians(columns.lng)
+        a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+        distance = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+        return distance <= radius_m  # NaN coordinates compare False
+
+    # Group-bys
+    def count_by_species(self, columns: Columns, mask: Optional[np.ndarray] = None) -> Dict[str, int]:
+        codes = columns.species if mask is None else columns.species[mask]
+        counts = np.bincount(codes, minlength=len(self.species_dict.values))
+        return {self.species_dict.values[code]: int(counts[code]) for code in np.flatnonzero(counts)}
+
+    def count_by_user(self, columns: Columns, mask: Optional[np.ndarray] = None) -> Dict[str, int]:
+        codes = columns.user if mask is None else columns.user[mask]
+        counts = np.bincount(codes, minlength=len(self.user_dict.values))
+        return {self.user_dict.values[code]: int(counts[code]) for code in np.flatnonzero(counts)}
+
+    def distinct_species_by_user(self, columns: Columns, mask: Optional[np.ndarray] = None) -> Dict[str, int]:
+        """Number of different species each user has found."""
+        users = columns.user if mask is None else columns.user[mask]
+        species = columns.species if mask is None else columns.species[mask]
+        if not len(users):
+            return {}
+        pairs = np.unique(users.astype(np.int64) * len(self.species_dict.values) + species)
+        counts = np.bincount(pairs // len(self.species_dict.values), minlength=len(self.user_dict.values))
+        return {self.user_dict.values[code]: int(counts[code]) for code in np.flatnonzero(counts)}
+
+    def heatmap(self, columns: Columns, cell_degrees: float = 1.0, mask: Optional[np.ndarray] = None) -> List[Tuple[float, float, int]]:
+        """(lat, lng, count) at the centre of each non-empty grid cell."""
+        lat = columns.lat if mask is None else columns.lat[mask]
+        lng = columns.lng if mask is None else columns.lng[mask]
+        valid = np.isfinite(lat) & np.isfinite(lng)
+        rows = np.floor((lat[valid] + 90.0) / cell_degrees).astype(np.int64)
+        cols = np.floor((lng[valid] + 180.0) / cell_degrees).astype(np.int64)
+        width = int(math.ceil(360.0 / cell_degrees)) + 1
+        cells, counts = np.unique(rows * width + cols, return_counts=True)
+        return [
+            ((cell // width + 0.5) * cell_degrees - 90.0, (cell % width + 0.5) * cell_degrees - 180.0, int(count))
+            for cell, count in zip(cells.tolist(), counts.tolist())
+        ]
+
+    def points(self, columns: Columns) -> Tuple[np.ndarray, np.ndarray]:
+        """(lats, lngs) of the sightings that have coordinates."""
+        valid = np.isfinite(columns.lat) & np.isfinite(columns.lng)
+        return columns.lat[valid], columns.lng[valid]
@@ -0,0 +1,97 @@
+"""
+Benchmark for the core domain model: per-object memory and
+encode/decode throughput, slotted dataclasses + core.serialization
+against the previous dict-backed dataclasses + json round trip.
+
+Run from src/:  python bench_core.py
+"""
+
+import dataclasses
+import json
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Optional
+from uuid import UUID, uuid4
+
+from core import Coordinates, Location, Sighting
+from core.serialization import decode, encode, loads, orjson, to_primitive
+
+N = 50_000
+
+
+@dataclasses.dataclass
+class DictLocation:
+    latitude: float
+    longitude: float
+    altitude: Optional[float] = None
+    accuracy: Optional[float] = None
+    timestamp: datetime = datetime.now()
+
+
+def legacy_encoder(obj):
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+
+def bytes_per_object(factory) -> float:
+    tracemalloc.start()
+    objects = [factory(i) for i in range(N)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size / N
+
+
+def rate(label: str, fn, items) -> float:
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    elapsed = time.perf_counter() - start
+    per_second = len(items) / elapsed
+    print(f"  {label:<40} {per_second:>12,.0f} /s")
+    return per_second
+
+
+def main():
+    print(f"Encoder: {'orjson ' + orjson.__version__ if orjson else 'json (stdlib)'}")
+
+    print("Memory per Location:")
+    now = datetime.now()
+    slotted = bytes_per_object(lambda i: Location(float(i), float(i), timestamp=now))
+    plain = bytes_per_object(lambda i: DictLocation(float(i), float(i), timestamp=now))
+    print(f"  slotted {slotted:.0f} B, dict-backed {plain:.0f} B ({plain / slotted:.1f}x)")
+
+    sightings = [
+        Sighting(
+            userID=uuid4(),
+            timestamp=now,
+            coordinates=Coordinates(lat=42.36, lng=-71.06),
+            species="Eastern Gray Squirrel",
+            description="A squirrel foraging near a park bench.",
+            sightingURL=f"https://example.com/{i}.jpg",
+        )
+        for i in range(N)
+    ]
+    documents = [dataclasses.asdict(s) for s in sightings]
+
+    print("Sighting -> stored document:")
+    legacy = rate("json.loads(json.dumps(asdict))", lambda s: json.loads(json.dumps(dataclasses.asdict(s), default=legacy_encoder)), sightings)
+    fast = rate("to_primitive", to_primitive, sightings)
+    print(f"  speedup {fast / legacy:.1f}x")
+
+    print("Sighting -> JSON bytes:")
+    legacy = rate("json.dumps(asdict)", lambda s: json.dumps(dataclasses.asdict(s), default=legacy_encoder).encode(), sightings)
+    fast = rate("encode", encode, sightings)
+    print(f"  speedup {fast / legacy:.1f}x")
+
+    print("JSON bytes -> Sighting:")
+    payloads = [encode(d) for d in documents]
+    rate("decode(Sighting, loads(payload))", lambda p: decode(Sighting, loads(p)), payloads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark for the vision backends: per-image latency (prepare, encode and
+one species query) and throughput with several requests in flight, for
+each backend that is configured here. The hosted backend needs
+MOONDREAM_API_KEY; the local one needs weights at ANIMAGO_MOONDREAM_MODEL.
+
+Run from src/:  python bench_vision.py [--images DIR] [-n 20] [--concurrency 4]
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from PIL import Image
+
+from config import MOONDREAM_MODEL, VISION_THREADS
+from vision import SPECIES_PROMPT, VisionBackendError, VisionSystem
+from vision.backends import create_backend
+
+
+def load_images(directory: Path, n: int) -> List[Image.Image]:
+    """n images from a directory (cycled), or synthetic 12 MP frames if none is given."""
+    if directory:
+        paths = sorted(p for p in directory.iterdir() if p.suffix.lower() in (".jpg", ".jpeg", ".png", ".webp"))
+        if not paths:
+            raise SystemExit(f"No images in {directory}")
+        return [Image.open(paths[i % len(paths)]) for i in range(n)]
+    rng = np.random.default_rng(0)
+    return [Image.fromarray(rng.integers(0, 255, (3000, 4000, 3), dtype=np.uint8)) for _ in range(n)]
+
+
+def bench(name: str, vision: VisionSystem, images: List[Image.Image], concurrency: int):
+    try:
+        start = time.perf_counter()
+        vision.backend.warm_up()
+        print(f"{name}: ready in {time.perf_counter() - start:.1f}s")
+
+        latencies = []
+        for image in images:
+            start = time.perf_counter()
+            vision.ask(image.copy(), [SPECIES_PROMPT])
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(lambda image: vision.ask(image.copy(), [SPECIES_PROMPT]), images))
+        elapsed = time.perf_counter() - start
+    except VisionBackendError as e:
+        print(f"{name}: skipped ({e})")
+        return
+    finally:
+        vision.backend.close()
+
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(
+        f"{name}: latency p50 {statistics.median(latencies) * 1000:7.0f} ms  p95 {p95 * 1000:7.0f} ms  "
+        f"| {concurrency} in flight: {len(images) / elapsed:5.2f} images/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare vision backend latency and throughput")
+    parser.add_argument("--images", type=Path, help="directory of sample photos")
+    parser.add_argument("-n", type=int, default=20, help="images per backend")
+    parser.add_argument("--concurrency", type=int, default=4, help="requests in flight for the throughput run")
+    args = parser.parse_args()
+
+    images = load_images(args.images, args.n)
+    for name in ("hosted", "local"):
+        try:
+            backend = create_backend(name, model_path=MOONDREAM_MODEL, threads=VISION_THREADS) if name == "local" else create_backend(name)
+        except VisionBackendError as e:
+            print(f"{name}: skipped ({e})")
+            continue
+        bench(name, VisionSystem(backend), images, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
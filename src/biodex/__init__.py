@@ -0,0 +1,149 @@
+"""
+Biodex completion for AnimaGo.
+Each user's discovered species are one bitset over the catalog's species
+IDs (bit n set = species n found). Ingest sets a bit; completion overall
+and per biome is a popcount of the bitset, masked by a precomputed
+per-biome bitset. The result is kept as one small document per user, so
+the Biodex view needs a single fetch and no client-side aggregation.
+"""
+
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+try:
+    from ..species import SpeciesCatalog
+except ImportError:  # imported as the top-level ``biodex`` package by the Flet app
+    from species import SpeciesCatalog
+
+
+class SpeciesBitset:
+    """Immutable set of species IDs packed into a Python int."""
+
+    __slots__ = ("bits",)
+
+    def __init__(self, bits: int = 0):
+        self.bits = bits
+
+    @classmethod
+    def from_ids(cls, species_ids: Iterable[int]) -> "SpeciesBitset":
+        bits = 0
+        for species_id in species_ids:
+            bits |= 1 << species_id
+        return cls(bits)
+
+    @classmethod
+    def from_hex(cls, text: Optional[str]) -> "SpeciesBitset":
+        return cls(int(text, 16) if text else 0)
+
+    def to_hex(self) -> str:
+        return format(self.bits, "x")
+
+    def __contains__(self, species_id: int) -> bool:
+        return species_id >= 0 and (self.bits >> species_id) & 1 == 1
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def with_id(self, species_id: int) -> "SpeciesBitset":
+        return SpeciesBitset(self.bits | (1 << species_id))
+
+    def count_in(self, mask: "SpeciesBitset") -> int:
+        return (self.bits & mask.bits).bit_count()
+
+
+def _percent(found: int, total: int) -> float:
+    return round(100.0 * found / total, 2) if total else 0.0
+
+
+class BiodexIndex:
+    def __init__(self, store, catalog: SpeciesCatalog):
+        """
+        :param store: DataStore used to persist each user's completion document
+        """
+        self.store = store
+        self.catalog = catalog
+        self.all_species = SpeciesBitset.from_ids(catalog.species)
+        biome_ids: Dict[str, list] = {}
+        for s in catalog.species.values():
+            biome_ids.setdefault(s.biome, []).append(s.id)
+        self.biome_masks = {biome: SpeciesBitset.from_ids(ids) for biome, ids in sorted(biome_ids.items())}
+        self._found: Dict[str, SpeciesBitset] = {}
+        self._documents: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._found)
+
+    def _document(self, found: SpeciesBitset) -> dict:
+        total = len(self.all_species)
+        count = found.count_in(self.all_species)
+        biomes = {}
+        for biome, mask in self.biome_masks.items():
+            biome_total = len(mask)
+            biome_found = found.count_in(mask)
+            biomes[biome] = {"found": biome_found, "total": biome_total, "percent": _percent(biome_found, biome_total)}
+        return {
+            "bits": found.to_hex(),
+            "found": count,
+            "total": total,
+            "percent": _percent(count, total),
+            "biomes": biomes,
+            "updatedAt": datetime.now().isoformat(),
+        }
+
+    def load(self):
+        """Restore every user's bitset; documents are recomputed against the current catalog."""
+        found = {user_id: SpeciesBitset.from_hex(doc.get("bits")) for user_id, doc in self.store.iter_biodex()}
+        documents = {user_id: self._document(bits) for user_id, bits in found.items()}
+        with self._lock:
+            self._found, self._documents = found, documents
+
+    def _species_id(self, sighting: dict) -> Optional[int]:
+        species_id = sighting.get("speciesID")
+        if species_id is None:
+            match = self.catalog.match(sighting.get("species"))
+            species_id = match.species.id if match else None
+        return species_id if self.catalog.get(species_id) is not None else None
+
+    def rebuild(self, sightings: Iterable[dict]):
+        """Rebuild every user's bitset from a full sighting history."""
+        found: Dict[str, SpeciesBitset] = {}
+        for sighting in sightings:
+            user_id = str(sighting.get("userID") or "")
+            species_id = self._species_id(sighting)
+            if user_id and species_id is not None:
+                found[user_id] = found.get(user_id, SpeciesBitset()).with_id(species_id)
+        documents = {user_id: self._document(bits) for user_id, bits in found.items()}
+        with self._lock:
+            self._found, self._documents = found, documents
+        for user_id, document in documents.items():
+            self.store.save_biodex(user_id, document)
+
+    def record(self, sighting: dict) -> bool:
+        """
+        Mark the sighting's species as found; True if it is new for the user.
+        The document is only written when the bitset changes, so repeat
+        species cost no store write. Blocking: the server runs it on its
+        ingest thread.
+        """
+        user_id = str(sighting.get("userID") or "")
+        species_id = self._species_id(sighting)
+        if not user_id or species_id is None:
+            return False
+        with self._lock:
+            found = self._found.get(user_id, SpeciesBitset())
+            if species_id in found:
+                return False
+            found = found.with_id(species_id)
+            document = self._document(found)
+            self._found[user_id] = found
+            self._documents[user_id] = document
+        self.store.save_biodex(user_id, document)
+        return True
+
+    def document(self, user_id: str) -> dict:
+        """The user's completion document (empty progress for unknown users)."""
+        with self._lock:
+            document = self._documents.get(str(user_id))
+        return document if document is not None else self._document(SpeciesBitset())
@@ -4,27 +4,20 @@ from flet import (
     Icons, Page, padding, alignment, CrossAxisAlignment, MainAxisAlignment
 )
 from dataclasses import dataclass
+from typing import Callable, Optional
+
+from components.router import OverlayRouter
 
 @dataclass
 class AchievementData:
+    key: str  # Matches the server's achievement keys
     title: str
     description: str
     icon: str
     progress: float  # 0.0 to 1.0
     color: str
 
-def create_achievement_detail_view(achievement: AchievementData, page: Page):
-    def close_detail_view(_):
-        # Clear the current view
-        page.clean()
-        
-        # Recreate the main content
-        content_area = page.session.get("content_area")
-        if content_area:
-            content_area.visible = True
-            page.add(content_area)
-            page.update()
-
+def create_achievement_detail_view(achievement: AchievementData, page: Page, on_close: Callable):
     # Calculate responsive sizes based on screen width
     medal_size = min(page.width * 0.8, 300)
     icon_size = medal_size * 0.4
@@ -39,7 +32,7 @@ def create_achievement_detail_view(achievement: AchievementData, page: Page):
                         IconButton(
                             icon=Icons.CLOSE,
                             icon_color=Colors.WHITE,
-                            on_click=close_detail_view,
+                            on_click=on_close,
                         ),
                     ],
                     alignment=MainAxisAlignment.END,
@@ -113,17 +106,7 @@ def create_achievement_detail_view(achievement: AchievementData, page: Page):
         border_radius=20,
     )
 
-def create_achievement_card(achievement: AchievementData, page: Page):
-    def show_achievement_details(_):
-        # Hide current content
-        content_area = page.session.get("content_area")
-        if content_area:
-            content_area.visible = False
-        
-        # Show achievement detail view
-        detail_view = create_achievement_detail_view(achievement, page)
-        page.add(detail_view)
-        page.update()
+def create_achievement_card(achievement: AchievementData, page: Page, on_open: Optional[Callable] = None):
 
     # Calculate card size based on screen width
     card_size = min(page.width * 0.4, 150)
@@ -143,7 +126,7 @@ def create_achievement_card(achievement: AchievementData, page: Page):
                     bgcolor="#2A2D3E",
                     border_radius=15,
                     alignment=alignment.center,
-                    on_click=show_achievement_details,
+                    on_click=(lambda _: on_open(achievement)) if on_open else None,
                 ),
                 Container(
                     content=Text(
@@ -191,61 +174,70 @@ def create_achievement_card(achievement: AchievementData, page: Page):
     )
 
 class AchievementsSection(ft.Column):
-    def __init__(self, page: Page, **kwargs):
+    def __init__(self, page: Page, router: Optional[OverlayRouter] = None, **kwargs):
         super().__init__(**kwargs)
         self.page = page
+        self.router = router
         self.horizontal_alignment = CrossAxisAlignment.CENTER
         self.achievements = [
             AchievementData(
+                key="first_catch",
                 title="First Catch",
                 description="Find your first animal.",
                 icon=Icons.CATCHING_POKEMON,
-                progress=1.0,
+                progress=0,
                 color=Colors.YELLOW_ACCENT_400,
             ),
             AchievementData(
+                key="first_flight",
                 title="First Flight",
                 description="Find a flying animal.",
                 icon=Icons.FLIGHT,
-                progress=1,
+                progress=0,
                 color="#00E676",  # Green
             ),
-                        AchievementData(
+            AchievementData(
+                key="biodex_beginner",
                 title="Biodex Beginner",
                 description="Complete 10% of your Biodex.",
                 icon=Icons.BOOK,
-                progress=0.60,
+                progress=0,
                 color=Colors.ORANGE_ACCENT_400,
             ),
             AchievementData(
+                key="biodex_master",
                 title="Biodex Master",
                 description="Complete 75% of your Biodex in a biome.",
                 icon=Icons.COMPUTER,
-                progress=0.2,
+                progress=0,
                 color="#FFFFFF",  # White
             ),
             AchievementData(
+                key="ears_of_the_wild",
                 title="Ears of the Wild",
                 description="Identify an animal using only its sound.",
                 icon=Icons.HEADSET,
-                progress=1,
+                progress=0,
                 color="#FFC107",  # Amber
             ),
             AchievementData(
+                key="night_explorer",
                 title="Night Explorer",
                 description="Find an animal at night.",
                 icon=Icons.NIGHTLIGHT,
-                progress=1,
+                progress=0,
                 color="#9C27B0",
             ),
             AchievementData(
+                key="night_stalker",
                 title="Night Stalker",
                 description="Capture 10 different nocturnal animals.",
                 icon=Icons.SHIELD_MOON,
-                progress=.3,
+                progress=0,
                 color="#35336b",
             ),
             AchievementData(
+                key="nocturnal_listener",
                 title="Nocturnal Listener",
                 description="Identify an animal at night using sound recognition.",
                 icon=Icons.SHIELD_MOON_SHARP,
@@ -253,6 +245,7 @@ class AchievementsSection(ft.Column):
                 color="#F6F1D5",
             ),
             AchievementData(
+                key="citizen_scientist",
                 title="Citizen Scientist",
                 description="Log a rare or endangered species.",
                 icon=Icons.BIOTECH,
@@ -260,41 +253,47 @@ class AchievementsSection(ft.Column):
                 color=Colors.GREEN_ACCENT_400,
             ),
             AchievementData(
+                key="trailblazer",
                 title="Trailblazer",
                 description="Discover 10 different species.",
                 icon=Icons.MAP,
-                progress=1,
+                progress=0,
                 color=Colors.BLUE_ACCENT_400,
             ),
             AchievementData(
+                key="data_contributor",
                 title="Data Contributor",
                 description="Submit 50 valid sightings.",
                 icon=Icons.ADDCHART,
-                progress=.84,
+                progress=0,
                 color=Colors.RED_ACCENT_400,
             ),
             AchievementData(
+                key="master_tracker",
                 title="Master Tracker",
                 description="Capture 100 different species",
                 icon=Icons.FIBER_PIN,
-                progress=.42,
+                progress=0,
                 color="#EFBF04", #Gold
             ),
             AchievementData(
+                key="on_a_roll",
                 title="On a Roll",
                 description="Capture an animal every day for a week.",
                 icon=Icons.HOURGLASS_BOTTOM_ROUNDED,
-                progress=2/7,
+                progress=0,
                 color=Colors.YELLOW_ACCENT_400,
             ),
             AchievementData(
+                key="wildlife_warrior",
                 title="Wildlife Warrior",
                 description="Maintain a daily streak for a month.",
                 icon=Icons.CALENDAR_MONTH,
-                progress=1/15,
+                progress=0,
                 color="#008000",
             ),
             AchievementData(
+                key="evolutionary_mystery",
                 title="Evolutionary Mystery",
                 description="Capture a visually distinct species never cataloged before.",
                 icon=Icons.ADD_CHART_ROUNDED,
@@ -302,15 +301,38 @@ class AchievementsSection(ft.Column):
                 color="#717e00",  # Oil Green
             ),
             AchievementData(
+                key="seasonal_explorer",
                 title="Seasonal Explorer",
                 description="Capture an animal in each season.",
                 icon=Icons.CLOUD,
-                progress=.5,
+                progress=0,
                 color="#87CEEB",  # Sky Blue
             ),
-            
         ]
+        if router:
+            router.add("/achievements/", self._build_detail)
+        self._build()
+
+    def _build_detail(self, key: str) -> ft.Control:
+        achievement = next((a for a in self.achievements if a.key == key), None)
+        if achievement is None:
+            return Text("Unknown achievement")
+        return create_achievement_detail_view(achievement, self.page, self.router.back)
+
+    def _open_detail(self, achievement: AchievementData):
+        self.router.go(f"/achievements/{achievement.key}")
+
+    def set_progress(self, achievements: list):
+        """Apply progress from the server (GET /users/{id}/achievements)."""
+        progress = {a["key"]: a["progress"] for a in achievements}
+        for achievement in self.achievements:
+            achievement.progress = progress.get(achievement.key, achievement.progress)
+        if self.router:
+            # Cached detail views show the old progress
+            self.router.invalidate("/achievements/")
         self._build()
+        if self.page:
+            self.update()
 
     def _build(self):
         # Create rows of achievement pairs
@@ -319,7 +341,7 @@ class AchievementsSection(ft.Column):
             row_achievements = self.achievements[i:i+2]
             row = Row(
                 controls=[
-                    create_achievement_card(achievement, self.page)
+                    create_achievement_card(achievement, self.page, self._open_detail if self.router else None)
                     for achievement in row_achievements
                 ],
                 alignment=MainAxisAlignment.CENTER,
@@ -1,6 +1,13 @@
 import flet as ft
 from typing import List, Optional
 
+from biodex import SpeciesBitset
+from components.paged_grid import PagedGridView
+from species import SpeciesCatalog, default_catalog
+
+# Species cards materialized per scroll page
+SPECIES_PAGE_SIZE = 30
+
 class BiodexSpeciesCard(ft.Container):
     def __init__(self, number: int, name: Optional[str] = None):
         super().__init__()
@@ -54,38 +61,65 @@ class BiodexSpeciesCard(ft.Container):
         )
 
 class BiodexSection(ft.Column):
-    def __init__(self, page: ft.Page, **kwargs):
+    def __init__(
+        self,
+        page: ft.Page,
+        biodex: Optional[dict] = None,
+        catalog: Optional[SpeciesCatalog] = None,
+        **kwargs,
+    ):
         super().__init__(**kwargs)
         self.page = page
         self.horizontal_alignment = ft.CrossAxisAlignment.START
         self.spacing = 0
         self.expand = True
+        self.catalog = catalog or default_catalog()
+        self.species_ids = sorted(self.catalog.species)
+        self.total_species = len(self.species_ids)
         
-        # Sample discovered species (hardcoded for now)
-        self.discovered_species = {
-            1: "Red Fox",
-            3: "Great Horned Owl",
-            4: "Eastern Gray Squirrel"
-        }
+        # Completion document from GET /users/{id}/biodex; counts come precomputed
+        self.biodex = biodex or {}
+        self.discovered = SpeciesBitset.from_hex(self.biodex.get("bits"))
         
         self._build()
+    
+    def set_biodex(self, biodex: dict):
+        """Show a freshly fetched completion document."""
+        self.biodex = biodex
+        self.discovered = SpeciesBitset.from_hex(biodex.get("bits"))
+        self._build()
+        if self.page:
+            self.update()
+        
+    async def _fetch_species_page(self, cursor: Optional[int]):
+        """Return the next page of species IDs; the cursor is the next offset."""
+        start = cursor or 0
+        end = min(start + SPECIES_PAGE_SIZE, self.total_species)
+        return self.species_ids[start:end], (end if end < self.total_species else None)
+    
+    def _build_species_card(self, number: int) -> BiodexSpeciesCard:
+        return BiodexSpeciesCard(
+            number=number,
+            name=self.catalog.get(number).name if number in self.discovered else None
+        )
         
     def _build(self):
-        # Create exactly 18 species cards
-        species_cards = []
-        for i in range(18):
-            number = i + 1
-            name = self.discovered_species.get(number)
-            species_cards.append(
-                BiodexSpeciesCard(
-                    number=number,
-                    name=name
-                )
-            )
+        # Cards are built a page at a time as the grid scrolls
+        species_grid = PagedGridView(
+            fetch_page=self._fetch_species_page,
+            build_item=self._build_species_card,
+            max_extent=180,
+            child_aspect_ratio=160 / 140,
+            spacing=10,
+            run_spacing=10,
+            expand=True,
+        )
+        # The grid pages asynchronously; the first page loads on the event loop
+        self.page.run_task(species_grid.load_more)
         
-        # Count discovered species
-        total = 18
-        discovered = len(self.discovered_species)
+        total = self.biodex.get("total", self.total_species)
+        discovered = self.biodex.get("found", 0)
+        biomes = self.biodex.get("biomes", {})
         
         self.controls = [
             ft.Container(
@@ -117,31 +151,28 @@ class BiodexSection(ft.Column):
                             ],
                             spacing=20,
                         ),
+                        margin=ft.margin.only(left=20, bottom=10),
+                    ),
+                    ft.Container(
+                        content=ft.Row(
+                            [
+                                ft.Text(
+                                    f"{biome.upper()}: {stats['percent']:.0f}%",
+                                    color=ft.colors.WHITE54,
+                                    size=12,
+                                )
+                                for biome, stats in biomes.items()
+                            ],
+                            spacing=12,
+                            wrap=True,
+                        ),
                         margin=ft.margin.only(left=20, bottom=20),
                     ),
                 ]),
                 bgcolor=ft.colors.BLACK87,
             ),
             ft.Container(
-                content=ft.Column(
-                    [
-                        ft.Container(
-                            content=ft.ResponsiveRow(
-                                controls=[
-                                    ft.Container(
-                                        content=card,
-                                        col=4,
-                                        padding=5,
-                                    )
-                                    for card in species_cards
-                                ],
-                                alignment=ft.MainAxisAlignment.START,
-                            ),
-                            expand=True,
-                        ),
-                    ],
-                    scroll=ft.ScrollMode.AUTO,
-                ),
+                content=species_grid,
                 expand=True,
                 bgcolor=ft.colors.BLACK,
                 padding=5,
@@ -1,18 +1,70 @@
+from typing import Dict, Optional
+
 import flet as ft
 
-from firebase.firebase_config import get_top_users
+from components.paged_list import PagedListView
+from components.profile import ProfileView
+from components.router import OverlayRouter
+from services.api import APIClient
+from services.live import LiveUpdates
+
+# Rows fetched per scroll page
+LEADERBOARD_PAGE_SIZE = 20
+# Places shown above and below the signed-in user
+AROUND_ME_RADIUS = 2
+
+PERIOD_LABELS = {
+    "daily": "Today",
+    "weekly": "This week",
+    "all_time": "All time",
+}
 
 
 class LeaderboardSection(ft.Column):
-    def __init__(self, page: ft.Page, **kwargs):
+    def __init__(
+        self,
+        page: ft.Page,
+        api: APIClient,
+        router: OverlayRouter,
+        live: Optional[LiveUpdates] = None,
+        user_id: Optional[str] = None,
+        **kwargs,
+    ):
         super().__init__(**kwargs)
         self.page = page
-        self.users = []
+        self.api = api
+        self.router = router
+        self.live = live
+        self.user_id = user_id
+        # Profile summaries by user ID, fetched once per session
+        self._profiles: Dict[str, dict] = {}
+        self._profile_views: Dict[str, ProfileView] = {}
+        router.add("/profile/", self._build_profile)
+        if live:
+            live.on("rank", self.apply_rank)
+            live.on("xp", self.apply_xp)
+        self.period = "all_time"
+        self._mounted = False
         self.horizontal_alignment = ft.CrossAxisAlignment.CENTER
         self.spacing = 10
         self.expand = True
         self._build()
 
+    def did_mount(self):
+        self._mounted = True
+        self.page.run_task(self.refresh_async)
+        if self.live:
+            self.page.run_task(self.live.watch_leaderboard, self.period)
+
+    def will_unmount(self):
+        self._mounted = False
+
+    def set_user(self, user_id: Optional[str]):
+        """Show the "around me" window for the signed-in user."""
+        self.user_id = user_id
+        if self._mounted:
+            self.page.run_task(self.refresh_async)
+
     def create_user_row(self, rank: int, user: dict) -> ft.Container:
         """Create a leaderboard item for a user"""
         medal_icons = {
@@ -69,239 +121,169 @@ class LeaderboardSection(ft.Column):
             data=user  # Store user data for reference
         )
 
+    def _build_profile(self, user_id: str) -> ProfileView:
+        """Routed /profile/{user_id} content; the summary is fetched once per user."""
+        view = ProfileView(on_close=self.router.back)
+        self._profile_views[user_id] = view
+        if self.live:
+            self.page.run_task(self.live.follow, user_id)  # Live XP for this profile
+        summary = self._profiles.get(user_id)
+        if summary is not None:
+            view.set_summary(summary)
+        else:
+            self.page.run_task(self._load_profile, user_id, view)
+        return view
+
+    async def _load_profile(self, user_id: str, view: ProfileView):
+        try:
+            summary = await self.api.get_profile(user_id)
+        except Exception as e:
+            print(f"Error loading profile: {e}")
+            view.set_error("Could not load profile")
+        else:
+            self._profiles[user_id] = summary
+            view.set_summary(summary)
+        if view.page:
+            view.update()
+
     def show_user_profile(self, user: dict):
         """Show detailed profile view for a user"""
-        def close_profile(_):
-            # Clear the current view
-            self.page.clean()
-            
-            # Recreate the main content
-            content_area = self.page.session.get("content_area")
-            if content_area:
-                content_area.visible = True
-                self.page.add(content_area)
-                self.page.update()
+        self.router.go(f"/profile/{user['userID']}")
 
-        # Hide the main content
-        content_area = self.page.session.get("content_area")
-        if content_area:
-            content_area.visible = False
+    async def _fetch_page(self, cursor: Optional[str]):
+        return await self.api.get_leaderboard(self.period, LEADERBOARD_PAGE_SIZE, cursor)
 
-        # Create profile view
-        profile_view = ft.Container(
-            content=ft.Column(
-                controls=[
-                    # Close button
-                    ft.Row(
-                        controls=[
-                            ft.IconButton(
-                                icon=ft.icons.CLOSE,
-                                icon_color=ft.Colors.WHITE,
-                                on_click=close_profile,
-                            ),
-                        ],
-                        alignment=ft.MainAxisAlignment.END,
-                    ),
-                    # Profile header
-                    ft.Container(
-                        content=ft.Column(
-                            controls=[
-                                ft.Text(
-                                    f"{user.get('firstname', 'Unknown')} {user.get('lastname', '')}",
-                                    size=32,
-                                    weight=ft.FontWeight.BOLD,
-                                    text_align=ft.TextAlign.CENTER
-                                ),
-                                ft.Text(
-                                    f"XP: {user.get('xp', 0):,}",
-                                    size=24,
-                                    color=ft.Colors.GREEN,
-                                    text_align=ft.TextAlign.CENTER
-                                ),
-                            ],
-                            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                            spacing=10
-                        ),
-                        margin=ft.margin.only(bottom=20)
-                    ),
-                    # Stats section
-                    ft.Container(
-                        content=ft.Column(
-                            controls=[
-                                ft.Text("Statistics", size=24, weight=ft.FontWeight.BOLD),
-                                ft.Row(
-                                    controls=[
-                                        ft.Container(
-                                            content=ft.Column(
-                                                controls=[
-                                                    ft.Text(
-                                                        str(len(user.get('sightings', []))),
-                                                        size=24,
-                                                        weight=ft.FontWeight.BOLD
-                                                    ),
-                                                    ft.Text("Sightings")
-                                                ],
-                                                horizontal_alignment=ft.CrossAxisAlignment.CENTER
-                                            ),
-                                            expand=True
-                                        ),
-                                        ft.Container(
-                                            content=ft.Column(
-                                                controls=[
-                                                    ft.Text(
-                                                        str(len(user.get('achievements', []))),
-                                                        size=24,
-                                                        weight=ft.FontWeight.BOLD
-                                                    ),
-                                                    ft.Text("Achievements")
-                                                ],
-                                                horizontal_alignment=ft.CrossAxisAlignment.CENTER
-                                            ),
-                                            expand=True
-                                        ),
-                                    ],
-                                    alignment=ft.MainAxisAlignment.SPACE_EVENLY
-                                )
-                            ],
-                            spacing=20
-                        ),
-                        padding=20,
-                        bgcolor=ft.Colors.BLUE_GREY_800,
-                        border_radius=10
-                    ),
-                    # Achievements section
-                    ft.Container(
-                        content=ft.Column(
-                            controls=[
-                                ft.Text("Recent Achievements", size=24, weight=ft.FontWeight.BOLD),
-                                *[
-                                    ft.Container(
-                                        content=ft.Text(achievement.get('achievementName', 'Unknown Achievement')),
-                                        padding=10,
-                                        bgcolor=ft.Colors.BLUE_GREY_800,
-                                        border_radius=10
-                                    )
-                                    for achievement in user.get('achievements', [])[:3]  # Show last 3 achievements
-                                ]
-                            ],
-                            spacing=10
-                        ),
-                        margin=ft.margin.only(top=20)
-                    ) if user.get('achievements') else ft.Container()  # Only show if user has achievements
-                ],
-                scroll=ft.ScrollMode.AUTO
-            ),
-            padding=20,
-            expand=True
-        )
+    def _build_row(self, entry: dict) -> ft.Container:
+        return self.create_user_row(entry["rank"], entry)
 
-        # Clear the page and add the profile view
-        self.page.clean()
-        self.page.add(profile_view)
-        self.page.update()
-
-    def create_leaderboard_list(self) -> ft.Column:
+    async def _load_around_me(self):
+        """Fill the "around me" window; hidden when signed out or unranked."""
+        self.around_me.visible = False
+        if not self.user_id:
+            return
         try:
-            # Get top 10 users from Firebase
-            self.users = get_top_users(10)
-            
-            # Create list items
-            list_items = []
-            for i, user in enumerate(self.users, 1):
-                if user:  # Only add if user data exists
-                    list_items.append(self.create_user_row(i, user))
-            
-            # If no users found
-            if not list_items:
-                list_items = [
-                    ft.Container(
-                        content=ft.Text(
-                            "No users found",
-                            italic=True,
-                            color=ft.Colors.GREY_400,
-                            text_align=ft.TextAlign.CENTER
-                        ),
-                        alignment=ft.alignment.center
-                    )
-                ]
-            
-            return ft.Column(
-                controls=list_items,
-                scroll=ft.ScrollMode.AUTO,
-                expand=True
-            )
-            
+            around = await self.api.get_leaderboard_around(self.user_id, self.period, AROUND_ME_RADIUS)
         except Exception as e:
-            print(f"Error loading leaderboard: {e}")
-            return ft.Column(
-                controls=[
-                    ft.Text(
-                        "Error loading leaderboard",
-                        color=ft.Colors.RED,
-                        text_align=ft.TextAlign.CENTER
-                    ),
-                    ft.TextButton(
-                        "Retry",
-                        on_click=lambda _: self.refresh()
-                    )
-                ],
-                horizontal_alignment=ft.CrossAxisAlignment.CENTER
-            )
+            print(f"Error loading leaderboard rank: {e}")
+            return
+        if around["rank"] is None:
+            return
+        self.around_me.content = ft.Column(
+            controls=[
+                ft.Text(f"Your rank: #{around['rank']:,}", size=16, weight=ft.FontWeight.BOLD),
+                *[self.create_user_row(entry["rank"], entry) for entry in around["entries"]],
+            ],
+            spacing=0,
+        )
+        self.around_me.visible = True
+
+    async def refresh_async(self):
+        """Reload the selected board from the first page."""
+        await self._load_around_me()
+        await self.leaderboard_list.reset()
+        if self._mounted:
+            self.update()
 
     def refresh(self, e=None):
         """Refresh the leaderboard data"""
-        try:
-            self._build()
-            self.page.update()
-        except Exception as e:
-            print(f"Error refreshing leaderboard: {e}")
-            self.controls = [
-                ft.Text(
-                    "Error refreshing leaderboard",
-                    color=ft.Colors.RED,
-                    text_align=ft.TextAlign.CENTER
-                ),
-                ft.TextButton(
-                    "Retry",
-                    on_click=self.refresh
-                )
-            ]
-            self.page.update()
+        self.page.run_task(self.refresh_async)
+
+    def _select_period(self, e):
+        self.period = next(iter(e.control.selected))
+        if self.live:
+            self.page.run_task(self.live.watch_leaderboard, self.period)
+        self.refresh()
+
+    def _row_index(self, user_id: str) -> Optional[int]:
+        for i, row in enumerate(self.leaderboard_list.controls):
+            if isinstance(row.data, dict) and row.data.get("userID") == user_id:
+                return i
+        return None
+
+    def apply_rank(self, event: dict):
+        """Live rank change: move that user's row and renumber only the rows it passed."""
+        if event.get("period") != self.period or not self._mounted:
+            return
+        rows = self.leaderboard_list.controls
+        old_index = self._row_index(event["userID"])
+        new_index = event["rank"] - 1
+        if old_index is not None:
+            rows.pop(old_index)
+        loaded = sum(1 for row in rows if isinstance(row.data, dict))
+        if new_index <= loaded:
+            rows.insert(new_index, self.create_user_row(event["rank"], event))
+        else:
+            new_index = None  # Below the loaded pages; it arrives with a later page
+        if old_index is None and new_index is None:
+            return
+        # Rows between the old and new positions each moved by one place
+        first = min(i for i in (old_index, new_index) if i is not None)
+        last = max(old_index, new_index) if old_index is not None and new_index is not None else len(rows) - 1
+        for i in range(first, last + 1):
+            if i != new_index and isinstance(rows[i].data, dict):
+                rows[i] = self.create_user_row(i + 1, rows[i].data)
+        self.leaderboard_list.update()
+        if event["userID"] == self.user_id:
+            self.page.run_task(self._refresh_around_me)
+
+    def apply_xp(self, event: dict):
+        """Live XP change for a followed user: patch their cached profile view."""
+        summary = self._profiles.get(event["userID"])
+        if summary is not None:
+            summary["xp"] = event["xp"]
+        view = self._profile_views.get(event["userID"])
+        if view is not None:
+            view.xp_text.value = f"XP: {event['xp']:,}"
+            if view.page:
+                view.xp_text.update()
+
+    async def _refresh_around_me(self):
+        await self._load_around_me()
+        self.around_me.update()
 
     def _build(self):
         """Build the leaderboard layout"""
-        try:
-            # Title
-            header = ft.Container(
-                content=ft.Text(
-                    "Leaderboard",
-                    size=24,
-                    weight=ft.FontWeight.BOLD,
-                    text_align=ft.TextAlign.CENTER
-                ),
-                margin=ft.margin.only(bottom=20),
-                alignment=ft.alignment.center
-            )
-            
-            # Leaderboard list
-            leaderboard_list = self.create_leaderboard_list()
-            
-            # Update controls
-            self.controls = [
-                header,
-                leaderboard_list
-            ]
-            
-        except Exception as e:
-            print(f"Error building leaderboard: {e}")
-            self.controls = [
-                ft.Text(
-                    "Error loading leaderboard",
-                    color=ft.Colors.RED,
-                    text_align=ft.TextAlign.CENTER
-                ),
-                ft.TextButton(
-                    "Retry",
-                    on_click=self.refresh
-                )
-            ]
\ No newline at end of file
+        # Title
+        header = ft.Container(
+            content=ft.Text(
+                "Leaderboard",
+                size=24,
+                weight=ft.FontWeight.BOLD,
+                text_align=ft.TextAlign.CENTER
+            ),
+            margin=ft.margin.only(bottom=10),
+            alignment=ft.alignment.center
+        )
+
+        period_selector = ft.SegmentedButton(
+            segments=[
+                ft.Segment(value=period, label=ft.Text(label))
+                for period, label in PERIOD_LABELS.items()
+            ],
+            selected={self.period},
+            on_change=self._select_period,
+        )
+
+        # Where the signed-in user stands, even outside the loaded pages
+        self.around_me = ft.Container(
+            visible=False,
+            padding=10,
+            border_radius=10,
+            border=ft.border.all(1, ft.Colors.GREEN),
+        )
+
+        # Rows are fetched a page at a time as the list scrolls
+        self.leaderboard_list = PagedListView(
+            fetch_page=self._fetch_page,
+            build_item=self._build_row,
+            empty_message="No users found",
+            expand=True,
+        )
+
+        # Update controls
+        self.controls = [
+            header,
+            period_selector,
+            self.around_me,
+            self.leaderboard_list,
+        ]
@@ -0,0 +1,127 @@
+from typing import Any, Callable, List, Optional, Set
+
+import flet as ft
+
+from components.paging import CursorPaging
+
+
+class PagedGridView(CursorPaging, ft.GridView):
+    """
+    GridView that awaits and builds its cards one page at a time as the user
+    scrolls. Only the pages around the viewport keep real cards; the others
+    are recycled into empty cells of the same size (the grid lays every cell
+    out at the same extent, so the scroll position does not move) and are
+    rebuilt from their items when scrolled back into view.
+    """
+
+    def __init__(
+        self,
+        *args,
+        on_items_added: Optional[Callable[[List[ft.Control]], None]] = None,
+        live_pages: int = 1,
+        **kwargs,
+    ):
+        """
+        :param live_pages: Pages kept built on each side of the one in view
+        """
+        super().__init__(*args, **kwargs)
+        self.on_items_added = on_items_added
+        self.live_pages = live_pages
+        self._pages: List[List[Any]] = []  # Items of every loaded page, in grid order
+        self._built: Set[int] = set()  # Pages whose cells hold real cards
+
+    def _clear(self):
+        super()._clear()
+        self._pages = []
+        self._built = set()
+
+    def _add_page(self, items: List[Any]) -> List[ft.Control]:
+        new_controls = super()._add_page(items)
+        if items:
+            self._pages.append(list(items))
+            self._built.add(len(self._pages) - 1)
+            # The new page is the one in view: recycle the ones far above it
+            self._recycle(len(self._pages) - 1)
+        return new_controls
+
+    def _items_added(self, new_controls: List[ft.Control]):
+        if self.on_items_added:
+            self.on_items_added(new_controls)
+
+    def _build_empty_placeholder(self) -> ft.Control:
+        return ft.Container(
+            content=ft.Text(
+                self.empty_message,
+                size=16,
+                color=ft.Colors.GREY_400,
+                text_align=ft.TextAlign.CENTER,
+            ),
+            padding=20,
+        )
+
+    def prepend(self, item: Any):
+        """Insert one new item at the top (e.g. from a live event) without reloading."""
+        if self._empty_placeholder is not None:
+            self.controls.remove(self._empty_placeholder)
+            self._empty_placeholder = None
+        if not self._pages:
+            self._pages.append([])
+            self._built.add(0)
+        self._pages[0].insert(0, item)
+        if 0 not in self._built:
+            # The top page is recycled: the item is built with it when scrolled back into view
+            self.controls.insert(0, ft.Container())
+            if self.page:
+                self.update()
+            return
+        control = self.build_item(item)
+        self.controls.insert(0, control)
+        if self.page:
+            self.update()
+        self._items_added([control])
+
+    def _page_offset(self, index: int) -> int:
+        return sum(len(items) for items in self._pages[:index])
+
+    def _recycle(self, current: int) -> List[ft.Control]:
+        """Build the pages within live_pages of current, empty the rest; returns the cards built."""
+        keep = set(range(max(0, current - self.live_pages), min(len(self._pages), current + self.live_pages + 1)))
+        built = []
+        for index in sorted(self._built - keep):
+            offset = self._page_offset(index)
+            for position in range(offset, offset + len(self._pages[index])):
+                self.controls[position] = ft.Container()
+            self._built.discard(index)
+        for index in sorted(keep - self._built):
+            offset = self._page_offset(index)
+            for position, item in enumerate(self._pages[index], start=offset):
+                control = self.build_item(item)
+                self.controls[position] = control
+                built.append(control)
+            self._built.add(index)
+        return built
+
+    def _page_in_view(self, e: ft.OnScrollEvent) -> int:
+        # Every cell has the same extent, so the scroll fraction maps linearly onto the items
+        total = sum(len(items) for items in self._pages)
+        content = e.max_scroll_extent + e.viewport_dimension
+        if not total or content <= 0:
+            return 0
+        position = min(total - 1, int((e.pixels + e.viewport_dimension / 2) / content * total))
+        index = 0
+        while position >= len(self._pages[index]):
+            position -= len(self._pages[index])
+            index += 1
+        return index
+
+    async def _handle_scroll(self, e: ft.OnScrollEvent) -> bool:
+        if await super()._handle_scroll(e):
+            return True
+        if self._lock.locked() or not self._pages:
+            return False
+        built = self._recycle(self._page_in_view(e))
+        if built:
+            if self.page:
+                self.update()
+            self._items_added(built)
+        return False
@@ -0,0 +1,19 @@
+import flet as ft
+
+from components.paging import CursorPaging
+
+
+class PagedListView(CursorPaging, ft.ListView):
+    """ListView that awaits and builds its rows one page at a time as the user scrolls."""
+
+    def _build_empty_placeholder(self) -> ft.Control:
+        return ft.Container(
+            content=ft.Text(
+                self.empty_message,
+                italic=True,
+                color=ft.Colors.GREY_400,
+                text_align=ft.TextAlign.CENTER,
+            ),
+            alignment=ft.alignment.center,
+            padding=20,
+        )
@@ -0,0 +1,100 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+import flet as ft
+
+# fetch_page(cursor) -> (items, next_cursor); next_cursor is None on the last page
+AsyncPageFetcher = Callable[[Optional[Any]], Awaitable[Tuple[List[Any], Optional[Any]]]]
+
+
+class CursorPaging:
+    """
+    Cursor paging shared by PagedListView and PagedGridView: awaits one
+    page at a time as the user nears the end, builds its items and appends
+    them. Mix in before the Flet control class; subclasses hook into
+    _clear, _add_page and _items_added for their own per-page state.
+    """
+
+    def __init__(
+        self,
+        fetch_page: AsyncPageFetcher,
+        build_item: Callable[[Any], ft.Control],
+        empty_message: str = "",
+        prefetch_extent: float = 400,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.fetch_page = fetch_page
+        self.build_item = build_item
+        self.empty_message = empty_message
+        self.prefetch_extent = prefetch_extent
+        self.on_scroll_interval = 100
+        self.on_scroll = self._handle_scroll
+        self._cursor = None
+        self._exhausted = False
+        self._empty_placeholder: Optional[ft.Control] = None
+        self._lock = asyncio.Lock()
+
+    async def reset(self):
+        """Drop everything loaded and load the first page again."""
+        async with self._lock:
+            self._clear()
+        await self.load_more()
+
+    async def load_more(self) -> bool:
+        """Append the next page; returns False if nothing was loaded."""
+        # Scroll events arrive in bursts; only one fetch at a time
+        if self._lock.locked():
+            return False
+        async with self._lock:
+            if self._exhausted:
+                return False
+            try:
+                items, next_cursor = await self.fetch_page(self._cursor)
+            except Exception as e:
+                print(f"Error loading page: {e}")
+                return False
+            new_controls = self._add_page(items)
+            self._cursor = next_cursor
+            self._exhausted = next_cursor is None
+
+            if not self.controls and self.empty_message:
+                self._empty_placeholder = self._build_empty_placeholder()
+                self.controls.append(self._empty_placeholder)
+
+        if self.page:
+            self.update()
+        if new_controls:
+            self._items_added(new_controls)
+        return bool(new_controls)
+
+    def _clear(self):
+        self.controls = []
+        self._cursor = None
+        self._exhausted = False
+        self._empty_placeholder = None
+
+    def _add_page(self, items: List[Any]) -> List[ft.Control]:
+        """Build one fetched page and append it; returns the new controls."""
+        new_controls = [self.build_item(item) for item in items]
+        self.controls.extend(new_controls)
+        return new_controls
+
+    def _items_added(self, new_controls: List[ft.Control]):
+        """Called once new controls are on the page."""
+
+    def _build_empty_placeholder(self) -> ft.Control:
+        return ft.Container(
+            content=ft.Text(
+                self.empty_message,
+                color=ft.Colors.GREY_400,
+                text_align=ft.TextAlign.CENTER,
+            ),
+            padding=20,
+        )
+
+    async def _handle_scroll(self, e: ft.OnScrollEvent) -> bool:
+        """Load the next page when near the end; True if one was added."""
+        if e.pixels >= e.max_scroll_extent - self.prefetch_extent:
+            return await self.load_more()
+        return False
@@ -0,0 +1,108 @@
+from typing import Callable
+
+import flet as ft
+
+
+class ProfileView(ft.Column):
+    """
+    A user's profile summary (GET /users/{id}/profile).
+    Controls are built once with placeholders; set_summary only changes
+    their values, so filling the view sends a small update.
+    """
+
+    def __init__(self, on_close: Callable, **kwargs):
+        super().__init__(**kwargs)
+        self.horizontal_alignment = ft.CrossAxisAlignment.CENTER
+        self.name_text = ft.Text("Loading...", size=32, weight=ft.FontWeight.BOLD, text_align=ft.TextAlign.CENTER)
+        self.xp_text = ft.Text("", size=24, color=ft.Colors.GREEN, text_align=ft.TextAlign.CENTER)
+        self.rank_text = ft.Text("", size=16, color=ft.Colors.WHITE70, text_align=ft.TextAlign.CENTER)
+        self.sightings_text = ft.Text("-", size=24, weight=ft.FontWeight.BOLD)
+        self.species_text = ft.Text("-", size=24, weight=ft.FontWeight.BOLD)
+        self.achievements_text = ft.Text("-", size=24, weight=ft.FontWeight.BOLD)
+        self.recent_achievements = ft.Column(spacing=10)
+        self.recent_section = ft.Container(
+            content=ft.Column(
+                controls=[
+                    ft.Text("Recent Achievements", size=24, weight=ft.FontWeight.BOLD),
+                    self.recent_achievements,
+                ],
+                spacing=10
+            ),
+            margin=ft.margin.only(top=20),
+            visible=False,
+        )
+        self.controls = [
+            # Close button
+            ft.Row(
+                controls=[
+                    ft.IconButton(
+                        icon=ft.Icons.CLOSE,
+                        icon_color=ft.Colors.WHITE,
+                        on_click=on_close,
+                    ),
+                ],
+                alignment=ft.MainAxisAlignment.END,
+            ),
+            # Profile header
+            ft.Container(
+                content=ft.Column(
+                    controls=[self.name_text, self.xp_text, self.rank_text],
+                    horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                    spacing=10
+                ),
+                margin=ft.margin.only(bottom=20)
+            ),
+            # Stats section
+            ft.Container(
+                content=ft.Column(
+                    controls=[
+                        ft.Text("Statistics", size=24, weight=ft.FontWeight.BOLD),
+                        ft.Row(
+                            controls=[
+                                self._stat(self.sightings_text, "Sightings"),
+                                self._stat(self.species_text, "Species"),
+                                self._stat(self.achievements_text, "Achievements"),
+                            ],
+                            alignment=ft.MainAxisAlignment.SPACE_EVENLY
+                        )
+                    ],
+                    spacing=20
+                ),
+                padding=20,
+                bgcolor=ft.Colors.BLUE_GREY_800,
+                border_radius=10
+            ),
+            self.recent_section,
+        ]
+
+    @staticmethod
+    def _stat(value: ft.Text, label: str) -> ft.Container:
+        return ft.Container(
+            content=ft.Column(
+                controls=[value, ft.Text(label)],
+                horizontal_alignment=ft.CrossAxisAlignment.CENTER
+            ),
+            expand=True
+        )
+
+    def set_summary(self, summary: dict):
+        self.name_text.value = f"{summary.get('firstname', 'Unknown')} {summary.get('lastname', '')}"
+        self.xp_text.value = f"XP: {summary.get('xp', 0):,}"
+        rank = summary.get("rank")
+        self.rank_text.value = f"Rank #{rank:,}" if rank else "Unranked"
+        self.sightings_text.value = str(summary.get("sightings", 0))
+        self.species_text.value = str(summary.get("speciesFound", 0))
+        self.achievements_text.value = str(summary.get("achievementsUnlocked", 0))
+        self.recent_achievements.controls = [
+            ft.Container(
+                content=ft.Text(achievement.get("title", "Unknown Achievement")),
+                padding=10,
+                bgcolor=ft.Colors.BLUE_GREY_800,
+                border_radius=10
+            )
+            for achievement in summary.get("recentAchievements", [])
+        ]
+        self.recent_section.visible = bool(self.recent_achievements.controls)
+
+    def set_error(self, message: str):
+        self.name_text.value = message
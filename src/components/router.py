@@ -0,0 +1,65 @@
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+import flet as ft
+
+# Detail views kept built between visits
+MAX_CACHED_VIEWS = 32
+
+
+class OverlayRouter:
+    """
+    Detail screens as routed views stacked over the root view.
+    Each route's view is built once and cached, so navigating only pushes
+    or pops one View on page.views and the root view is never rebuilt.
+    """
+
+    def __init__(self, page: ft.Page, max_cached: int = MAX_CACHED_VIEWS):
+        self.page = page
+        self.max_cached = max_cached
+        self._routes: List[Tuple[str, Callable[[str], ft.Control]]] = []
+        self._cache: "OrderedDict[str, ft.View]" = OrderedDict()
+        page.on_route_change = self._route_changed
+        page.on_view_pop = self._view_popped
+
+    def add(self, prefix: str, build: Callable[[str], ft.Control]):
+        """Serve routes starting with prefix; build(rest_of_route) makes the view's content."""
+        self._routes = [(p, b) for p, b in self._routes if p != prefix] + [(prefix, build)]
+        self.invalidate(prefix)
+
+    def invalidate(self, prefix: str = "/"):
+        """Forget cached views under prefix so they are rebuilt on the next visit."""
+        for route in [r for r in self._cache if r.startswith(prefix)]:
+            del self._cache[route]
+
+    def go(self, route: str):
+        self.page.go(route)
+
+    def back(self, _=None):
+        """Return to the root view."""
+        self.page.go("/")
+
+    def _view_for(self, route: str) -> Optional[ft.View]:
+        view = self._cache.get(route)
+        if view is not None:
+            self._cache.move_to_end(route)
+            return view
+        for prefix, build in self._routes:
+            if route.startswith(prefix):
+                view = ft.View(route, [build(route[len(prefix):])], padding=20, scroll=ft.ScrollMode.AUTO)
+                self._cache[route] = view
+                if len(self._cache) > self.max_cached:
+                    self._cache.popitem(last=False)
+                return view
+        return None
+
+    def _route_changed(self, e: ft.RouteChangeEvent):
+        root = self.page.views[0]
+        view = self._view_for(e.route) if e.route != "/" else None
+        stack = [root] if view is None else [root, view]
+        if stack != self.page.views:
+            self.page.views[:] = stack
+            self.page.update()
+
+    def _view_popped(self, _e: ft.ViewPopEvent):
+        self.back()
@@ -0,0 +1,101 @@
+import base64
+import hashlib
+import io
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+from PIL import Image as PILImage
+
+BACKGROUND_COLOR = (30, 41, 59)
+MARKER_COLOR = (255, 69, 0)  # Bright orange
+MARKER_RADIUS = 5
+
+
+def sighting_coordinates(sightings: Iterable[dict]) -> np.ndarray:
+    """Return an (N, 2) float array of [lat, lng] for sightings that have coordinates."""
+    coords = [
+        (s['coordinates']['lat'], s['coordinates']['lng'])
+        for s in sightings
+        if s.get('coordinates') and s['coordinates'].get('lat') is not None
+    ]
+    return np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+
+
+def _disc_offsets(radius: int) -> np.ndarray:
+    """(K, 2) [dy, dx] offsets of every pixel inside a disc of the given radius."""
+    dy, dx = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+    inside = dy * dy + dx * dx <= radius * radius
+    return np.stack([dy[inside], dx[inside]], axis=1)
+
+
+class SightingMapRenderer:
+    def __init__(self, base_image_path: Path, max_viewports: int = 4):
+        """Render sighting markers over an equirectangular world map."""
+        self.base_image_path = Path(base_image_path)
+        self.max_viewports = max_viewports
+        self._base_layers: "OrderedDict[Tuple[int, int], Tuple[np.ndarray, int, int]]" = OrderedDict()
+        self._marker_offsets = _disc_offsets(MARKER_RADIUS)
+        self._last_key = None
+        self._last_png: Optional[str] = None
+
+    def _base_layer(self, width: int, height: int) -> Tuple[np.ndarray, int, int]:
+        """Resized map on the background, cached per viewport size: (pixels, y_offset, map_height)."""
+        key = (width, height)
+        cached = self._base_layers.get(key)
+        if cached is not None:
+            self._base_layers.move_to_end(key)
+            return cached
+
+        background = PILImage.new('RGB', (width, height), BACKGROUND_COLOR)
+        y_offset, map_height = 0, height
+        try:
+            with PILImage.open(self.base_image_path) as world_map:
+                # Maintain the map's aspect ratio and center it vertically
+                map_height = int(width / (world_map.width / world_map.height))
+                y_offset = (height - map_height) // 2
+                resized = world_map.convert('RGB').resize((width, map_height), PILImage.Resampling.LANCZOS)
+                background.paste(resized, (0, y_offset))
+        except OSError as e:
+            # Fall back to a plain background; markers still use the full viewport
+            print(f"Error loading map image {self.base_image_path}: {str(e)}")
+            y_offset, map_height = 0, height
+
+        layer = (np.asarray(background), y_offset, map_height)
+        self._base_layers[key] = layer
+        while len(self._base_layers) > self.max_viewports:
+            self._base_layers.popitem(last=False)
+        return layer
+
+    def project(self, coords: np.ndarray, width: int, y_offset: int, map_height: int) -> np.ndarray:
+        """Convert [lat, lng] rows to integer [y, x] pixel rows."""
+        ys = y_offset + (90.0 - coords[:, 0]) / 180.0 * map_height
+        xs = (coords[:, 1] + 180.0) / 360.0 * width
+        return np.stack([ys, xs], axis=1).astype(np.int32)
+
+    def render(self, sightings: Iterable[dict], width: int = 400, height: int = 600) -> str:
+        """Return the map as base64 PNG; re-encodes only when the viewport or markers change."""
+        coords = sighting_coordinates(sightings)
+        key = (width, height, hashlib.sha1(np.ascontiguousarray(coords).tobytes()).hexdigest())
+        if key == self._last_key and self._last_png is not None:
+            return self._last_png
+
+        base, y_offset, map_height = self._base_layer(width, height)
+        pixels = base.copy()
+        if len(coords):
+            # Stamp every marker disc in one scatter: (N, 1, 2) + (1, K, 2) -> (N*K, 2)
+            centers = self.project(coords, width, y_offset, map_height)
+            points = (centers[:, None, :] + self._marker_offsets[None, :, :]).reshape(-1, 2)
+            visible = (
+                (points[:, 0] >= 0) & (points[:, 0] < height) &
+                (points[:, 1] >= 0) & (points[:, 1] < width)
+            )
+            points = points[visible]
+            pixels[points[:, 0], points[:, 1]] = MARKER_COLOR
+
+        buffer = io.BytesIO()
+        PILImage.fromarray(pixels).save(buffer, format='PNG', compress_level=1)
+        self._last_key = key
+        self._last_png = base64.b64encode(buffer.getvalue()).decode()
+        return self._last_png
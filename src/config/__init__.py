@@ -20,9 +20,10 @@ ASSETS_DIR = ROOT_DIR / "src" / "assets"
 STORAGE_DIR = ROOT_DIR / "storage"
 DATA_DIR = STORAGE_DIR / "data"
 TEMP_DIR = STORAGE_DIR / "temp"
+IMAGE_CACHE_DIR = STORAGE_DIR / "cache" / "images"
 
 # Ensure directories exist
-for dir_path in [DATA_DIR, TEMP_DIR]:
+for dir_path in [DATA_DIR, TEMP_DIR, IMAGE_CACHE_DIR]:
     dir_path.mkdir(parents=True, exist_ok=True)
 
 # App settings
@@ -39,12 +40,44 @@ FIREBASE_CONFIG = {
     "appId": os.getenv("FIREBASE_APP_ID"),
     "measurementId": os.getenv("FIREBASE_MEASUREMENT_ID")
 }
+FIREBASE_CREDENTIALS = os.getenv("FIREBASE_CREDENTIALS", "src/firebase/anima-go-50202ba9d2b2.json")
+FIREBASE_BUCKET = os.getenv("FIREBASE_BUCKET", "anima-go.firebasestorage.app")
+
+# Storage settings
+STORAGE_BACKEND = os.getenv("ANIMAGO_STORAGE_BACKEND", "firebase")  # "firebase" or "local"
+LOCAL_DB_PATH = DATA_DIR / "animago.db"
+BLOBS_DIR = DATA_DIR / "blobs"
+BLOB_BASE_URL = os.getenv("ANIMAGO_BLOB_BASE_URL", "http://localhost:8000/blobs")
+
+# Upload settings
+MAX_UPLOAD_BYTES = int(os.getenv("ANIMAGO_MAX_UPLOAD_BYTES", 25 * 1024 * 1024))  # Larger photos are rejected with 413
+UPLOAD_CHUNK_BYTES = 1024 * 1024  # Uploads are copied to TEMP_DIR this much at a time
 
 # Vision settings
-MOONDREAM_MODEL = "vikhyatk/moondream1"
+INFERENCE_MAX_SIDE = 756  # Longest edge sent to the vision model (2x Moondream's 378 px crop)
+VISION_BACKEND = os.getenv("ANIMAGO_VISION_BACKEND", "hosted")  # "hosted" (Moondream API) or "local" (ONNX Runtime on CPU)
+MOONDREAM_MODEL = Path(os.getenv("ANIMAGO_MOONDREAM_MODEL", DATA_DIR / "models" / "moondream-2b-int8.mf"))  # Local backend weights
+VISION_THREADS = int(os.getenv("ANIMAGO_VISION_THREADS", max(1, (os.cpu_count() or 2) // 2)))  # ONNX Runtime intra-op threads for the local backend
 YOLO_MODEL = "yolov8n.pt"
+DETECTOR_IMAGE_SIZE = 320  # YOLO input edge; the cascade's first stage only needs to find the animal
+DETECTOR_MIN_CONFIDENCE = 0.25
+DETECTOR_EMPTY_CONFIDENCE = 0.05  # A frame is skipped only if YOLO finds no object of any class even at this confidence
+MAX_ANIMALS_PER_IMAGE = 3  # Crops sent to the vision model per photo
 SAM_MODEL = "sam_vit_h_4b8939.pth"
 
 # Map settings
 DEFAULT_ZOOM = 13
-MAP_STYLE = "OpenStreetMap" 
\ No newline at end of file
+MAP_STYLE = "OpenStreetMap"
+WORLD_MAP_IMAGE = ROOT_DIR / "image.png"  # Equirectangular base map
+TILES_ARCHIVE = Path(os.getenv("ANIMAGO_TILES_ARCHIVE", DATA_DIR / "tiles" / "world.mbtiles"))
+SAMPLE_TILES_MAX_ZOOM = 4  # Zoom depth of the sample archive built from WORLD_MAP_IMAGE
+
+# Game settings
+SIGHTING_XP = 100  # XP awarded for each new sighting
+DUPLICATE_MAX_DISTANCE = 8  # Perceptual-hash bits (of 64) two captures may differ by and still be the same shot
+DUPLICATE_WINDOW_MINUTES = 60  # How far apart near-duplicate captures can be
+DUPLICATE_CELL_DEGREES = 0.01  # Geo cell (~1 km) within which other users' captures are compared
+
+# Client settings
+API_BASE_URL = os.getenv("ANIMAGO_API_URL", "http://localhost:8000")
+OUTBOX_DB_PATH = TEMP_DIR / "outbox.db"  # Captures waiting to be uploaded
@@ -1,12 +1,17 @@
 """
 Core functionality for AnimaGo.
 Contains base classes, interfaces, and core business logic.
+
+Domain objects are frozen, slotted dataclasses: no per-instance __dict__,
+no shared mutable defaults, and timestamps taken when each object is
+created. Use core.serialization to encode and decode them.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID, uuid4
 
 
 class AnimalRarity(Enum):
@@ -18,15 +23,15 @@ class AnimalRarity(Enum):
     MYTHICAL = "mythical"
     UNDISCOVERED = "undiscovered"
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Location:
     latitude: float
     longitude: float
     altitude: Optional[float] = None
     accuracy: Optional[float] = None
-    timestamp: datetime = datetime.now()
+    timestamp: datetime = field(default_factory=datetime.now)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Animal:
     id: str
     name: str
@@ -35,19 +40,72 @@ class Animal:
     confidence: float
     location: Location
     image_path: str
-    discovered_at: datetime = datetime.now()
+    discovered_at: datetime = field(default_factory=datetime.now)
     discovered_by: Optional[str] = None
-    metadata: dict = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class User:
     id: str
     username: str
     email: str
     xp: int = 0
     level: int = 1
-    discoveries: List[str] = None  # List of animal IDs
-    achievements: List[str] = None
+    discoveries: Tuple[str, ...] = ()  # Animal IDs
+    achievements: Tuple[str, ...] = ()
     guild_id: Optional[str] = None
-    created_at: datetime = datetime.now()
-    last_active: datetime = datetime.now() 
\ No newline at end of file
+    created_at: datetime = field(default_factory=datetime.now)
+    last_active: datetime = field(default_factory=datetime.now)
+
+
+# Stored records (Firestore / local store documents; field names match the stored keys)
+
+@dataclass(frozen=True, slots=True)
+class Coordinates:
+    lat: float
+    lng: float
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Comment:
+    userID: UUID
+    comment: str
+    timestamp: datetime = field(default_factory=datetime.now)
+    commentID: Optional[str] = None  # Key of the comment in the sighting's comments subcollection
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Sighting:
+    userID: UUID
+    timestamp: datetime
+    coordinates: Coordinates
+    species: str
+    speciesID: Optional[int] = None  # Catalog ID, if the answer matched a known species
+    description: str
+    createdAt: datetime = field(default_factory=datetime.now)
+    updatedAt: datetime = field(default_factory=datetime.now)
+    sightingID: UUID = field(default_factory=uuid4)
+    commentCount: int = 0
+    latestComments: Tuple[Comment, ...] = ()  # Newest few comments, oldest first; the full thread is paged separately
+    sightingURL: Optional[str] = None
+    imageHash: Optional[str] = None  # SHA-256 of the image; key of the stored blob
+    perceptualHash: Optional[str] = None  # 64-bit pHash (hex) for near-duplicate detection
+    thumbURL: Optional[str] = None  # Filled in by the derivative worker
+    previewURL: Optional[str] = None
+    fullURL: Optional[str] = None
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Achievement:
+    achievementName: str
+    dateAcquired: datetime
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Account:
+    userID: UUID = field(default_factory=uuid4)
+    email: str
+    password: str
+    firstname: str
+    lastname: str
+    colorblind: bool = False
+    stickers: Tuple[str, ...] = ()  # Sticker URLs
+    sightings: Tuple[str, ...] = ()  # Sighting document IDs
+    achievements: Tuple[Achievement, ...] = ()
+    xp: int = 0
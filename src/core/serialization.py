@@ -0,0 +1,171 @@
+"""
+Fast encoding and typed decoding for the core domain model.
+Uses orjson when it is installed (dataclasses, UUIDs, datetimes and enums
+are handled in C) and falls back to the standard json module otherwise.
+Decoders are built once per type from the dataclass annotations.
+"""
+
+import dataclasses
+import json
+import types
+from datetime import datetime
+from enum import Enum
+from typing import (Any, Callable, Dict, List, Type, TypeVar, Union,
+                    get_args, get_origin, get_type_hints)
+from uuid import UUID
+
+try:
+    import orjson  # The ``fast`` extra
+except ImportError:
+    orjson = None
+
+T = TypeVar("T")
+
+
+def _default(obj):
+    if dataclasses.is_dataclass(obj):
+        return {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)}
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+
+def encode(obj: Any) -> bytes:
+    """Serialize domain objects (and dicts/lists of them) to JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode()
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Primitive conversion: the same shapes as a JSON round trip, built directly
+
+_PASS_THROUGH = (str, int, float, bool, type(None))
+_converters: Dict[type, Callable[[Any], Any]] = {}
+
+
+def _is_scalar(tp) -> bool:
+    if get_origin(tp) in (Union, types.UnionType):
+        return all(_is_scalar(arg) for arg in get_args(tp))
+    return tp in _PASS_THROUGH
+
+
+def _build_converter(tp: type) -> Callable[[Any], Any]:
+    if dataclasses.is_dataclass(tp):
+        hints = get_type_hints(tp)
+        # Fields annotated as plain scalars are copied as they are; the rest are converted
+        fields = tuple((f.name, _is_scalar(hints[f.name])) for f in dataclasses.fields(tp))
+
+        def convert_dataclass(obj):
+            document = {}
+            for name, scalar in fields:
+                value = getattr(obj, name)
+                if not scalar and type(value) not in _PASS_THROUGH:
+                    value = to_primitive(value)
+                document[name] = value
+            return document
+        return convert_dataclass
+    if issubclass(tp, dict):
+        return lambda obj: {key if isinstance(key, str) else str(key): to_primitive(value) for key, value in obj.items()}
+    if issubclass(tp, (list, tuple)):
+        return lambda obj: [to_primitive(item) for item in obj]
+    if issubclass(tp, UUID):
+        return str
+    if issubclass(tp, datetime):
+        return datetime.isoformat
+    if issubclass(tp, Enum):
+        return lambda obj: to_primitive(obj.value)
+    raise TypeError(f"Object of type {tp.__name__} is not JSON serializable")
+
+
+def to_primitive(obj: Any) -> Any:
+    """
+    JSON-compatible dicts/lists for a document write (UUIDs and datetimes as
+    strings). Walks the dataclass fields directly, with one converter per
+    type, instead of encoding to JSON and parsing it back.
+    """
+    tp = type(obj)
+    if tp in _PASS_THROUGH:
+        return obj
+    convert = _converters.get(tp)
+    if convert is None:
+        convert = _converters[tp] = _build_converter(tp)
+    return convert(obj)
+
+
+# Decoding
+
+_decoders: Dict[Any, Callable[[Any], Any]] = {}
+
+
+def _identity(value):
+    return value
+
+
+def _build_decoder(tp) -> Callable[[Any], Any]:
+    origin = get_origin(tp)
+    if tp is Any:
+        return _identity
+
+    if origin in (Union, types.UnionType):
+        members = [arg for arg in get_args(tp) if arg is not type(None)]
+        inner = _decoder(members[0]) if len(members) == 1 else _identity
+        return lambda value: None if value is None else inner(value)
+
+    if origin in (tuple, list):
+        args = get_args(tp)
+        inner = _decoder(args[0]) if args else _identity
+        container = tuple if origin is tuple else list
+        return lambda value: container(inner(item) for item in value or ())
+
+    if origin is dict or tp is dict:
+        return lambda value: dict(value or {})
+
+    if dataclasses.is_dataclass(tp):
+        hints = get_type_hints(tp)
+        fields = [(f.name, _decoder(hints[f.name])) for f in dataclasses.fields(tp) if f.init]
+
+        def decode_dataclass(value):
+            if isinstance(value, tp):
+                return value
+            # Unknown keys (e.g. store-added fields) are ignored
+            return tp(**{name: convert(value[name]) for name, convert in fields if name in value})
+        return decode_dataclass
+
+    if tp is UUID:
+        return lambda value: value if isinstance(value, UUID) else UUID(str(value))
+    if tp is datetime:
+        return lambda value: value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    if isinstance(tp, type) and issubclass(tp, Enum):
+        return tp
+    if tp is float:
+        return float
+    if tp is int:
+        return int
+    return _identity
+
+
+def _decoder(tp) -> Callable[[Any], Any]:
+    decoder = _decoders.get(tp)
+    if decoder is None:
+        decoder = _decoders[tp] = _build_decoder(tp)
+    return decoder
+
+
+def decode(cls: Type[T], data: Any) -> T:
+    """Build a cls instance from decoded JSON / a stored document, coercing field types."""
+    return _decoder(cls)(data)
+
+
+def decode_list(cls: Type[T], data: List[Any]) -> List[T]:
+    convert = _decoder(cls)
+    return [convert(item) for item in data]
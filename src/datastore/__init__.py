@@ -0,0 +1,191 @@
+"""
+Persistence layer for AnimaGo.
+Defines the storage interface shared by the Firebase and local backends.
+"""
+
+import hashlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+# Comments kept inline on the sighting as a preview; the rest are only paged
+LATEST_COMMENTS = 3
+
+
+def content_digest(data: bytes) -> str:
+    """SHA-256 hex digest used as the key for content-addressed blobs."""
+    return hashlib.sha256(data).hexdigest()
+
+
+# Extensions of the image types uploads are accepted as; anything else is stored as .jpg
+IMAGE_EXTENSIONS = {"image/jpeg": "jpg", "image/png": "png", "image/webp": "webp"}
+
+
+def image_blob_path(digest: str, content_type: str = "image/jpeg") -> str:
+    """Blob path of a sighting image stored under its content hash, with its type's extension."""
+    return f"sighting_pics/{digest}.{IMAGE_EXTENSIONS.get(content_type, 'jpg')}"
+
+
+class DataStore(ABC):
+    """Storage for users, sightings, comments, leaderboard and image blobs."""
+
+    # Users
+    @abstractmethod
+    def add_user(self, user: dict) -> None:
+        """Create or overwrite a user document keyed by its userID."""
+
+    @abstractmethod
+    def get_user(self, user_id: str) -> Optional[dict]:
+        """Fetch a user by userID."""
+
+    @abstractmethod
+    def get_user_by_email(self, email: str) -> Optional[dict]:
+        """Fetch a user by email address."""
+
+    @abstractmethod
+    def record_user_sighting(self, user_id: str, sighting_id: str, xp: int) -> None:
+        """Append a sightingID to the user's list and award XP."""
+
+    # Sightings (keyed by their sightingID, so every lookup is a direct get)
+    @abstractmethod
+    def add_sighting(self, sighting: dict) -> Optional[str]:
+        """
+        Store a new sighting under its sightingID and return that ID; None
+        (and nothing written) if that ID is already taken. The check and the
+        insert are one atomic step, so concurrent retries of one client
+        upload cannot both create it.
+        """
+
+    @abstractmethod
+    def update_sighting(self, sighting_id: str, fields: dict) -> None:
+        """Merge top-level fields into an existing sighting."""
+
+    @abstractmethod
+    def get_sighting(self, sighting_id: str) -> Optional[dict]:
+        """Fetch a sighting by sightingID."""
+
+    @abstractmethod
+    def get_sightings(self, sighting_ids: List[str]) -> List[dict]:
+        """Fetch several sightings at once, preserving the order of sighting_ids."""
+
+    @abstractmethod
+    def list_user_sightings(
+        self, user_id: str, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        Page through a user's sightings, newest first.
+        Returns (sightings, next_cursor); next_cursor is None on the last page.
+        """
+
+    @abstractmethod
+    def iter_sightings(self) -> Iterator[dict]:
+        """Stream every sighting, for building in-memory indexes at startup."""
+
+    @abstractmethod
+    def rekey_sightings(self, batch_size: int, after: Optional[str] = None) -> Tuple[int, Optional[str]]:
+        """
+        Migration step: move up to batch_size sightings stored under another
+        key (e.g. an auto-generated document ID) to their sightingID, along
+        with their comments and the users' sighting lists.
+        Returns (sightings moved, checkpoint); pass the checkpoint back as
+        ``after`` to continue, None means every sighting has been visited.
+        """
+
+    # Comments
+    @abstractmethod
+    def add_comment(self, sighting_id: str, comment: dict) -> Optional[Tuple[dict, dict]]:
+        """
+        Store a comment on the sighting with the given sightingID and, in the
+        same write, bump its commentCount and latestComments preview.
+        Returns (stored comment with its commentID, updated sighting), or
+        None if there is no such sighting.
+        """
+
+    @abstractmethod
+    def list_comments(
+        self, sighting_id: str, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        Page through a sighting's comments, newest first.
+        Returns (comments, next_cursor); next_cursor is None on the last page.
+        """
+
+    # Leaderboard
+    @abstractmethod
+    def get_top_users(self, n: int) -> List[dict]:
+        """Return the n users with the most XP, highest first."""
+
+    @abstractmethod
+    def iter_users(self) -> Iterator[dict]:
+        """Stream every user, for building the in-memory leaderboards at startup."""
+
+    # Achievement progress
+    @abstractmethod
+    def save_progress(self, user_id: str, snapshot: dict) -> None:
+        """Replace a user's achievement progress snapshot."""
+
+    @abstractmethod
+    def iter_progress(self) -> Iterator[Tuple[str, dict]]:
+        """Stream (user_id, snapshot) for every user with saved progress."""
+
+    # Biodex completion
+    @abstractmethod
+    def save_biodex(self, user_id: str, document: dict) -> None:
+        """Replace a user's Biodex completion document."""
+
+    @abstractmethod
+    def iter_biodex(self) -> Iterator[Tuple[str, dict]]:
+        """Stream (user_id, document) for every user with a Biodex document."""
+
+    # Blobs
+    @abstractmethod
+    def upload_blob(self, path: str, data: bytes, content_type: str) -> str:
+        """Store a blob and return its public URL."""
+
+    @abstractmethod
+    def blob_exists(self, path: str) -> bool:
+        """Check whether a blob is already stored at path."""
+
+    @abstractmethod
+    def blob_url(self, path: str) -> str:
+        """Public URL of the blob at path, without touching the network."""
+
+    @abstractmethod
+    def upload_blob_from_file(self, path: str, file_path: Path, content_type: Optional[str] = None) -> str:
+        """Store a file from disk as a blob and return its public URL."""
+
+    def put_image(self, data: bytes, content_type: str = "image/jpeg") -> Tuple[str, str]:
+        """
+        Store an image under its content hash, skipping the upload when the
+        same bytes were stored before. Returns (digest, public URL).
+        """
+        digest = content_digest(data)
+        path = image_blob_path(digest, content_type)
+        if self.blob_exists(path):
+            return digest, self.blob_url(path)
+        return digest, self.upload_blob(path, data, content_type)
+
+    def put_image_file(self, file_path: Path, digest: str, content_type: str = "image/jpeg") -> Tuple[str, str]:
+        """
+        put_image for an upload already on disk, hashed while it was received;
+        the file is streamed to storage rather than read into memory.
+        """
+        path = image_blob_path(digest, content_type)
+        if self.blob_exists(path):
+            return digest, self.blob_url(path)
+        return digest, self.upload_blob_from_file(path, file_path, content_type)
+
+    def local_blob(self, digest: str) -> Optional[Tuple[Path, str]]:
+        """Return (file path, content type) for blobs this process serves itself."""
+        return None
+
+
+def create_datastore(backend: str = "firebase", **options) -> DataStore:
+    """Create a storage backend by name ("firebase" or "local")."""
+    if backend == "local":
+        from .local_store import LocalDataStore
+        return LocalDataStore(**options)
+    if backend == "firebase":
+        from .firebase_store import FirebaseDataStore
+        return FirebaseDataStore(**options)
+    raise ValueError(f"Unknown storage backend: {backend}")
@@ -0,0 +1,302 @@
+"""
+Firestore + Cloud Storage backend.
+"""
+
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import firebase_admin
+from firebase_admin import credentials, firestore, storage  # type: ignore
+from google.api_core.exceptions import (AlreadyExists, Forbidden, NotFound,
+                                        PreconditionFailed)
+
+from . import LATEST_COMMENTS, DataStore, image_blob_path
+
+# Content-addressed blobs never change, so clients and CDNs may cache them forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def _iso(value) -> Optional[str]:
+    # Legacy comments hold Firestore timestamps; new ones store ISO strings
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+class FirebaseDataStore(DataStore):
+    def __init__(self, credentials_path: str, bucket_name: str):
+        """Initialize the Firebase app, Firestore client and Storage bucket."""
+        cred = credentials.Certificate(credentials_path)
+        firebase_admin.initialize_app(cred, {
+            'storageBucket': bucket_name
+        })
+
+        self.db = firestore.client()
+        self.bucket = storage.bucket(app=firebase_admin.get_app())
+
+        # Verify bucket exists and create if needed
+        if not self.bucket.exists():
+            self.bucket.create()
+            print(f"Created new bucket: {self.bucket.name}")
+        else:
+            print(f"Using existing bucket: {self.bucket.name}")
+
+        print("Firebase initialized successfully!")
+
+    def grant_public_read(self) -> bool:
+        """
+        Make every object in the bucket publicly readable through one
+        bucket-level IAM binding, instead of per-object ACLs. A one-time ops
+        step (grant_public_read.py) that needs bucket-admin rights; returns
+        False if the bucket was already configured.
+        """
+        try:
+            self.bucket.reload()
+            changed = False
+            iam_configuration = self.bucket.iam_configuration
+            if not iam_configuration.uniform_bucket_level_access_enabled:
+                iam_configuration.uniform_bucket_level_access_enabled = True
+                self.bucket.patch()
+                changed = True
+
+            policy = self.bucket.get_iam_policy(requested_policy_version=3)
+            role = "roles/storage.objectViewer"
+            if not any(b["role"] == role and "allUsers" in b["members"] for b in policy.bindings):
+                policy.bindings.append({"role": role, "members": {"allUsers"}})
+                self.bucket.set_iam_policy(policy)
+                changed = True
+            return changed
+        except Forbidden as e:
+            raise PermissionError(
+                f"Granting public read on {self.bucket.name} needs storage.buckets.update and "
+                f"storage.buckets.setIamPolicy (e.g. roles/storage.admin) for these credentials: {e.message}"
+            ) from e
+
+    # Users
+    def add_user(self, user: dict) -> None:
+        self.db.collection('users').document(str(user['userID'])).set(user)
+
+    def get_user(self, user_id: str) -> Optional[dict]:
+        user_doc = self.db.collection('users').document(user_id).get()
+        return user_doc.to_dict() if user_doc.exists else None
+
+    def get_user_by_email(self, email: str) -> Optional[dict]:
+        result = self.db.collection('users').where('email', '==', email).limit(1).get()
+        return result[0].to_dict() if result else None
+
+    def record_user_sighting(self, user_id: str, sighting_id: str, xp: int) -> None:
+        try:
+            self.db.collection('users').document(str(user_id)).update({
+                'sightings': firestore.ArrayUnion([str(sighting_id)]),
+                'xp': firestore.Increment(xp)
+            })
+        except NotFound:
+            pass
+
+    # Sightings
+    def add_sighting(self, sighting: dict) -> Optional[str]:
+        sighting_id = str(sighting['sightingID'])
+        try:
+            # create() fails server-side if the document exists, unlike set()
+            self.db.collection('sightings_map').document(sighting_id).create(sighting)
+        except AlreadyExists:
+            return None
+        return sighting_id
+
+    def update_sighting(self, sighting_id: str, fields: dict) -> None:
+        self.db.collection('sightings_map').document(str(sighting_id)).update(fields)
+
+    def get_sighting(self, sighting_id: str) -> Optional[dict]:
+        sighting_doc = self.db.collection('sightings_map').document(str(sighting_id)).get()
+        return sighting_doc.to_dict() if sighting_doc.exists else None
+
+    def get_sightings(self, sighting_ids: List[str]) -> List[dict]:
+        # One batched round trip instead of a get() per document
+        refs = [self.db.collection('sightings_map').document(str(sighting_id)) for sighting_id in sighting_ids]
+        found = {doc.id: doc.to_dict() for doc in self.db.get_all(refs) if doc.exists}
+        return [found[str(sighting_id)] for sighting_id in sighting_ids if str(sighting_id) in found]
+
+    def list_user_sightings(
+        self, user_id: str, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        # Needs the composite index sightings_map(userID ASC, createdAt DESC)
+        query = (
+            self.db.collection('sightings_map')
+            .where('userID', '==', user_id)
+            .order_by('createdAt', direction=firestore.Query.DESCENDING)
+        )
+        if cursor:
+            cursor_doc = self.db.collection('sightings_map').document(cursor).get()
+            if cursor_doc.exists:
+                query = query.start_after(cursor_doc)
+        # One extra document tells us whether another page exists
+        docs = list(query.limit(limit + 1).stream())
+        page = docs[:limit]
+        next_cursor = page[-1].id if len(docs) > limit else None
+        return [doc.to_dict() for doc in page], next_cursor
+
+    def iter_sightings(self) -> Iterator[dict]:
+        for doc in self.db.collection('sightings_map').stream():
+            yield doc.to_dict()
+
+    def rekey_sightings(self, batch_size: int, after: Optional[str] = None) -> Tuple[int, Optional[str]]:
+        sightings = self.db.collection('sightings_map')
+        query = sightings.order_by(firestore.FieldPath.document_id())
+        if after:
+            query = query.where(firestore.FieldPath.document_id(), '>', sightings.document(after))
+        docs = list(query.limit(batch_size).stream())
+        moves = []
+        for doc in docs:
+            sighting = doc.to_dict()
+            sighting_id = str(sighting.get('sightingID') or '')
+            if sighting_id and doc.id != sighting_id:
+                moves.append((doc, sighting_id, sighting))
+
+        # Copy everything to the new keys first and delete the old documents only
+        # once that has landed, so an interrupted run can simply be repeated
+        writer = self.db.bulk_writer()
+        renamed = {}
+        old_comments = []
+        for doc, sighting_id, sighting in moves:
+            target = sightings.document(sighting_id)
+            # Legacy inline array (deterministic IDs keep a rerun from duplicating) plus any subcollection
+            comments = [
+                {**comment, 'commentID': f"legacy{i:05d}"}
+                for i, comment in enumerate(sighting.pop('comments', None) or [])
+            ]
+            for comment_doc in doc.reference.collection('comments').stream():
+                comments.append({**comment_doc.to_dict(), 'commentID': comment_doc.id})
+                old_comments.append(comment_doc.reference)
+            for comment in comments:
+                comment['timestamp'] = _iso(comment.get('timestamp'))
+                writer.set(target.collection('comments').document(comment['commentID']), comment)
+            comments.sort(key=lambda comment: comment['timestamp'] or '')
+            sighting['commentCount'] = len(comments)
+            sighting['latestComments'] = comments[-LATEST_COMMENTS:]
+            writer.set(target, sighting)
+            renamed.setdefault(str(sighting.get('userID')), {})[doc.id] = sighting_id
+
+        user_refs = [self.db.collection('users').document(user_id) for user_id in renamed]
+        for user_doc in self.db.get_all(user_refs) if user_refs else ():
+            if user_doc.exists:
+                mapping = renamed[user_doc.id]
+                listed = user_doc.to_dict().get('sightings', [])
+                writer.update(user_doc.reference, {'sightings': [mapping.get(key, key) for key in listed]})
+        writer.flush()
+
+        for reference in old_comments:
+            writer.delete(reference)
+        for doc, _, _ in moves:
+            writer.delete(doc.reference)
+        writer.close()
+
+        checkpoint = docs[-1].id if len(docs) == batch_size else None
+        return len(moves), checkpoint
+
+    # Comments
+    def add_comment(self, sighting_id: str, comment: dict) -> Optional[Tuple[dict, dict]]:
+        parent_ref = self.db.collection('sightings_map').document(str(sighting_id))
+
+        @firestore.transactional
+        def post(transaction) -> Optional[Tuple[dict, dict]]:
+            parent = parent_ref.get(transaction=transaction)
+            if not parent.exists:
+                return None
+            comment_ref = parent_ref.collection('comments').document()
+            stored = {**comment, 'commentID': comment_ref.id}
+            sighting = parent.to_dict()
+            # The parent only carries a count and the newest few, so it stays a fixed size
+            fields = {
+                'commentCount': sighting.get('commentCount', 0) + 1,
+                'latestComments': (sighting.get('latestComments', []) + [stored])[-LATEST_COMMENTS:],
+            }
+            transaction.set(comment_ref, stored)
+            transaction.update(parent_ref, fields)
+            sighting.update(fields)
+            return stored, sighting
+
+        # Both documents are written in a single commit
+        return post(self.db.transaction())
+
+    def list_comments(
+        self, sighting_id: str, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        comments = self.db.collection('sightings_map').document(str(sighting_id)).collection('comments')
+        query = comments.order_by('timestamp', direction=firestore.Query.DESCENDING)
+        if cursor:
+            cursor_doc = comments.document(cursor).get()
+            if cursor_doc.exists:
+                query = query.start_after(cursor_doc)
+        # One extra document tells us whether another page exists
+        docs = list(query.limit(limit + 1).stream())
+        page = docs[:limit]
+        next_cursor = page[-1].id if len(docs) > limit else None
+        return [{**doc.to_dict(), 'commentID': doc.id} for doc in page], next_cursor
+
+    # Leaderboard
+    def get_top_users(self, n: int) -> List[dict]:
+        query = self.db.collection('users').order_by('xp', direction=firestore.Query.DESCENDING)
+
+        # Use a dictionary to track unique users by userID
+        unique_users = {}
+        for user in query.stream():
+            user_dict = user.to_dict()
+            user_id = user_dict.get('userID')
+            if user_id and user_id not in unique_users:
+                unique_users[user_id] = user_dict
+                if len(unique_users) >= n:
+                    break
+        return list(unique_users.values())[:n]
+
+    def iter_users(self) -> Iterator[dict]:
+        for user in self.db.collection('users').stream():
+            yield user.to_dict()
+
+    # Achievement progress
+    def save_progress(self, user_id: str, snapshot: dict) -> None:
+        self.db.collection('achievement_progress').document(str(user_id)).set(snapshot)
+
+    def iter_progress(self) -> Iterator[Tuple[str, dict]]:
+        for doc in self.db.collection('achievement_progress').stream():
+            yield doc.id, doc.to_dict()
+
+    # Biodex completion
+    def save_biodex(self, user_id: str, document: dict) -> None:
+        self.db.collection('biodex').document(str(user_id)).set(document)
+
+    def iter_biodex(self) -> Iterator[Tuple[str, dict]]:
+        for doc in self.db.collection('biodex').stream():
+            yield doc.id, doc.to_dict()
+
+    # Blobs
+    def upload_blob(self, path: str, data: bytes, content_type: str) -> str:
+        blob = self.bucket.blob(path)
+        blob.cache_control = IMMUTABLE_CACHE_CONTROL
+        try:
+            # Only create, never overwrite: a concurrent upload of the same bytes wins harmlessly
+            blob.upload_from_string(data, content_type=content_type, if_generation_match=0)
+        except PreconditionFailed:
+            pass
+        return blob.public_url
+
+    def blob_exists(self, path: str) -> bool:
+        return self.bucket.blob(path).exists()
+
+    def blob_url(self, path: str) -> str:
+        return self.bucket.blob(path).public_url
+
+    def upload_blob_from_file(self, path: str, file_path: Path, content_type: Optional[str] = None) -> str:
+        blob = self.bucket.blob(path)
+        blob.upload_from_filename(str(file_path), content_type=content_type)
+        return blob.public_url
+
+    def put_image_file(self, file_path: Path, digest: str, content_type: str = "image/jpeg") -> Tuple[str, str]:
+        path = image_blob_path(digest, content_type)
+        blob = self.bucket.blob(path)
+        if blob.exists():
+            return digest, blob.public_url
+        blob.cache_control = IMMUTABLE_CACHE_CONTROL
+        try:
+            # Streamed from disk (chunked resumable upload for large files), create-only like upload_blob
+            blob.upload_from_filename(str(file_path), content_type=content_type, if_generation_match=0)
+        except PreconditionFailed:
+            pass
+        return digest, blob.public_url
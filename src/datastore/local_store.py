@@ -0,0 +1,400 @@
+"""
+Local backend: SQLite (WAL) for documents and a content-addressed
+directory for blobs. Needs no cloud project or credentials.
+"""
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from . import LATEST_COMMENTS, DataStore, content_digest
+
+try:
+    from ..core.serialization import encode, loads
+except ImportError:  # imported as the top-level ``datastore`` package
+    from core.serialization import encode, loads
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    email TEXT NOT NULL,
+    xp INTEGER NOT NULL DEFAULT 0,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS users_email ON users(email);
+CREATE INDEX IF NOT EXISTS users_xp ON users(xp DESC);
+
+CREATE TABLE IF NOT EXISTS sightings (
+    doc_id TEXT PRIMARY KEY,
+    sighting_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sightings_sighting_id ON sightings(sighting_id);
+CREATE INDEX IF NOT EXISTS sightings_user ON sightings(user_id, created_at, doc_id);
+
+CREATE TABLE IF NOT EXISTS comments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sighting_doc_id TEXT NOT NULL REFERENCES sightings(doc_id) ON DELETE CASCADE,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS comments_sighting ON comments(sighting_doc_id, id);
+
+CREATE TABLE IF NOT EXISTS progress (
+    user_id TEXT PRIMARY KEY,
+    body TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS biodex (
+    user_id TEXT PRIMARY KEY,
+    body TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS blobs (
+    path TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    content_type TEXT
+);
+CREATE INDEX IF NOT EXISTS blobs_digest ON blobs(digest);
+"""
+
+
+def _dumps(doc: dict) -> str:
+    # Documents are already primitives; encode() is orjson when it is installed
+    return encode(doc).decode()
+
+
+class LocalDataStore(DataStore):
+    def __init__(self, db_path: Path, blobs_dir: Path, base_url: str = "http://localhost:8000/blobs"):
+        """Open (or create) the SQLite database and blob directory."""
+        self.db_path = Path(db_path)
+        self.blobs_dir = Path(blobs_dir)
+        self.base_url = base_url.rstrip("/")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+
+        # sqlite3 connections are not shareable across threads; keep one per thread
+        self._local = threading.local()
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # Users
+    def add_user(self, user: dict) -> None:
+        self._connect().execute(
+            "INSERT OR REPLACE INTO users (user_id, email, xp, body) VALUES (?, ?, ?, ?)",
+            (str(user["userID"]), user.get("email", ""), int(user.get("xp", 0)), _dumps(user)),
+        )
+
+    def _user_from_row(self, row: Optional[sqlite3.Row]) -> Optional[dict]:
+        if row is None:
+            return None
+        user = loads(row["body"])
+        user["xp"] = row["xp"]
+        return user
+
+    def get_user(self, user_id: str) -> Optional[dict]:
+        row = self._connect().execute(
+            "SELECT xp, body FROM users WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return self._user_from_row(row)
+
+    def get_user_by_email(self, email: str) -> Optional[dict]:
+        row = self._connect().execute(
+            "SELECT xp, body FROM users WHERE email = ? LIMIT 1", (email,)
+        ).fetchone()
+        return self._user_from_row(row)
+
+    def record_user_sighting(self, user_id: str, sighting_id: str, xp: int) -> None:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT xp, body FROM users WHERE user_id = ?", (user_id,)).fetchone()
+            if row is None:
+                return
+            user = self._user_from_row(row)
+            sightings = user.setdefault("sightings", [])
+            if str(sighting_id) not in sightings:
+                sightings.append(str(sighting_id))
+            user["xp"] = row["xp"] + xp
+            conn.execute(
+                "UPDATE users SET xp = ?, body = ? WHERE user_id = ?",
+                (user["xp"], _dumps(user), user_id),
+            )
+
+    # Sightings
+    def add_sighting(self, sighting: dict) -> Optional[str]:
+        sighting_id = str(sighting["sightingID"])
+        inserted = self._connect().execute(
+            "INSERT OR IGNORE INTO sightings (doc_id, sighting_id, user_id, created_at, body) VALUES (?, ?, ?, ?, ?)",
+            (
+                sighting_id,
+                sighting_id,
+                str(sighting.get("userID", "")),
+                str(sighting.get("createdAt", "")),
+                _dumps(sighting),
+            ),
+        ).rowcount
+        return sighting_id if inserted else None
+
+    def update_sighting(self, sighting_id: str, fields: dict) -> None:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT body FROM sightings WHERE doc_id = ?", (str(sighting_id),)).fetchone()
+            if row is None:
+                raise KeyError(sighting_id)
+            sighting = loads(row["body"])
+            sighting.update(fields)
+            conn.execute("UPDATE sightings SET body = ? WHERE doc_id = ?", (_dumps(sighting), str(sighting_id)))
+
+    def get_sighting(self, sighting_id: str) -> Optional[dict]:
+        row = self._connect().execute("SELECT body FROM sightings WHERE doc_id = ?", (str(sighting_id),)).fetchone()
+        if row is None:
+            return None
+        return loads(row["body"])
+
+    def get_sightings(self, sighting_ids: List[str]) -> List[dict]:
+        if not sighting_ids:
+            return []
+        sighting_ids = [str(sighting_id) for sighting_id in sighting_ids]
+        conn = self._connect()
+        found = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(sighting_ids), 500):
+            chunk = sighting_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for row in conn.execute(
+                f"SELECT doc_id, body FROM sightings WHERE doc_id IN ({placeholders})", chunk
+            ):
+                found[row["doc_id"]] = loads(row["body"])
+        return [found[sighting_id] for sighting_id in sighting_ids if sighting_id in found]
+
+    def list_user_sightings(
+        self, user_id: str, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        conn = self._connect()
+        params: list = [user_id]
+        keyset = ""
+        if cursor:
+            row = conn.execute("SELECT created_at FROM sightings WHERE doc_id = ?", (cursor,)).fetchone()
+            if row is not None:
+                keyset = "AND (created_at, doc_id) < (?, ?)"
+                params += [row["created_at"], cursor]
+        rows = conn.execute(
+            f"""SELECT doc_id, body FROM sightings
+                WHERE user_id = ? {keyset}
+                ORDER BY created_at DESC, doc_id DESC LIMIT ?""",
+            params + [limit + 1],
+        ).fetchall()
+        page = rows[:limit]
+        next_cursor = page[-1]["doc_id"] if len(rows) > limit else None
+        return [loads(r["body"]) for r in page], next_cursor
+
+    def iter_sightings(self) -> Iterator[dict]:
+        # Page by primary key so no read transaction stays open while the caller works
+        last = ""
+        while True:
+            rows = self._connect().execute(
+                "SELECT doc_id, body FROM sightings WHERE doc_id > ? ORDER BY doc_id LIMIT 500", (last,)
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield loads(row["body"])
+            last = rows[-1]["doc_id"]
+
+    def rekey_sightings(self, batch_size: int, after: Optional[str] = None) -> Tuple[int, Optional[str]]:
+        with self._transaction() as conn:
+            # Comment rows are re-pointed in the same transaction; check the keys at commit
+            conn.execute("PRAGMA defer_foreign_keys = ON")
+            rows = conn.execute(
+                "SELECT doc_id, sighting_id, user_id, body FROM sightings WHERE doc_id > ? ORDER BY doc_id LIMIT ?",
+                (after or "", batch_size),
+            ).fetchall()
+            renamed = {}
+            for row in rows:
+                old, new = row["doc_id"], row["sighting_id"]
+                if not new or old == new:
+                    continue
+                sighting = loads(row["body"])
+                for comment in sighting.pop("comments", None) or []:
+                    conn.execute("INSERT INTO comments (sighting_doc_id, body) VALUES (?, ?)", (old, _dumps(comment)))
+                # A duplicate already at the new key gives up its document but keeps its thread
+                conn.execute("UPDATE comments SET sighting_doc_id = ? WHERE sighting_doc_id = ?", (old, new))
+                conn.execute("DELETE FROM sightings WHERE doc_id = ?", (new,))
+                conn.execute("UPDATE comments SET sighting_doc_id = ? WHERE sighting_doc_id = ?", (new, old))
+                latest = conn.execute(
+                    "SELECT id, body FROM comments WHERE sighting_doc_id = ? ORDER BY id DESC LIMIT ?",
+                    (new, LATEST_COMMENTS),
+                ).fetchall()
+                sighting["commentCount"] = conn.execute(
+                    "SELECT COUNT(*) FROM comments WHERE sighting_doc_id = ?", (new,)
+                ).fetchone()[0]
+                sighting["latestComments"] = [{**loads(r["body"]), "commentID": str(r["id"])} for r in reversed(latest)]
+                conn.execute(
+                    "UPDATE sightings SET doc_id = ?, body = ? WHERE doc_id = ?", (new, _dumps(sighting), old)
+                )
+                renamed.setdefault(row["user_id"], {})[old] = new
+
+            for user_id, mapping in renamed.items():
+                user_row = conn.execute("SELECT body FROM users WHERE user_id = ?", (user_id,)).fetchone()
+                if user_row is None:
+                    continue
+                user = loads(user_row["body"])
+                user["sightings"] = [mapping.get(key, key) for key in user.get("sightings", [])]
+                conn.execute("UPDATE users SET body = ? WHERE user_id = ?", (_dumps(user), user_id))
+
+        checkpoint = rows[-1]["doc_id"] if len(rows) == batch_size else None
+        return sum(len(mapping) for mapping in renamed.values()), checkpoint
+
+    # Comments
+    def add_comment(self, sighting_id: str, comment: dict) -> Optional[Tuple[dict, dict]]:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT doc_id, body FROM sightings WHERE doc_id = ?", (str(sighting_id),)
+            ).fetchone()
+            if row is None:
+                return None
+            cursor = conn.execute(
+                "INSERT INTO comments (sighting_doc_id, body) VALUES (?, ?)",
+                (row["doc_id"], _dumps(comment)),
+            )
+            stored = {**comment, "commentID": str(cursor.lastrowid)}
+            sighting = loads(row["body"])
+            sighting["commentCount"] = sighting.get("commentCount", 0) + 1
+            sighting["latestComments"] = (sighting.get("latestComments", []) + [stored])[-LATEST_COMMENTS:]
+            conn.execute("UPDATE sightings SET body = ? WHERE doc_id = ?", (_dumps(sighting), row["doc_id"]))
+        return stored, sighting
+
+    def list_comments(
+        self, sighting_id: str, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        params: list = [str(sighting_id)]
+        keyset = ""
+        if cursor and cursor.isdigit():
+            keyset = "AND id < ?"
+            params.append(int(cursor))
+        rows = self._connect().execute(
+            f"""SELECT id, body FROM comments
+                WHERE sighting_doc_id = ? {keyset}
+                ORDER BY id DESC LIMIT ?""",
+            params + [limit + 1],
+        ).fetchall()
+        page = rows[:limit]
+        next_cursor = str(page[-1]["id"]) if len(rows) > limit else None
+        return [{**loads(r["body"]), "commentID": str(r["id"])} for r in page], next_cursor
+
+    # Leaderboard
+    def get_top_users(self, n: int) -> List[dict]:
+        rows = self._connect().execute(
+            "SELECT xp, body FROM users ORDER BY xp DESC LIMIT ?", (n,)
+        ).fetchall()
+        return [self._user_from_row(row) for row in rows]
+
+    def iter_users(self) -> Iterator[dict]:
+        for row in self._connect().execute("SELECT xp, body FROM users"):
+            yield self._user_from_row(row)
+
+    # Achievement progress
+    def save_progress(self, user_id: str, snapshot: dict) -> None:
+        self._connect().execute(
+            "INSERT OR REPLACE INTO progress (user_id, body) VALUES (?, ?)",
+            (str(user_id), _dumps(snapshot)),
+        )
+
+    def iter_progress(self) -> Iterator[Tuple[str, dict]]:
+        for row in self._connect().execute("SELECT user_id, body FROM progress"):
+            yield row["user_id"], loads(row["body"])
+
+    # Biodex completion
+    def save_biodex(self, user_id: str, document: dict) -> None:
+        self._connect().execute(
+            "INSERT OR REPLACE INTO biodex (user_id, body) VALUES (?, ?)",
+            (str(user_id), _dumps(document)),
+        )
+
+    def iter_biodex(self) -> Iterator[Tuple[str, dict]]:
+        for row in self._connect().execute("SELECT user_id, body FROM biodex"):
+            yield row["user_id"], loads(row["body"])
+
+    # Blobs
+    def _blob_file(self, digest: str) -> Path:
+        return self.blobs_dir / digest[:2] / digest
+
+    def _write_blob(self, data: bytes) -> str:
+        digest = content_digest(data)
+        target = self._blob_file(digest)
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, target)
+        return digest
+
+    def _write_blob_file(self, file_path: Path) -> str:
+        with open(file_path, "rb") as source:
+            digest = hashlib.file_digest(source, "sha256").hexdigest()
+        target = self._blob_file(digest)
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            shutil.copyfile(file_path, tmp)
+            os.replace(tmp, target)
+        return digest
+
+    def _register_blob(self, path: str, digest: str, content_type: str) -> str:
+        self._connect().execute(
+            "INSERT OR REPLACE INTO blobs (path, digest, content_type) VALUES (?, ?, ?)",
+            (path, digest, content_type),
+        )
+        return f"{self.base_url}/{digest}"
+
+    def upload_blob(self, path: str, data: bytes, content_type: str) -> str:
+        return self._register_blob(path, self._write_blob(data), content_type)
+
+    def blob_exists(self, path: str) -> bool:
+        row = self._connect().execute("SELECT 1 FROM blobs WHERE path = ?", (path,)).fetchone()
+        return row is not None
+
+    def blob_url(self, path: str) -> str:
+        row = self._connect().execute("SELECT digest FROM blobs WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            raise KeyError(path)
+        return f"{self.base_url}/{row['digest']}"
+
+    def upload_blob_from_file(self, path: str, file_path: Path, content_type: Optional[str] = None) -> str:
+        # Hashed and copied in chunks, never read whole
+        return self._register_blob(path, self._write_blob_file(Path(file_path)), content_type or "application/octet-stream")
+
+    def local_blob(self, digest: str) -> Optional[Tuple[Path, str]]:
+        row = self._connect().execute(
+            "SELECT content_type FROM blobs WHERE digest = ? LIMIT 1", (digest,)
+        ).fetchone()
+        target = self._blob_file(digest)
+        if row is None or not target.exists():
+            return None
+        return target, row["content_type"] or "application/octet-stream"
@@ -0,0 +1,235 @@
+"""
+Near-duplicate sightings for AnimaGo.
+Each sighting carries a 64-bit perceptual hash (pHash) of its photo.
+Recent sightings are indexed by that hash in BK-trees, one per user and
+one per small geo cell, so "is this a re-shot of something already
+submitted?" is a Hamming-radius lookup instead of a scan. A repeat from
+the same user gets the earlier sighting back (no inference, storage or
+XP); a match from someone else nearby lends its identification.
+"""
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image, ImageOps
+
+HASH_SIZE = 8  # 8x8 low-frequency DCT block -> 64 bits
+HASH_SAMPLE = 32  # Side of the greyscale thumbnail the DCT is taken over
+PRUNE_EVERY = 1024  # Additions between sweeps that drop expired sightings
+
+Cell = Tuple[int, int]
+
+
+def perceptual_hash(image: Image.Image) -> int:
+    """64-bit pHash: signs of the 8x8 lowest DCT frequencies of a 32x32 grey thumbnail, against their median."""
+    grey = ImageOps.exif_transpose(image).convert("L")
+    grey = grey.resize((HASH_SAMPLE, HASH_SAMPLE), Image.Resampling.BOX, reducing_gap=2.0)
+    dct = cv2.dct(np.asarray(grey, dtype=np.float32))[:HASH_SIZE, :HASH_SIZE]
+    # The DC term is overall brightness; it would skew the median
+    bits = dct > np.median(dct.ravel()[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hash_to_hex(value: int) -> str:
+    return format(value, "016x")
+
+
+def hash_from_hex(text: Optional[str]) -> Optional[int]:
+    try:
+        return int(text, 16) if text else None
+    except ValueError:
+        return None
+
+
+def _epoch(value) -> Optional[float]:
+    """Epoch seconds from a stored timestamp (datetime or ISO string); None if missing."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return value.timestamp() if isinstance(value, datetime) else None
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over 64-bit hashes with Hamming distance. A lookup
+    within radius r only descends into children whose edge distance d has
+    |d - distance(query, node)| <= r, so most of the tree is never visited.
+    """
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self):
+        # Node: [hash, items with exactly this hash, {edge distance: child}]
+        self._root = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, key: int, item):
+        self._size += 1
+        if self._root is None:
+            self._root = [key, [item], {}]
+            return
+        node = self._root
+        while True:
+            distance = (key ^ node[0]).bit_count()
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [key, [item], {}]
+                return
+            node = child
+
+    def search(self, key: int, radius: int) -> List[Tuple[int, object]]:
+        """(distance, item) for every item whose hash is within radius of key."""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node_key, items, children = stack.pop()
+            distance = (key ^ node_key).bit_count()
+            if distance <= radius:
+                found.extend((distance, item) for item in items)
+            for edge, child in children.items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return found
+
+
+@dataclass(frozen=True, slots=True)
+class RecentSighting:
+    """What is kept per indexed sighting: enough to answer a duplicate without fetching it."""
+    sightingID: str
+    userID: str
+    phash: int
+    captured: float  # Epoch seconds
+    cell: Optional[Cell]
+    species: Optional[str]
+    speciesID: Optional[int]
+    description: Optional[str]
+
+
+@dataclass(frozen=True, slots=True)
+class DuplicateMatch:
+    sighting: RecentSighting
+    distance: int
+    same_user: bool
+
+
+class DuplicateIndex:
+    """Recent sightings by perceptual hash, per user and per geo cell."""
+
+    def __init__(self, max_distance: int = 8, window: timedelta = timedelta(hours=1), cell_degrees: float = 0.01):
+        """
+        :param max_distance: Hash bits two photos may differ by and still count as the same shot
+        :param window: How far apart in capture time two near-duplicates can be
+        :param cell_degrees: Geo cell size; other users' photos are compared within the 3x3 cells around a capture
+        """
+        self.max_distance = max_distance
+        self.window = window.total_seconds()
+        self.cell_degrees = cell_degrees
+        self._by_user: Dict[str, BKTree] = {}
+        self._by_cell: Dict[Cell, BKTree] = {}
+        self._additions = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return sum(len(tree) for tree in self._by_user.values())
+
+    def cell_of(self, lat: Optional[float], lng: Optional[float]) -> Optional[Cell]:
+        if lat is None or lng is None:
+            return None
+        return math.floor(lat / self.cell_degrees), math.floor(lng / self.cell_degrees)
+
+    def seed(self, sightings: Iterable[dict]) -> Iterator[dict]:
+        """Index sightings while passing them through, so startup can share one scan of the store."""
+        cutoff = time.time() - self.window
+        for sighting in sightings:
+            captured = _epoch(sighting.get("timestamp") or sighting.get("createdAt"))
+            if captured is not None and captured >= cutoff:
+                self.add(sighting)
+            yield sighting
+
+    def add(self, sighting: dict):
+        """Index a stored sighting; ignored if it has no perceptual hash."""
+        phash = hash_from_hex(sighting.get("perceptualHash"))
+        captured = _epoch(sighting.get("timestamp") or sighting.get("createdAt"))
+        if phash is None or captured is None:
+            return
+        coordinates = sighting.get("coordinates") or {}
+        recent = RecentSighting(
+            sightingID=str(sighting["sightingID"]),
+            userID=str(sighting["userID"]),
+            phash=phash,
+            captured=captured,
+            cell=self.cell_of(coordinates.get("lat"), coordinates.get("lng")),
+            species=sighting.get("species"),
+            speciesID=sighting.get("speciesID"),
+            description=sighting.get("description"),
+        )
+        with self._lock:
+            self._by_user.setdefault(recent.userID, BKTree()).add(phash, recent)
+            if recent.cell is not None:
+                self._by_cell.setdefault(recent.cell, BKTree()).add(phash, recent)
+            self._additions += 1
+            if self._additions % PRUNE_EVERY == 0:
+                self._prune(time.time() - self.window)
+
+    def find(
+        self, phash: int, user_id: str, lat: Optional[float] = None, lng: Optional[float] = None,
+        captured: Optional[datetime] = None,
+    ) -> Optional[DuplicateMatch]:
+        """
+        The closest recent near-duplicate of a new capture: the user's own
+        sightings first (anywhere), then other users' in the cells around it.
+        """
+        at = (captured or datetime.now()).timestamp()
+        user_id = str(user_id)
+        with self._lock:
+            own = self._search(self._by_user.get(user_id), phash, at)
+            if own:
+                distance, sighting = min(own, key=lambda match: match[0])
+                return DuplicateMatch(sighting, distance, True)
+            cell = self.cell_of(lat, lng)
+            if cell is None:
+                return None
+            nearby = []
+            for row in range(cell[0] - 1, cell[0] + 2):
+                for col in range(cell[1] - 1, cell[1] + 2):
+                    nearby.extend(self._search(self._by_cell.get((row, col)), phash, at))
+        if not nearby:
+            return None
+        distance, sighting = min(nearby, key=lambda match: match[0])
+        return DuplicateMatch(sighting, distance, sighting.userID == user_id)
+
+    def _search(self, tree: Optional[BKTree], phash: int, at: float) -> List[Tuple[int, RecentSighting]]:
+        if tree is None:
+            return []
+        return [
+            (distance, sighting)
+            for distance, sighting in tree.search(phash, self.max_distance)
+            if abs(sighting.captured - at) <= self.window
+        ]
+
+    def _prune(self, cutoff: float):
+        """Rebuild every tree without the sightings captured before cutoff (BK-trees have no cheap delete)."""
+        for buckets in (self._by_user, self._by_cell):
+            for key, tree in list(buckets.items()):
+                kept = [sighting for _, sighting in tree.search(0, 64) if sighting.captured >= cutoff]
+                if not kept:
+                    del buckets[key]
+                elif len(kept) < len(tree):
+                    rebuilt = BKTree()
+                    for sighting in kept:
+                        rebuilt.add(sighting.phash, sighting)
+                    buckets[key] = rebuilt
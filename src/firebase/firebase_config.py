@@ -1,124 +1,87 @@
-import json
 import os
 from datetime import datetime
-from typing import List, Optional
-from uuid import UUID, uuid4
-
-import firebase_admin
-from firebase_admin import credentials, firestore, storage  # type: ignore
-from google.cloud.firestore import SERVER_TIMESTAMP
-from pydantic import BaseModel, Field, validator
-
-# Initialize Firebase
-cred = credentials.Certificate("src/firebase/anima-go-50202ba9d2b2.json")
-firebase_admin.initialize_app(cred, {
-    'storageBucket': 'anima-go.firebasestorage.app'
-})
-
-# Initialize Firestore and Storage
-db = firestore.client()
-bucket = storage.bucket(app=firebase_admin.get_app())
-
-# Verify bucket exists and create if needed
-if not bucket.exists():
-    bucket.create()
-    print(f"Created new bucket: {bucket.name}")
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+from uuid import uuid4
+
+try:
+    from ..config import (BLOB_BASE_URL, BLOBS_DIR, FIREBASE_BUCKET,
+                          FIREBASE_CREDENTIALS, LOCAL_DB_PATH, SIGHTING_XP,
+                          STORAGE_BACKEND)
+    from ..core import Account, Comment, Sighting
+    from ..core.serialization import decode, to_primitive
+    from ..datastore import create_datastore
+    from ..imaging import DerivativeWorker
+except ImportError:  # imported as the top-level ``firebase`` package by the Flet app
+    from config import (BLOB_BASE_URL, BLOBS_DIR, FIREBASE_BUCKET,
+                        FIREBASE_CREDENTIALS, LOCAL_DB_PATH, SIGHTING_XP,
+                        STORAGE_BACKEND)
+    from core import Account, Comment, Sighting
+    from core.serialization import decode, to_primitive
+    from datastore import create_datastore
+    from imaging import DerivativeWorker
+
+# Initialize the configured storage backend
+if STORAGE_BACKEND == "local":
+    store = create_datastore("local", db_path=LOCAL_DB_PATH, blobs_dir=BLOBS_DIR, base_url=BLOB_BASE_URL)
+    print(f"Using local storage at {LOCAL_DB_PATH}")
 else:
-    print(f"Using existing bucket: {bucket.name}")
-
-print("Firebase initialized successfully!")
-
-# Pydantic models
-class Coordinates(BaseModel):
-    lat: float
-    lng: float
-
-class Comment(BaseModel):
-    userID: UUID
-    comment: str
-    timestamp: datetime = Field(default_factory=lambda: datetime.now())
-
-class Sighting(BaseModel):
-    userID: UUID
-    timestamp: datetime
-    createdAt: datetime = Field(default_factory=lambda: datetime.now())
-    updatedAt: datetime = Field(default_factory=lambda: datetime.now())
-    coordinates: Coordinates
-    species: str
-    description: str
-    sightingID: UUID = Field(default_factory=uuid4)
-    comments: List[Comment] = []
-    sightingURL: Optional[str] = None
+    store = create_datastore("firebase", credentials_path=FIREBASE_CREDENTIALS, bucket_name=FIREBASE_BUCKET)
 
-class Achievement(BaseModel):
-    achievementName: str
-    dateAcquired: datetime
-
-class User(BaseModel):
-    userID: UUID = Field(default_factory=uuid4)
-    email: str
-    password: str
-    firstname: str
-    lastname: str
-    colorblind: bool = False
-    stickers: List[str] = [] # List of sticker URLs
-    sightings: List[UUID] = [] # List of sighting IDs
-    achievements: List[Achievement] = []
-    xp: int = 0
+# Background thumbnail/preview/full rendering for new sightings
+derivative_worker = DerivativeWorker(store)
 
 # Repository functions
 def add_user(user_data: dict):
     try:
-        # Convert string UUID to UUID object if needed
-        if isinstance(user_data.get('userID'), str):
-            user_data['userID'] = UUID(user_data['userID'])
-        
-        # Convert string UUIDs in sightings list if needed
-        if 'sightings' in user_data:
-            user_data['sightings'] = [UUID(s) if isinstance(s, str) else s for s in user_data['sightings']]
+        # Build the Account record; string UUIDs and timestamps are coerced
+        user = decode(Account, user_data)
         
-        # Create User object to validate data
-        user = User(**user_data)
+        # Encode once into a plain document for storage
+        user_dict = to_primitive(user)
         
-        # Convert back to dict for Firestore
-        user_dict = json.loads(json.dumps(user.dict(), default=custom_encoder))
-        
-        # Add to Firestore
-        db.collection('users').document(str(user.userID)).set(user_dict)
+        # Add to storage
+        store.add_user(user_dict)
         print("User added successfully!")
         return user_dict
     except Exception as e:
         print(f"Error adding user: {str(e)}")
         raise e
 
-def add_sighting(sighting_data: dict, user_id: str, image_bytes: bytes):
+def add_sighting(sighting_data: dict, user_id: str, image: Union[bytes, Path], image_hash: Optional[str] = None,
+                 content_type: str = 'image/jpeg') -> bool:
     """
     Add a sighting to Firebase.
     
     :param sighting_data: Dictionary containing sighting details
     :param user_id: UUID of the user
-    :param image_bytes: Raw bytes of the image
+    :param image: Raw bytes of the image, or a spooled upload file (consumed: streamed to
+        storage, then deleted by the derivative worker)
+    :param image_hash: SHA-256 of a spooled upload, computed while it was received
+    :param content_type: Content type of the image
+    :return: False if a sighting with the client-generated sightingID already exists (nothing
+        is stored and no XP is awarded)
     """
     try:
-        # Create sightingID
-        sighting_id = uuid4()
+        # Keep a client-generated sightingID (offline captures), otherwise create one
+        sighting_id = sighting_data.get('sightingID') or uuid4()
         sighting_data['sightingID'] = sighting_id
         sighting_data['userID'] = user_id  # Ensure userID is a string to match schema
 
-        # Comments list initially empty
-        sighting_data['comments'] = []
+        # No comments yet; they live in a subcollection, only the count and newest few are inline
+        sighting_data['commentCount'] = 0
+        sighting_data['latestComments'] = []
 
-        # Upload the image to storage
-        destination_blob_name = f"sighting_pics/{user_id}/{sighting_id}.jpg"
-        blob = bucket.blob(destination_blob_name)
-        blob.upload_from_string(image_bytes, content_type='image/jpeg')
-        print(f"Image uploaded to {destination_blob_name}")
-        
-        # Make the blob publicly accessible
-        blob.make_public()
+        # Upload the image under its content hash (skipped if already stored)
+        if isinstance(image, Path):
+            image_hash, public_url = store.put_image_file(image, image_hash, content_type)
+        else:
+            image_hash, public_url = store.put_image(image, content_type)
+        print(f"Image stored as {image_hash}")
         
         # Set the sightingURL to the public URL
-        sighting_data['sightingURL'] = blob.public_url
+        sighting_data['imageHash'] = image_hash
+        sighting_data['sightingURL'] = public_url
 
         # Add timestamps
         now = datetime.now()
@@ -126,29 +89,32 @@ def add_sighting(sighting_data: dict, user_id: str, image_bytes: bytes):
         sighting_data['updatedAt'] = now
 
         # Add the sighting to the 'sightings_map' collection
-        sighting = Sighting(**sighting_data)
-        sighting_dict = json.loads(json.dumps(sighting.dict(), default=custom_encoder))
+        sighting = decode(Sighting, sighting_data)
+        sighting_dict = to_primitive(sighting)
         
-        # Add to sightings_map collection with auto-generated document ID
-        doc_ref = db.collection('sightings_map').document()
-        doc_ref.set(sighting_dict)
-        sighting_doc_id = doc_ref.id
-        print(f"Sighting added with ID: {sighting_doc_id}")
+        # Add to sightings_map collection, keyed by the sightingID
+        sighting_key = store.add_sighting(sighting_dict)
+        if sighting_key is None:
+            # A concurrent retry of the same upload stored it first
+            print(f"Sighting {sighting_id} already exists")
+            if isinstance(image, Path):
+                image.unlink(missing_ok=True)
+            return False
+        print(f"Sighting added with ID: {sighting_key}")
         
-        # Update user's sightings list with the sightings_map document ID
-        user_ref = db.collection('users').where('userID', '==', user_id).limit(1)
-        result = user_ref.get()
-
-        if result:
-            doc_ref = result[0].reference
-            doc_ref.update({
-                'sightings': firestore.ArrayUnion([sighting_doc_id]),  # Store the sightings_map document ID
-                'xp': firestore.Increment(100)
-            })
-            print(f"User {user_id} updated with sighting {sighting_doc_id}")
+        # Render thumb/preview/full sizes in the background
+        derivative_worker.submit(sighting_key, image_hash, image)
+        image = None  # Now owned by the worker
+        
+        # Update user's sightings list with the sightingID
+        store.record_user_sighting(user_id, sighting_key, xp=SIGHTING_XP)
+        print(f"User {user_id} updated with sighting {sighting_key}")
+        return True
             
     except Exception as e:
         print(f"Error adding sighting: {str(e)}")
+        if isinstance(image, Path):
+            image.unlink(missing_ok=True)
         raise e
 
 def upload_sighting_image(destination_blob_name, from_file_name: str, user_id: str):
@@ -159,53 +125,58 @@ def upload_sighting_image(destination_blob_name, from_file_name: str, user_id: s
     :param user_id: The ID of the user.
     """
     file_path = os.path.join("src/temp", from_file_name)
-    blob = bucket.blob(destination_blob_name)
-    blob.upload_from_filename(file_path)
+    store.upload_blob_from_file(destination_blob_name, file_path)
     print(f"File {file_path} uploaded to {destination_blob_name} in sighting_pics bucket.")
 
-def add_comment(sighting_id: str, comment_by_user_id: str, comment: str):
-    sighting_ref = db.collection('sightings_map').where('sightingID', '==', str(sighting_id)).limit(1)
-    result = sighting_ref.get()
-
-    if result:
-        doc_ref = result[0].reference
-
-        # Update the document with the new comment
-        doc_ref.update({
-            'comments': firestore.ArrayUnion([{
-                'userID': comment_by_user_id,
-                'comment': comment,
-                'timestamp': datetime.now()
-            }])
-        })
+def add_comment(sighting_id: str, comment_by_user_id: str, comment: str) -> Optional[Tuple[dict, dict]]:
+    """
+    Post a comment on a sighting.
+    
+    :return: (stored comment, updated sighting), or None if the sighting does not exist
+    """
+    result = store.add_comment(sighting_id, to_primitive(decode(Comment, {
+        'userID': comment_by_user_id,
+        'comment': comment,
+    })))
     
-    print(f"Comment added to sighting {sighting_id} by user {comment_by_user_id}.")
+    if result is not None:
+        print(f"Comment added to sighting {sighting_id} by user {comment_by_user_id}.")
+    else:
+        print(f"Sighting {sighting_id} not found")
+    return result
 
-def custom_encoder(obj):
-    if isinstance(obj, UUID):
-        return str(obj)
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+def get_comments_page(sighting_id: str, limit: int = 20, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+    """
+    Fetch one page of a sighting's comments, newest first.
+    
+    :param sighting_id: sightingID of the sighting
+    :param limit: Page size
+    :param cursor: next_cursor from the previous page, or None for the first page
+    :return: (comments, next_cursor); next_cursor is None on the last page
+    """
+    try:
+        return store.list_comments(sighting_id, limit, cursor)
+    except Exception as e:
+        print(f"Error fetching comments page: {str(e)}")
+        return [], None
 
 def get_top_users(n):
-    users_ref = db.collection('users')
-    query = users_ref.order_by('xp', direction=firestore.Query.DESCENDING)
-    results = query.stream()
+    return store.get_top_users(n)
 
-    # Use a dictionary to track unique users by userID
-    unique_users = {}
-    for user in results:
-        user_dict = user.to_dict()
-        user_id = user_dict.get('userID')
-        if user_id and user_id not in unique_users:
-            unique_users[user_id] = user_dict
-            if len(unique_users) >= n:
-                break
-
-    # Convert back to list and maintain order
-    top_users = list(unique_users.values())
-    return top_users[:n]
+def get_user_sightings_page(user_id: str, limit: int = 24, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+    """
+    Fetch one page of a user's sightings, newest first.
+    
+    :param user_id: UUID of the user
+    :param limit: Page size
+    :param cursor: next_cursor from the previous page, or None for the first page
+    :return: (sightings, next_cursor); next_cursor is None on the last page
+    """
+    try:
+        return store.list_user_sightings(user_id, limit, cursor)
+    except Exception as e:
+        print(f"Error fetching user sightings page: {str(e)}")
+        return [], None
 
 def get_user_sightings(user_id: str) -> List[dict]:
     """
@@ -216,28 +187,18 @@ def get_user_sightings(user_id: str) -> List[dict]:
     """
     try:
         # Get user document
-        user_ref = db.collection('users').document(user_id)
-        user_doc = user_ref.get()
+        user_data = store.get_user(user_id)
         
-        if not user_doc.exists:
+        if user_data is None:
             print(f"User {user_id} not found")
             return []
             
-        # Get sighting IDs from user document
-        user_data = user_doc.to_dict()
+        # Get sighting IDs (document keys) from user document
         sighting_ids = user_data.get('sightings', [])
         print(f"Found {len(sighting_ids)} sighting IDs for user {user_id}")
         
-        # Fetch full sighting details
-        sightings = []
-        for sighting_id in sighting_ids:
-            sighting_doc = db.collection('sightings_map').document(sighting_id).get()
-            if sighting_doc.exists:
-                sighting_data = sighting_doc.to_dict()
-                sightings.append(sighting_data)
-                print(f"Found sighting {sighting_id}")
-            else:
-                print(f"Sighting {sighting_id} not found")
+        # Fetch full sighting details in one batch
+        sightings = store.get_sightings(sighting_ids)
         
         print(f"Returning {len(sightings)} sightings")
         return sightings
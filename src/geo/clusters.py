@@ -0,0 +1,135 @@
+"""
+Hierarchical marker clustering for dense sighting maps.
+Points are aggregated per zoom level on a grid of Web Mercator cells
+whose size is a fixed number of screen pixels, so a viewport touches a
+bounded number of cells at any zoom. Cells at zoom z are exactly the
+parents of cells at z + 1, which lets each level be built from the one
+below it and lets a new sighting update one cell per level.
+"""
+
+import math
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .tiles import MAX_LATITUDE
+
+# (sum of x, sum of y, count) in unit Web Mercator space
+Cell = List[float]
+
+
+def _project(lat, lng) -> Tuple[np.ndarray, np.ndarray]:
+    """WGS84 -> unit Web Mercator [0, 1) coordinates."""
+    lat = np.clip(np.asarray(lat, dtype=np.float64), -MAX_LATITUDE, MAX_LATITUDE)
+    lng = np.asarray(lng, dtype=np.float64)
+    sin_lat = np.sin(np.radians(lat))
+    x = (lng + 180.0) / 360.0
+    y = 0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return np.clip(x, 0.0, 1.0 - 1e-12), np.clip(y, 0.0, 1.0 - 1e-12)
+
+
+def _unproject(x: float, y: float) -> Tuple[float, float]:
+    """Unit Web Mercator -> (lat, lng)."""
+    lng = x * 360.0 - 180.0
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y))))
+    return lat, lng
+
+
+class ClusterIndex:
+    def __init__(self, min_zoom: int = 0, max_zoom: int = 16, radius: int = 64, extent: int = 256):
+        """
+        :param radius: Cluster cell size in screen pixels (rounded to a power of two)
+        :param extent: Tile size in pixels
+        """
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        # Cells must halve exactly between zooms for the levels to nest
+        self.cell_bits = max(0, int(round(math.log2(extent / radius))))
+        self._levels: Dict[int, Dict[Tuple[int, int], Cell]] = {
+            z: {} for z in range(min_zoom, max_zoom + 1)
+        }
+        self._lock = threading.Lock()
+
+    def _cells_per_axis(self, zoom: int) -> int:
+        return 1 << (zoom + self.cell_bits)
+
+    def __len__(self):
+        with self._lock:
+            return int(sum(cell[2] for cell in self._levels[self.min_zoom].values()))
+
+    def load(self, lats, lngs):
+        """Rebuild every level from scratch."""
+        x, y = _project(lats, lngs)
+        n = self._cells_per_axis(self.max_zoom)
+        cx = (x * n).astype(np.int64)
+        cy = (y * n).astype(np.int64)
+        sx, sy, count = x, y, np.ones_like(x)
+
+        levels = {}
+        for z in range(self.max_zoom, self.min_zoom - 1, -1):
+            # Merge everything that landed in the same cell at this zoom
+            keys = cx * (self._cells_per_axis(z)) + cy
+            unique, inverse = np.unique(keys, return_inverse=True)
+            sx = np.bincount(inverse, weights=sx, minlength=len(unique))
+            sy = np.bincount(inverse, weights=sy, minlength=len(unique))
+            count = np.bincount(inverse, weights=count, minlength=len(unique))
+            first = np.zeros(len(unique), dtype=np.int64)
+            first[inverse] = np.arange(len(inverse))
+            cx, cy = cx[first], cy[first]
+            levels[z] = {
+                (a, b): [p, q, c]
+                for a, b, p, q, c in zip(cx.tolist(), cy.tolist(), sx.tolist(), sy.tolist(), count.tolist())
+            }
+            # Parent cells for the next (coarser) zoom
+            cx, cy = cx >> 1, cy >> 1
+
+        with self._lock:
+            self._levels = levels
+
+    def add(self, lat: float, lng: float):
+        """Add one sighting: O(number of zoom levels)."""
+        x, y = _project(lat, lng)
+        x, y = float(x), float(y)
+        with self._lock:
+            for z, cells in self._levels.items():
+                n = self._cells_per_axis(z)
+                key = (int(x * n), int(y * n))
+                cell = cells.get(key)
+                if cell is None:
+                    cells[key] = [x, y, 1.0]
+                else:
+                    cell[0] += x
+                    cell[1] += y
+                    cell[2] += 1.0
+
+    def query(self, west: float, south: float, east: float, north: float, zoom: int) -> List[dict]:
+        """Cluster centroids and counts inside a bounding box at a zoom level."""
+        zoom = min(max(int(zoom), self.min_zoom), self.max_zoom)
+        if west > east:
+            # Bounding box crosses the antimeridian
+            return self.query(west, south, 180.0, north, zoom) + self.query(-180.0, south, east, north, zoom)
+
+        (x0, x1), (y1, y0) = _project([south, north], [west, east])
+        n = self._cells_per_axis(zoom)
+        cx0, cx1 = int(x0 * n), int(x1 * n)
+        cy0, cy1 = int(y0 * n), int(y1 * n)
+
+        clusters = []
+        with self._lock:
+            cells = self._levels[zoom]
+            if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) <= len(cells):
+                candidates = (
+                    ((cx, cy), cells.get((cx, cy)))
+                    for cx in range(cx0, cx1 + 1)
+                    for cy in range(cy0, cy1 + 1)
+                )
+            else:
+                candidates = iter(cells.items())
+            for (cx, cy), cell in candidates:
+                if cell is None or not (cx0 <= cx <= cx1 and cy0 <= cy <= cy1):
+                    continue
+                sx, sy, count = cell
+                lat, lng = _unproject(sx / count, sy / count)
+                clusters.append({"lat": lat, "lng": lng, "count": int(count)})
+        return clusters
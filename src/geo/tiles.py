@@ -0,0 +1,267 @@
+"""
+Slippy-map tiles for the live tracking map.
+Serves base tiles from a local MBTiles archive and composites sighting
+markers onto each tile.
+"""
+
+import io
+import math
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+TILE_SIZE = 256
+MAX_ZOOM = 19
+OCEAN_COLOR = (170, 211, 223)
+MARKER_COLOR = (255, 69, 0)
+MARKER_RADIUS = 5
+# Web Mercator is undefined at the poles
+MAX_LATITUDE = 85.0511287798
+
+
+def lnglat_to_pixels(lat, lng, zoom: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Project WGS84 coordinates to global Web Mercator pixel coordinates at a zoom level."""
+    lat = np.clip(np.asarray(lat, dtype=np.float64), -MAX_LATITUDE, MAX_LATITUDE)
+    lng = np.asarray(lng, dtype=np.float64)
+    world = TILE_SIZE * (1 << zoom)
+    x = (lng + 180.0) / 360.0 * world
+    sin_lat = np.sin(np.radians(lat))
+    y = (0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)) * world
+    return x, y
+
+
+def tile_for(lat: float, lng: float, zoom: int) -> Tuple[int, int]:
+    """Tile (x, y) containing a coordinate."""
+    x, y = lnglat_to_pixels(lat, lng, zoom)
+    last = (1 << zoom) - 1
+    return min(int(x) // TILE_SIZE, last), min(int(y) // TILE_SIZE, last)
+
+
+def _disc_offsets(radius: int) -> np.ndarray:
+    dy, dx = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+    inside = dy * dy + dx * dx <= radius * radius
+    return np.stack([dy[inside], dx[inside]], axis=1)
+
+
+def _encode_png(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+class MBTilesArchive:
+    def __init__(self, path: Path, hot_tiles: int = 1024, mmap_size: int = 256 * 1024 * 1024):
+        """Open an MBTiles archive read-only, memory-mapped, with an LRU of hot tiles."""
+        self.path = Path(path)
+        self.hot_tiles = hot_tiles
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+        self._hot: "OrderedDict[Tuple[int, int, int], Optional[bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.metadata = {
+            row[0]: row[1] for row in self._connect().execute("SELECT name, value FROM metadata")
+        }
+        self.min_zoom = int(self.metadata.get("minzoom", 0))
+        self.max_zoom = int(self.metadata.get("maxzoom", 0))
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            self._local.conn = conn
+        return conn
+
+    def get_tile(self, z: int, x: int, y: int) -> Optional[bytes]:
+        """Raw tile bytes in XYZ addressing, or None if the archive has no such tile."""
+        key = (z, x, y)
+        with self._lock:
+            if key in self._hot:
+                self._hot.move_to_end(key)
+                return self._hot[key]
+
+        # MBTiles rows are stored in TMS order (y flipped)
+        row = self._connect().execute(
+            "SELECT tile_data FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+            (z, x, (1 << z) - 1 - y),
+        ).fetchone()
+        data = bytes(row[0]) if row else None
+
+        with self._lock:
+            self._hot[key] = data
+            while len(self._hot) > self.hot_tiles:
+                self._hot.popitem(last=False)
+        return data
+
+
+class TileOverlay:
+    def __init__(self):
+        """Sighting positions, held as NumPy arrays for per-tile selection."""
+        self._lat = np.empty(0)
+        self._lng = np.empty(0)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._lat)
+
+    def set_points(self, lats, lngs):
+        with self._lock:
+            self._lat = np.asarray(lats, dtype=np.float64)
+            self._lng = np.asarray(lngs, dtype=np.float64)
+
+    def add_point(self, lat: float, lng: float):
+        with self._lock:
+            self._lat = np.append(self._lat, lat)
+            self._lng = np.append(self._lng, lng)
+
+    def points_in_tile(self, z: int, x: int, y: int, margin: int) -> np.ndarray:
+        """(N, 2) integer [row, col] tile-local pixels of markers within margin of the tile."""
+        with self._lock:
+            lat, lng = self._lat, self._lng
+        if not len(lat):
+            return np.empty((0, 2), dtype=np.int64)
+        px, py = lnglat_to_pixels(lat, lng, z)
+        px -= x * TILE_SIZE
+        py -= y * TILE_SIZE
+        inside = (px > -margin) & (px < TILE_SIZE + margin) & (py > -margin) & (py < TILE_SIZE + margin)
+        return np.stack([py[inside], px[inside]], axis=1).astype(np.int64)
+
+
+class TileServer:
+    def __init__(self, archive: Optional[MBTilesArchive], overlay: TileOverlay, cached_tiles: int = 2048):
+        """Composite overlay markers onto base tiles, caching the results."""
+        self.archive = archive
+        self.overlay = overlay
+        self.cached_tiles = cached_tiles
+        self._composed: "OrderedDict[Tuple[int, int, int], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._marker_offsets = _disc_offsets(MARKER_RADIUS)
+        self._blank = _encode_png(Image.new("RGB", (TILE_SIZE, TILE_SIZE), OCEAN_COLOR))
+
+    def _base_tile(self, z: int, x: int, y: int) -> bytes:
+        """Base tile bytes; beyond the archive's max zoom, upscale the covering ancestor."""
+        if self.archive is None:
+            return self._blank
+        if z <= self.archive.max_zoom:
+            return self.archive.get_tile(z, x, y) or self._blank
+
+        depth = z - self.archive.max_zoom
+        ancestor = self.archive.get_tile(self.archive.max_zoom, x >> depth, y >> depth)
+        if ancestor is None:
+            return self._blank
+        span = TILE_SIZE >> depth
+        if span == 0:
+            span = 1
+        left = (x & ((1 << depth) - 1)) * TILE_SIZE // (1 << depth)
+        top = (y & ((1 << depth) - 1)) * TILE_SIZE // (1 << depth)
+        with Image.open(io.BytesIO(ancestor)) as image:
+            region = image.convert("RGB").crop((left, top, left + span, top + span))
+        return _encode_png(region.resize((TILE_SIZE, TILE_SIZE), Image.Resampling.BILINEAR))
+
+    def render_tile(self, z: int, x: int, y: int) -> bytes:
+        """PNG bytes for tile (z, x, y) with sighting markers drawn on top."""
+        if not (0 <= z <= MAX_ZOOM and 0 <= x < (1 << z) and 0 <= y < (1 << z)):
+            raise ValueError(f"Invalid tile {z}/{x}/{y}")
+        key = (z, x, y)
+        with self._lock:
+            if key in self._composed:
+                self._composed.move_to_end(key)
+                return self._composed[key]
+
+        base = self._base_tile(z, x, y)
+        centers = self.overlay.points_in_tile(z, x, y, MARKER_RADIUS)
+        if len(centers):
+            with Image.open(io.BytesIO(base)) as image:
+                pixels = np.array(image.convert("RGB"))
+            points = (centers[:, None, :] + self._marker_offsets[None, :, :]).reshape(-1, 2)
+            visible = (
+                (points[:, 0] >= 0) & (points[:, 0] < TILE_SIZE) &
+                (points[:, 1] >= 0) & (points[:, 1] < TILE_SIZE)
+            )
+            points = points[visible]
+            pixels[points[:, 0], points[:, 1]] = MARKER_COLOR
+            tile = _encode_png(Image.fromarray(pixels))
+        else:
+            # Nothing to draw: pass the archived bytes straight through
+            tile = base
+
+        with self._lock:
+            self._composed[key] = tile
+            while len(self._composed) > self.cached_tiles:
+                self._composed.popitem(last=False)
+        return tile
+
+    def add_sighting(self, lat: float, lng: float):
+        """Add a marker and drop only the cached tiles it touches."""
+        self.overlay.add_point(lat, lng)
+        with self._lock:
+            stale = []
+            for z, x, y in self._composed:
+                px, py = lnglat_to_pixels(lat, lng, z)
+                px, py = float(px) - x * TILE_SIZE, float(py) - y * TILE_SIZE
+                if -MARKER_RADIUS < px < TILE_SIZE + MARKER_RADIUS and -MARKER_RADIUS < py < TILE_SIZE + MARKER_RADIUS:
+                    stale.append((z, x, y))
+            for key in stale:
+                del self._composed[key]
+
+    def load_points(self, lats, lngs):
+        """Replace the overlay markers."""
+        self.overlay.set_points(lats, lngs)
+        with self._lock:
+            self._composed.clear()
+
+
+def build_mbtiles_from_equirectangular(image_path: Path, out_path: Path, max_zoom: int = 4) -> Path:
+    """
+    Reproject an equirectangular world image into a Web Mercator MBTiles
+    archive. Used to produce the bundled offline sample from image.png.
+    """
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with Image.open(image_path) as source:
+        world = np.asarray(source.convert("RGB"))
+    src_h, src_w = world.shape[:2]
+
+    tmp_path = out_path.with_suffix(".tmp")
+    tmp_path.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp_path)
+    conn.executescript("""
+        CREATE TABLE metadata (name TEXT, value TEXT);
+        CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB);
+        CREATE UNIQUE INDEX tile_index ON tiles (zoom_level, tile_column, tile_row);
+    """)
+    conn.executemany("INSERT INTO metadata VALUES (?, ?)", [
+        ("name", "AnimaGo sample world"),
+        ("format", "png"),
+        ("type", "baselayer"),
+        ("minzoom", "0"),
+        ("maxzoom", str(max_zoom)),
+        ("bounds", f"-180,{-MAX_LATITUDE},180,{MAX_LATITUDE}"),
+    ])
+
+    offsets = np.arange(TILE_SIZE) + 0.5
+    for z in range(max_zoom + 1):
+        n = 1 << z
+        world_px = TILE_SIZE * n
+        for x in range(n):
+            # Longitude depends only on the column, latitude only on the row
+            lng = (x * TILE_SIZE + offsets) / world_px * 360.0 - 180.0
+            src_x = np.clip(((lng + 180.0) / 360.0 * src_w).astype(np.int64), 0, src_w - 1)
+            for y in range(n):
+                merc = math.pi * (1 - 2 * (y * TILE_SIZE + offsets) / world_px)
+                lat = np.degrees(np.arctan(np.sinh(merc)))
+                src_y = np.clip(((90.0 - lat) / 180.0 * src_h).astype(np.int64), 0, src_h - 1)
+                tile = Image.fromarray(world[src_y[:, None], src_x[None, :]])
+                conn.execute(
+                    "INSERT INTO tiles VALUES (?, ?, ?, ?)",
+                    (z, x, n - 1 - y, sqlite3.Binary(_encode_png(tile))),
+                )
+    conn.commit()
+    conn.close()
+    tmp_path.replace(out_path)
+    return out_path
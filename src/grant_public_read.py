@@ -0,0 +1,31 @@
+"""
+One-time ops step: make sighting images publicly readable.
+Enables uniform bucket-level access on the Firebase Storage bucket and
+grants allUsers roles/storage.objectViewer, so the stored sightingURL /
+thumbURL links work without per-object ACLs. This makes every object in
+the bucket world-readable and needs bucket-admin credentials; the server
+and the app never do it themselves. Running it again is a no-op.
+
+Run from src/:  python grant_public_read.py
+"""
+
+import sys
+
+from config import FIREBASE_BUCKET, STORAGE_BACKEND
+from firebase.firebase_config import derivative_worker, store
+
+
+def main():
+    if STORAGE_BACKEND != "firebase":
+        sys.exit(f"Nothing to do: the {STORAGE_BACKEND} backend serves blobs itself")
+    try:
+        changed = store.grant_public_read()
+    except PermissionError as e:
+        sys.exit(str(e))
+    finally:
+        derivative_worker.shutdown()
+    print(f"Granted public read on {FIREBASE_BUCKET}" if changed else f"{FIREBASE_BUCKET} is already publicly readable")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Image derivatives for AnimaGo.
+Renders the fixed-size thumbnail/preview/full variants served to clients.
+"""
+
+import io
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from PIL import Image, ImageOps, features
+
+logger = logging.getLogger(__name__)
+
+# Longest edge in pixels for each derivative
+DERIVATIVE_SIZES = {
+    "thumb": 256,
+    "preview": 768,
+    "full": 1600,
+}
+DERIVATIVE_QUALITY = 80
+
+
+def derivative_format() -> Tuple[str, str, str]:
+    """Return (PIL format, content type, extension), preferring WebP when available."""
+    if features.check("webp"):
+        return "WEBP", "image/webp", "webp"
+    return "JPEG", "image/jpeg", "jpg"
+
+
+def derivative_blob_path(digest: str, name: str, extension: str) -> str:
+    """Blob path of a derivative, stored alongside the original image."""
+    return f"sighting_pics/{digest}/{name}.{extension}"
+
+
+def render_derivatives(image: Union[bytes, Path]) -> Dict[str, bytes]:
+    """Render every size in DERIVATIVE_SIZES from the original image (bytes or a file)."""
+    image_format, _, _ = derivative_format()
+    largest = max(DERIVATIVE_SIZES.values())
+    if image_format == "WEBP":
+        save_options = {"quality": DERIVATIVE_QUALITY, "method": 4}
+    else:
+        save_options = {"quality": DERIVATIVE_QUALITY, "optimize": True, "progressive": True}
+
+    with Image.open(io.BytesIO(image) if isinstance(image, bytes) else image) as source:
+        # JPEG only: decode at a reduced DCT scale that is still >= the largest size
+        source.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(source).convert("RGB")
+
+    derivatives = {}
+    # Largest first, so each smaller size is downsampled from the previous one
+    for name, edge in sorted(DERIVATIVE_SIZES.items(), key=lambda item: -item[1]):
+        image.thumbnail((edge, edge), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        buffer = io.BytesIO()
+        image.save(buffer, format=image_format, **save_options)
+        derivatives[name] = buffer.getvalue()
+    return derivatives
+
+
+class DerivativeWorker:
+    def __init__(self, store, max_workers: int = 2):
+        """Render and upload derivatives off the request path."""
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="derivatives")
+
+    def submit(self, sighting_id: str, digest: str, image: Union[bytes, Path]) -> Future:
+        """
+        Queue derivative generation for a stored sighting. A Path is a spooled
+        upload handed over by the caller; it is deleted once rendering is done.
+        Failures are logged here; the future then resolves to None.
+        """
+        return self._executor.submit(self._run, sighting_id, digest, image)
+
+    def _run(self, sighting_id: str, digest: str, image: Union[bytes, Path]) -> Optional[Dict[str, str]]:
+        try:
+            _, content_type, extension = derivative_format()
+            paths = {name: derivative_blob_path(digest, name, extension) for name in DERIVATIVE_SIZES}
+
+            # Same photo seen before: the derivatives already exist
+            if all(self.store.blob_exists(path) for path in paths.values()):
+                urls = {name: self.store.blob_url(path) for name, path in paths.items()}
+            else:
+                rendered = render_derivatives(image)
+                urls = {
+                    name: self.store.upload_blob(paths[name], data, content_type)
+                    for name, data in rendered.items()
+                }
+
+            self.store.update_sighting(sighting_id, {f"{name}URL": url for name, url in urls.items()})
+            print(f"Derivatives ready for sighting {sighting_id}")
+            return urls
+        except Exception:
+            # Nobody waits on the future, so an exception raised here would never be seen
+            logger.exception(f"Error generating derivatives for sighting {sighting_id}; it keeps only sightingURL")
+            return None
+        finally:
+            if isinstance(image, Path):
+                image.unlink(missing_ok=True)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,175 @@
+"""
+Leaderboards for AnimaGo.
+Each board keeps every user's score in one list sorted by (-score, userID),
+so a user's rank is a bisect, a page is a slice and the window around a
+user is a slice at their rank. Daily and weekly boards are counters for
+the current period, reset when the period rolls over; XP awards update
+all boards incrementally.
+"""
+
+import bisect
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+PERIODS = ("daily", "weekly", "all_time")
+
+
+def period_start(period: str, at: datetime) -> Optional[datetime]:
+    """Start of the period containing ``at``; None for the all-time board."""
+    day = at.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "daily":
+        return day
+    if period == "weekly":
+        return day - timedelta(days=day.weekday())  # ISO weeks start on Monday
+    return None
+
+
+def _encode_cursor(score: int, user_id: str) -> str:
+    return f"{score}:{user_id}"
+
+
+def _decode_cursor(cursor: str) -> Tuple[int, str]:
+    score, _, user_id = cursor.partition(":")
+    return -int(score), user_id
+
+
+class RankedBoard:
+    """Scores kept sorted by (-score, userID); ties rank by userID."""
+
+    def __init__(self):
+        self._order: List[Tuple[int, str]] = []
+        self._scores: Dict[str, int] = {}
+
+    @classmethod
+    def from_scores(cls, scores: Dict[str, int]) -> "RankedBoard":
+        """Build a board with one sort instead of n inserts."""
+        board = cls()
+        board._scores = {user_id: score for user_id, score in scores.items() if score}
+        board._order = sorted((-score, user_id) for user_id, score in board._scores.items())
+        return board
+
+    def __len__(self):
+        return len(self._order)
+
+    def score(self, user_id: str) -> Optional[int]:
+        return self._scores.get(user_id)
+
+    def set(self, user_id: str, score: int):
+        old = self._scores.get(user_id)
+        if old is not None:
+            del self._order[bisect.bisect_left(self._order, (-old, user_id))]
+        self._scores[user_id] = score
+        bisect.insort(self._order, (-score, user_id))
+
+    def add(self, user_id: str, delta: int) -> int:
+        score = self._scores.get(user_id, 0) + delta
+        self.set(user_id, score)
+        return score
+
+    def rank(self, user_id: str) -> Optional[int]:
+        """1-based rank, or None if the user has no score on this board."""
+        score = self._scores.get(user_id)
+        if score is None:
+            return None
+        return bisect.bisect_left(self._order, (-score, user_id)) + 1
+
+    def slice(self, start: int, stop: int) -> List[Tuple[int, str, int]]:
+        """(rank, userID, score) for 0-based positions start..stop."""
+        start = max(0, start)
+        return [(start + i + 1, user_id, -key) for i, (key, user_id) in enumerate(self._order[start:stop])]
+
+    def after(self, key: Tuple[int, str]) -> int:
+        """Position of the first entry ranked below key."""
+        return bisect.bisect_right(self._order, key)
+
+
+class Leaderboard:
+    def __init__(self, clock: Callable[[], datetime] = datetime.now):
+        self.clock = clock
+        self._boards: Dict[str, RankedBoard] = {period: RankedBoard() for period in PERIODS}
+        self._starts: Dict[str, Optional[datetime]] = {period: period_start(period, clock()) for period in PERIODS}
+        self._profiles: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _remember(self, user: dict):
+        self._profiles[str(user["userID"])] = {
+            "firstname": user.get("firstname", ""),
+            "lastname": user.get("lastname", ""),
+        }
+
+    def load(self, users: Iterable[dict]):
+        """Build the all-time board from stored user XP."""
+        scores = {}
+        with self._lock:
+            for user in users:
+                if user.get("userID") is None:
+                    continue
+                self._remember(user)
+                scores[str(user["userID"])] = int(user.get("xp") or 0)
+            self._boards["all_time"] = RankedBoard.from_scores(scores)
+
+    def seed(self, period: str, scores: Dict[str, int]):
+        """Set a period board's scores, e.g. replayed from the current period's sightings."""
+        board = RankedBoard.from_scores({str(user_id): int(score) for user_id, score in scores.items()})
+        with self._lock:
+            self._boards[period] = board
+            self._starts[period] = period_start(period, self.clock())
+
+    def _roll(self):
+        # Start a fresh counter when the day or week changes
+        now = self.clock()
+        for period in PERIODS:
+            start = period_start(period, now)
+            if start != self._starts[period]:
+                self._boards[period] = RankedBoard()
+                self._starts[period] = start
+
+    def award(self, user_id: str, xp: int, profile: Optional[dict] = None) -> Dict[str, Tuple[Optional[int], dict]]:
+        """
+        Add XP to the user on every board: O(log n) search plus one list shift per board.
+        Returns {period: (previous_rank, new entry)} for publishing rank changes.
+        """
+        user_id = str(user_id)
+        changes = {}
+        with self._lock:
+            if profile is not None:
+                self._remember({**profile, "userID": user_id})
+            self._roll()
+            for period, board in self._boards.items():
+                previous_rank = board.rank(user_id)
+                score = board.add(user_id, xp)
+                changes[period] = (previous_rank, self._entries([(board.rank(user_id), user_id, score)])[0])
+        return changes
+
+    def _entries(self, rows: List[Tuple[int, str, int]]) -> List[dict]:
+        return [
+            {"rank": rank, "userID": user_id, "xp": score, **self._profiles.get(user_id, {})}
+            for rank, user_id, score in rows
+        ]
+
+    def page(self, period: str, limit: int, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """
+        One page of a board, best first.
+        The cursor is the last entry's (score, userID), so pages stay
+        consistent while scores change between requests.
+        """
+        with self._lock:
+            self._roll()
+            board = self._boards[period]
+            start = board.after(_decode_cursor(cursor)) if cursor else 0
+            rows = board.slice(start, start + limit)
+            entries = self._entries(rows)
+            has_more = start + limit < len(board)
+        next_cursor = _encode_cursor(rows[-1][2], rows[-1][1]) if rows and has_more else None
+        return entries, next_cursor
+
+    def around(self, period: str, user_id: str, radius: int) -> Tuple[Optional[int], List[dict]]:
+        """The user's rank and the entries up to radius places above and below it."""
+        with self._lock:
+            self._roll()
+            board = self._boards[period]
+            rank = board.rank(str(user_id))
+            if rank is None:
+                return None, []
+            return rank, self._entries(board.slice(rank - 1 - radius, rank + radius))
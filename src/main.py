@@ -1,3 +1,4 @@
+import asyncio
 import base64
 import io
 import os
@@ -10,21 +11,30 @@ from pathlib import Path
 import cv2
 import flet as ft
 import numpy as np
-import requests
 from flet import (Colors, Column, Container, ElevatedButton, Icon, IconButton,
                   Icons, Image, Page, Row, Tab, Tabs, Text, TextButton, View,
                   padding)
 from flet_webview import WebView
 from PIL import Image as PILImage
-from PIL import ImageDraw
 
 from components.achievements import AchievementsSection
 from components.biodex import BiodexSection
 from components.leaderboard import LeaderboardSection
-from config import TEMP_DIR
-from firebase.firebase_config import get_user_sightings
+from components.paged_grid import PagedGridView
+from components.router import OverlayRouter
+from components.sighting_map import SightingMapRenderer
+from config import (API_BASE_URL, IMAGE_CACHE_DIR, OUTBOX_DB_PATH, TEMP_DIR,
+                    WORLD_MAP_IMAGE)
+from core import Location
+from services.api import APIClient, APIError
+from services.image_loader import ImageLoader
+from services.live import LiveUpdates
+from services.outbox import CaptureOutbox, OutboxSync
 
 
+# Sighting cards fetched per scroll page in the Biodex tab
+SIGHTINGS_PAGE_SIZE = 24
+
 @dataclass
 class AchievementData:
     title: str
@@ -121,12 +131,74 @@ def main(page: ft.Page):
     # Auth state
     current_user = None
     
+    # Shared image cache for sighting cards (memory + disk)
+    image_loader = ImageLoader(IMAGE_CACHE_DIR)
+    
+    # One pooled client for every backend call; handlers await it on the event loop
+    api = APIClient(API_BASE_URL)
+    
+    # Server pushes (new sightings, XP, rank changes) patch the affected controls in place
+    live = LiveUpdates(API_BASE_URL)
+    
+    # Detail screens (profiles, achievements) are cached views pushed over the main view
+    router = OverlayRouter(page)
+    
+    # Captures are queued on disk first and uploaded in the background, so none are lost offline
+    def handle_sighting_synced(sighting_id, result):
+        print(f"Outbox uploaded sighting {sighting_id}")
+        page.snack_bar = ft.SnackBar(content=Text(f"Sighting uploaded: {result.get('species', 'Unknown species')}"))
+        page.snack_bar.open = True
+        page.update()
+        if current_user:
+            page.run_task(load_biodex)  # The capture may have completed a species
+    
+    # Captures the server rejected for good stay on the device until the user retries or discards them
+    parked_uploads = Column(spacing=5)
+    
+    async def refresh_parked_uploads():
+        parked = await asyncio.to_thread(capture_outbox.parked)
+        parked_uploads.controls = [
+            Text(f"{len(parked)} capture(s) could not be uploaded", size=16, color=Colors.ORANGE_300),
+        ] if parked else []
+        for capture in parked:
+            parked_uploads.controls.append(Row(
+                controls=[
+                    Text(f"{capture.captured_at:%b %d %H:%M}: {capture.error}", size=12, color=Colors.GREY_400, expand=True),
+                    TextButton("Retry", on_click=lambda _, sighting_id=capture.sighting_id: page.run_task(retry_parked_upload, sighting_id)),
+                    TextButton("Discard", on_click=lambda _, sighting_id=capture.sighting_id: page.run_task(discard_parked_upload, sighting_id)),
+                ],
+            ))
+        page.update()
+    
+    async def retry_parked_upload(sighting_id):
+        await asyncio.to_thread(capture_outbox.retry, sighting_id)
+        outbox_sync.kick()
+        await refresh_parked_uploads()
+    
+    async def discard_parked_upload(sighting_id):
+        await asyncio.to_thread(capture_outbox.discard, sighting_id)
+        await refresh_parked_uploads()
+    
+    capture_outbox = CaptureOutbox(OUTBOX_DB_PATH)
+    outbox_sync = OutboxSync(
+        capture_outbox, api, on_synced=handle_sighting_synced,
+        on_parked=lambda _sighting_id, _error: page.run_task(refresh_parked_uploads),
+    )
+    page.run_task(outbox_sync.run)
+    page.run_task(refresh_parked_uploads)
+    
+    # World map renderer; keeps the resized base layer between refreshes
+    map_renderer = SightingMapRenderer(WORLD_MAP_IMAGE)
+    
     def handle_login(user_data):
         nonlocal current_user
         current_user = user_data
+        leaderboard_section.set_user(str(user_data['userID']))
+        page.run_task(live.run, user_data['email'])  # Email doubles as the token
         show_main_view()
+        page.run_task(load_biodex)
     
-    def handle_register(e):
+    async def handle_register(e):
         try:
             # Get form data
             email = register_email.value
@@ -143,37 +215,25 @@ def main(page: ft.Page):
                 return
             
             # Register user
-            response = requests.post(
-                "http://localhost:8000/auth/register",
-                json={
-                    "email": email,
-                    "password": password,
-                    "firstname": firstname,
-                    "lastname": lastname,
-                    "colorblind": colorblind
-                }
+            await api.register(email, password, firstname, lastname, colorblind)
+            page.snack_bar = ft.SnackBar(
+                content=Text("Registration successful! Please log in.")
             )
-            
-            if response.status_code == 200:
-                user_data = response.json()
-                page.snack_bar = ft.SnackBar(
-                    content=Text("Registration successful! Please log in.")
-                )
-                page.snack_bar.open = True
-                page.update()
-                # Show login view
-                show_login_view()
-            else:
-                error_msg = response.json().get('detail', "Registration failed. Please try again.")
-                page.snack_bar = ft.SnackBar(content=Text(error_msg))
-                page.snack_bar.open = True
-                page.update()
+            page.snack_bar.open = True
+            page.update()
+            # Show login view
+            show_login_view()
+        except APIError as e:
+            error_msg = e.detail or "Registration failed. Please try again."
+            page.snack_bar = ft.SnackBar(content=Text(error_msg))
+            page.snack_bar.open = True
+            page.update()
         except Exception as e:
             page.snack_bar = ft.SnackBar(content=Text(f"Error: {str(e)}"))
             page.snack_bar.open = True
             page.update()
     
-    def handle_login_submit(e):
+    async def handle_login_submit(e):
         try:
             # Get form data
             email = login_email.value
@@ -186,22 +246,13 @@ def main(page: ft.Page):
                 return
             
             # Login user
-            response = requests.post(
-                "http://localhost:8000/auth/login",
-                json={
-                    "email": email,
-                    "password": password
-                }
-            )
-            
-            if response.status_code == 200:
-                user_data = response.json()
-                handle_login(user_data)
-            else:
-                error_msg = response.json().get('detail', "Login failed. Please check your credentials.")
-                page.snack_bar = ft.SnackBar(content=Text(error_msg))
-                page.snack_bar.open = True
-                page.update()
+            user_data = await api.login(email, password)
+            handle_login(user_data)
+        except APIError as e:
+            error_msg = e.detail or "Login failed. Please check your credentials."
+            page.snack_bar = ft.SnackBar(content=Text(error_msg))
+            page.snack_bar.open = True
+            page.update()
         except Exception as e:
             page.snack_bar = ft.SnackBar(content=Text(f"Error: {str(e)}"))
             page.snack_bar.open = True
@@ -312,7 +363,23 @@ def main(page: ft.Page):
         content_area.content = register_view
         page.update()
     
+    async def load_achievements(section: AchievementsSection):
+        try:
+            section.set_progress(await api.get_achievements(str(current_user['userID'])))
+        except Exception as e:
+            print(f"Error loading achievements: {e}")
+
+    async def load_biodex():
+        # One fetch: the server keeps each user's completion document precomputed
+        try:
+            biodex_section.set_biodex(await api.get_biodex(str(current_user['userID'])))
+        except Exception as e:
+            print(f"Error loading Biodex: {e}")
+
     def show_main_view():
+        achievements_section = AchievementsSection(page, router)
+        if current_user:
+            page.run_task(load_achievements, achievements_section)
         content_area.content = Tabs(
             selected_index=0,
             animation_duration=300,
@@ -337,7 +404,7 @@ def main(page: ft.Page):
                     text="Biodex",
                     icon=Icons.MENU_BOOK_OUTLINED, 
                     content=Container(
-                      content=biodex_view,
+                      content=biodex_tab,
                       padding=padding.only(top=10, left=10, right=10),
                     ),
                 ),
@@ -350,7 +417,7 @@ def main(page: ft.Page):
                     text="Achievements",
                     icon=Icons.EMOJI_EVENTS_OUTLINED,
                     content=Container(
-                      content=AchievementsSection(page),
+                      content=achievements_section,
                       padding=padding.only(top=10, left=10, right=10),
                     ),
                 ),
@@ -382,13 +449,13 @@ def main(page: ft.Page):
         temp_buffer = io.BytesIO()
         pil_image.save(temp_buffer, format='JPEG')
         
-        # Add auth header
-        headers = {"Authorization": f"Bearer {current_user['email']}"}  # Use email as token
+        # Auth token
+        token = current_user['email']  # Use email as token
         
-        # Immediately call process_image
-        process_image(None, temp_buffer.getvalue(), img_base64, headers)
+        # Process on the event loop, off the camera/UI thread
+        page.run_task(process_image, None, temp_buffer.getvalue(), img_base64, token)
     
-    def process_image(e, image_bytes=None, display_base64=None, headers=None):
+    async def process_image(e, image_bytes=None, display_base64=None, token=None):
         try:
             # Show loading state
             content_area.content = Column(
@@ -402,32 +469,23 @@ def main(page: ft.Page):
             
             try:
                 # Make request to Moondream endpoint
-                files = {
-                    "file": ("image.jpg", io.BytesIO(image_bytes), "image/jpeg")
-                }
-                response = requests.post(
-                    "http://localhost:8000/moondream/describe",
-                    files=files,
-                    headers=headers
-                )
+                try:
+                    result = await api.describe_image(image_bytes, token)
+                except APIError as api_error:
+                    raise Exception(f"API request failed: {api_error.detail or 'Unknown error'}")
                 
-                if response.status_code != 200:
-                    error_detail = response.json().get('detail', 'Unknown error')
-                    raise Exception(f"API request failed: {error_detail}")
-                    
-                result = response.json()
                 description = result.get('description', 'No description available')
-                # Extract species from the description (format: "Species: X")
-                species = description.split(": ")[1] if ": " in description else "Unknown species"
+                # The server's detector gate found nothing to identify; there is nothing to save
+                animal_detected = result.get('animalDetected', True)
+                # A re-shot of a sighting already saved: saving again would be a duplicate
+                already_saved = bool(result.get('duplicateOf'))
+                # Canonical catalog name when the server matched one, else parse "Species: X"
+                species = result.get('species') or (description.split(": ")[1] if ": " in description else "Unknown species")
 
                 # Save sighting to Firebase
-                def handle_save_sighting(e):
+                async def handle_save_sighting(e):
                     try:
                         print("Save sighting button clicked")
-                        # Create a temporary file-like object in memory
-                        temp_buffer = io.BytesIO(image_bytes)
-                        temp_buffer.name = "image.jpg"  # Set a name for the file
-                        print("Created temp buffer for image")
 
                         # Use Boston's coordinates
                         lat = 42.3601
@@ -436,46 +494,31 @@ def main(page: ft.Page):
                         
                         print(f"Using Boston coordinates: {lat}, {lng}")
                         
-                        # Upload to server
-                        files = {"file": ("image.jpg", temp_buffer, "image/jpeg")}
-                        data = {
-                            "latitude": lat,
-                            "longitude": lng,
-                            "accuracy": accuracy,
-                            "timestamp": datetime.now().isoformat()
-                        }
-                        
-                        print("Making request to server...")
-                        print("Headers:", headers)
-                        print("Data:", data)
-                        
-                        response = requests.post(
-                            "http://localhost:8000/vision/process",
-                            files=files,
-                            data=data,
-                            headers=headers
+                        # Upload to server, streamed straight from the captured bytes
+                        location = Location(
+                            latitude=lat,
+                            longitude=lng,
+                            accuracy=accuracy,
+                            timestamp=datetime.now(),
                         )
+                        print("Queueing sighting for upload...")
+                        print("Location:", location)
                         
-                        print(f"Server response status: {response.status_code}")
-                        print(f"Server response: {response.text}")
-
-                        if response.status_code == 200:
-                            print("Sighting saved successfully")
-                            page.snack_bar = ft.SnackBar(content=Text("Sighting saved!"))
-                            page.snack_bar.open = True
-                            page.update()
-                            show_main_view()  # Return to main view
-                        else:
-                            raise Exception(f"Failed to save sighting: {response.text}")
+                        # Durable first; the background sync uploads it (now, or once back online)
+                        sighting_id = await asyncio.to_thread(capture_outbox.enqueue, image_bytes, location, token)
+                        outbox_sync.kick()
+                        
+                        print(f"Sighting {sighting_id} queued")
+                        page.snack_bar = ft.SnackBar(content=Text("Sighting saved! It will upload as soon as you're online."))
+                        page.snack_bar.open = True
+                        page.update()
+                        show_main_view()  # Return to main view
 
                     except Exception as e:
                         print(f"Error in handle_save_sighting: {str(e)}")
                         page.snack_bar = ft.SnackBar(content=Text(f"Error saving sighting: {str(e)}"))
                         page.snack_bar.open = True
                         page.update()
-                    finally:
-                        # Clean up
-                        temp_buffer.close()
 
                 # Display results with Save button
                 content_area.content = Column(
@@ -498,9 +541,11 @@ def main(page: ft.Page):
                             fit=ft.ImageFit.CONTAIN,
                         ),
                         Container(height=10),
-                        Text(f"Species: {species}", size=20, weight=ft.FontWeight.BOLD),
+                        Text(f"Species: {species}" if animal_detected else "No animal found. Try getting closer.",
+                             size=20, weight=ft.FontWeight.BOLD),
                         Container(height=5),
                         Text(description, size=16),
+                        Text("Already in your sightings", size=14, italic=True, visible=already_saved),
                         Container(height=20),
                         Row(
                             controls=[
@@ -508,6 +553,7 @@ def main(page: ft.Page):
                                     "Save Sighting",
                                     icon=Icons.SAVE,
                                     on_click=handle_save_sighting,
+                                    visible=animal_detected and not already_saved,
                                 ),
                                 ElevatedButton(
                                     "Capture Another",
@@ -589,131 +635,104 @@ def main(page: ft.Page):
             Text("Point your camera at an animal to begin", size=16),
             Container(height=8),
             camera_view,
+            parked_uploads,
         ],
         horizontal_alignment=ft.CrossAxisAlignment.CENTER,
     )
     
     # View: Map
     def create_map_view():
-        def create_map_image(width=400, height=600):
+        # Map image and count are created once; refreshes only patch their values
+        map_image = Image(
+            width=400,
+            height=600,
+            fit=ft.ImageFit.CONTAIN,
+            border_radius=10,
+        )
+        sightings_count = Text("", size=14, color=Colors.GREY_400)
+        
+        # Where WebView is available, show the Leaflet tile map served by the backend
+        map_webview = None
+        if page.platform in (ft.PagePlatform.ANDROID, ft.PagePlatform.IOS, ft.PagePlatform.MACOS):
+            map_webview = WebView(url=f"{API_BASE_URL}/map", width=400, height=600)
+        
+        map_content = Column(
+            controls=[
+                Container(
+                    content=map_webview or map_image,
+                    bgcolor=Colors.BLUE_GREY_900,
+                    border_radius=10,
+                    padding=10,
+                ),
+                Container(height=10),
+                sightings_count,
+            ],
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+        )
+
+        # Sightings on the map; live events append to it instead of re-fetching
+        shown_sightings = []
+        
+        async def refresh_map():
             try:
-                # Get absolute path to the image
-                current_dir = os.getcwd()
-                image_path = os.path.join(current_dir, "image.png")  # Removed @ symbol
-                print(f"Attempting to load map from: {image_path}")
-                
-                # Check if file exists
-                if not os.path.exists(image_path):
-                    print(f"Error: Map image not found at {image_path}")
-                    raise FileNotFoundError(f"Map image not found at {image_path}")
-                
-                # Load the world map image
-                world_map = PILImage.open(image_path)
-                
-                # Calculate aspect ratio to maintain proportions
-                aspect_ratio = world_map.width / world_map.height
-                new_height = int(width / aspect_ratio)
-                
-                # Resize image maintaining aspect ratio
-                world_map = world_map.resize((width, new_height), PILImage.Resampling.LANCZOS)
-                
-                # Create a dark background image
-                background = PILImage.new('RGB', (width, height), (30, 41, 59))
-                
-                # Calculate position to center the map vertically
-                y_offset = (height - new_height) // 2
-                
-                # Paste the world map onto the background
-                background.paste(world_map, (0, y_offset))
-                
-                # Create drawing object
-                draw = ImageDraw.Draw(background)
-                
-                # Convert Boston's coordinates to pixels
-                # Boston: 42.3601° N, 71.0589° W
-                boston_x = int(width * (180 - 71.0589) / 360)  # Convert longitude to x
-                boston_y = int(y_offset + (new_height * (90 - 42.3601) / 180))  # Convert latitude to y
-                
-                # Draw Boston marker
-                marker_size = 5
-                draw.ellipse((boston_x - marker_size, boston_y - marker_size,
-                            boston_x + marker_size, boston_y + marker_size),
-                            fill=(255, 69, 0))  # Bright orange marker
-                
-                # Label Boston
-                draw.text((boston_x + 10, boston_y), "Boston", fill=(255, 255, 255))
-                
-                # Convert to base64 for display
-                img_byte_arr = io.BytesIO()
-                background.save(img_byte_arr, format='PNG')
-                img_byte_arr = img_byte_arr.getvalue()
-                img_base64 = base64.b64encode(img_byte_arr).decode()
-                
-                return img_base64
-                
+                # Get user's sightings from the server, a page at a time
+                sightings = []
+                if current_user:
+                    cursor = None
+                    while True:
+                        items, cursor = await api.user_sightings(str(current_user['userID']), 100, cursor)
+                        sightings.extend(items)
+                        if cursor is None:
+                            break
+                shown_sightings[:] = sightings
+                print(f"Found {len(shown_sightings)} sightings")
             except Exception as e:
-                print(f"Error creating map image: {str(e)}")
-                # Create a fallback solid color image
-                img = PILImage.new('RGB', (width, height), (30, 41, 59))
-                img_byte_arr = io.BytesIO()
-                img.save(img_byte_arr, format='PNG')
-                img_byte_arr = img_byte_arr.getvalue()
-                return base64.b64encode(img_byte_arr).decode()
+                show_map_error(e)
+                return
+            redraw_map()
 
-        def refresh_map():
+        def redraw_map():
             try:
-                # Get user's sightings
-                if current_user:
-                    sightings = get_user_sightings(str(current_user['userID']))
-                    print(f"Found {len(sightings)} sightings")
-                else:
-                    sightings = []
+                sightings = shown_sightings
 
-                # Create base64 map image
-                map_base64 = create_map_image()
+                if map_webview is not None:
+                    # Tiles carry the markers; a reload re-requests only the visible ones
+                    if map_webview.page:
+                        map_webview.reload()
+                else:
+                    # Cached base layer + markers; unchanged sightings reuse the last encoding
+                    map_base64 = map_renderer.render(sightings)
+                    if map_image.src_base64 != map_base64:
+                        map_image.src_base64 = map_base64
+                sightings_count.value = f"Found {len(sightings)} sightings"
                 
-                # Display map image
-                map_container.content = Column(
-                    controls=[
-                        Container(
-                            content=Image(
-                                src_base64=map_base64,
-                                width=400,
-                                height=600,
-                                fit=ft.ImageFit.CONTAIN,
-                                border_radius=10,
-                            ),
-                            bgcolor=Colors.BLUE_GREY_900,
-                            border_radius=10,
-                            padding=10,
-                        ),
-                        Container(height=10),
-                        Text(f"Found {len(sightings)} sightings", size=14, color=Colors.GREY_400),
-                    ],
-                    horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                )
+                if map_container.content is not map_content:
+                    map_container.content = map_content
                 page.update()
                 
             except Exception as e:
-                print(f"Error loading map: {str(e)}")
-                map_container.content = Column(
-                    controls=[
-                        Text("Error loading map", size=16, color=Colors.RED),
-                        Text(str(e), size=14, color=Colors.RED),
-                        ElevatedButton(
-                            "Retry",
-                            on_click=lambda _: refresh_map()
-                        ),
-                    ],
-                    horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                )
-                page.update()
+                show_map_error(e)
+
+        def show_map_error(e: Exception):
+            print(f"Error loading map: {str(e)}")
+            map_container.content = Column(
+                controls=[
+                    Text("Error loading map", size=16, color=Colors.RED),
+                    Text(str(e), size=14, color=Colors.RED),
+                    ElevatedButton(
+                        "Retry",
+                        on_click=lambda _: page.run_task(refresh_map)
+                    ),
+                ],
+                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            )
+            page.update()
 
         # Create refresh button
         refresh_button = IconButton(
             icon=Icons.REFRESH,
             icon_color=Colors.BLUE_400,
-            on_click=lambda _: refresh_map(),
+            on_click=lambda _: page.run_task(refresh_map),
             tooltip="Refresh map",
         )
 
@@ -742,8 +761,15 @@ def main(page: ft.Page):
             horizontal_alignment=ft.CrossAxisAlignment.CENTER,
         )
 
+        def handle_live_sighting(event):
+            if current_user and event.get("userID") == str(current_user['userID']):
+                shown_sightings.append(event)
+                redraw_map()
+        
+        live.on("sighting", handle_live_sighting)
+
         # Initial load of map
-        refresh_map()
+        page.run_task(refresh_map)
         return map_view
 
     # Update the map tab to use the new view
@@ -751,13 +777,42 @@ def main(page: ft.Page):
     
     # View: Biodex
     def create_biodex_view():
+        # (image holder, url) pairs waiting to be filled once the grid is on the page
+        pending_image_loads = []
+        
+        def sighting_image(img_base64):
+            if img_base64:
+                return Image(
+                    src_base64=img_base64,
+                    width=120,
+                    height=120,
+                    fit=ft.ImageFit.COVER,
+                    border_radius=10,
+                )
+            return Container(
+                content=Icon(Icons.IMAGE_NOT_SUPPORTED, size=40, color=Colors.GREY_400),
+                width=120,
+                height=120,
+            )
+        
+        async def load_card_image(image_holder: Container, image_url: str):
+            img_base64 = await image_loader.load(image_url)
+            image_holder.content = sighting_image(img_base64)
+            image_holder.update()
+        
+        def load_pending_images(_new_cards):
+            # Fetch images concurrently now that the placeholders are rendered
+            for image_holder, image_url in pending_image_loads:
+                page.run_task(load_card_image, image_holder, image_url)
+            pending_image_loads.clear()
+        
         def create_sighting_card(sighting: dict) -> Container:
             # Add debug logging
             print(f"Creating card for sighting: {sighting.get('sightingID')}")
             print(f"Image URL: {sighting.get('sightingURL')}")
             print(f"Species: {sighting.get('species')}")
             
-            def handle_create_sticker(e):
+            async def handle_create_sticker(e):
                 try:
                     print(f"Create sticker button clicked for sighting: {sighting.get('sightingID')}")
                     
@@ -780,14 +835,10 @@ def main(page: ft.Page):
                         raise Exception("No image URL found")
                         
                     print(f"Downloading image from: {image_url}")
-                    # Get the image data with custom headers
-                    headers = {
-                        'User-Agent': 'Mozilla/5.0',
-                        'Origin': 'http://127.0.0.1:15341'
-                    }
-                    response = requests.get(image_url, headers=headers)
-                    if response.status_code != 200:
-                        raise Exception(f"Failed to download image: {response.status_code}")
+                    try:
+                        image_data = await api.download(image_url)
+                    except APIError as api_error:
+                        raise Exception(f"Failed to download image: {api_error.status_code}")
                     
                     print("Image downloaded successfully")
                     
@@ -797,7 +848,7 @@ def main(page: ft.Page):
                     temp_input = os.path.join(temp_dir, f"temp_input_{sighting.get('sightingID')}.jpg")
                     
                     with open(temp_input, "wb") as f:
-                        f.write(response.content)
+                        f.write(image_data)
                     
                     print(f"Image saved to temp file: {temp_input}")
                     
@@ -807,7 +858,8 @@ def main(page: ft.Page):
                     from services.sticker import extract_animal
                     output_path = os.path.join(temp_dir, f"sticker_{sighting.get('sightingID')}.png")
                     print(f"Attempting to create sticker at: {output_path}")
-                    extracted_path = extract_animal(temp_input, output_path)
+                    # SAM is slow; keep it off the event loop
+                    extracted_path = await asyncio.to_thread(extract_animal, temp_input, output_path)
                     
                     print(f"Sticker created at: {extracted_path}")
                     
@@ -853,51 +905,29 @@ def main(page: ft.Page):
                     page.snack_bar.open = True
                     page.update()
 
-            # Ensure image URL is complete and handle CORS
-            image_url = sighting.get('sightingURL', '')
+            # Grid cards only need the thumbnail; fall back to the original until it is ready
+            image_url = sighting.get('thumbURL') or sighting.get('sightingURL', '')
             if image_url and not image_url.startswith('http'):
                 image_url = f"https://storage.googleapis.com/anima-go.firebasestorage.app/sighting_pics/{image_url}"
             
-            # Try to load the image directly first
-            try:
-                # Download the image with custom headers
-                headers = {
-                    'User-Agent': 'Mozilla/5.0',
-                    'Origin': 'http://127.0.0.1:15341'
-                }
-                response = requests.get(image_url, headers=headers)
-                if response.status_code == 200:
-                    # Convert to base64
-                    img_base64 = base64.b64encode(response.content).decode()
-                    image_src = f"data:image/jpeg;base64,{img_base64}"
-                else:
-                    print(f"Failed to load image from {image_url}: {response.status_code}")
-                    image_src = None
-            except Exception as e:
-                print(f"Error loading image: {str(e)}")
-                image_src = None
+            # Show the cached image right away, otherwise a placeholder until it loads
+            cached = image_loader.get_cached(image_url)
+            image_holder = Container(
+                content=sighting_image(cached) if cached else ft.ProgressRing(width=24, height=24),
+                width=120,
+                height=120,
+                border_radius=10,
+                bgcolor=Colors.BLUE_GREY_900,
+                alignment=ft.alignment.center,
+            )
+            if not cached:
+                pending_image_loads.append((image_holder, image_url))
 
             # Create the card with explicit size and margin
             return Container(
                 content=Column(
                     controls=[
-                        Container(
-                            content=Image(
-                                src=image_src,
-                                width=120,
-                                height=120,
-                                fit=ft.ImageFit.COVER,
-                                border_radius=10,
-                            ) if image_src else Container(
-                                content=Icon(Icons.IMAGE_NOT_SUPPORTED, size=40, color=Colors.GREY_400),
-                                width=120,
-                                height=120,
-                            ),
-                            width=120,
-                            height=120,
-                            border_radius=10,
-                            bgcolor=Colors.BLUE_GREY_900,
-                        ),
+                        image_holder,
                         Text(sighting.get('species', 'Unknown'), size=16),
                         Text(
                             sighting.get('description', '')[:50] + '...' if len(sighting.get('description', '')) > 50 else sighting.get('description', ''),
@@ -923,35 +953,32 @@ def main(page: ft.Page):
                 width=150,  # Fixed width for consistent card size
             )
 
+        async def fetch_sightings_page(cursor):
+            # One page of the user's sightings from the server
+            sightings, next_cursor = await api.user_sightings(
+                str(current_user['userID']), SIGHTINGS_PAGE_SIZE, cursor
+            )
+            print(f"Fetched {len(sightings)} sightings for user {current_user['userID']}")
+            return sightings, next_cursor
+        
         def refresh_sightings():
             if not current_user:
                 return
             
-            # Fetch user's sightings using the user's ID
-            sightings = get_user_sightings(str(current_user['userID']))
-            print(f"Fetched {len(sightings)} sightings for user {current_user['userID']}")
-            
-            # Create grid of sighting cards
-            sighting_cards = [create_sighting_card(sighting) for sighting in sightings]
-            
-            # Update the grid
-            sightings_grid.controls = sighting_cards if sighting_cards else [
-                Container(
-                    content=Text("No sightings yet. Go capture some wildlife!", 
-                               size=16, 
-                               color=Colors.GREY_400,
-                               text_align=ft.TextAlign.CENTER),
-                    padding=20,
-                )
-            ]
-            page.update()
+            pending_image_loads.clear()
+            page.run_task(sightings_grid.reset)
 
-        # Create grid for sightings
-        sightings_grid = Row(
-            controls=[],
-            wrap=True,
+        # Create grid for sightings; cards are built a page at a time on scroll
+        sightings_grid = PagedGridView(
+            fetch_page=fetch_sightings_page,
+            build_item=create_sighting_card,
+            empty_message="No sightings yet. Go capture some wildlife!",
+            on_items_added=load_pending_images,
+            max_extent=170,
+            child_aspect_ratio=0.55,
             spacing=10,
-            alignment=ft.MainAxisAlignment.CENTER,
+            run_spacing=10,
+            expand=True,
         )
 
         # Create refresh button
@@ -976,9 +1003,16 @@ def main(page: ft.Page):
                 sightings_grid,
             ],
             horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-            scroll=ft.ScrollMode.AUTO,
+            expand=True,
         )
 
+        def handle_live_sighting(event):
+            # The user's new sighting goes on top; the rest of the grid is untouched
+            if current_user and event.get("userID") == str(current_user['userID']):
+                sightings_grid.prepend(event)
+        
+        live.on("sighting", handle_live_sighting)
+
         # Initial load of sightings
         refresh_sightings()
         return biodex_view
@@ -986,6 +1020,18 @@ def main(page: ft.Page):
     # Update the biodex tab to use the new view
     biodex_view = create_biodex_view()
     
+    # Species completion (filled in from GET /users/{id}/biodex after sign-in)
+    biodex_section = BiodexSection(page)
+    biodex_tab = Tabs(
+        selected_index=0,
+        animation_duration=300,
+        tabs=[
+            Tab(text="Species", content=biodex_section),
+            Tab(text="My Sightings", content=biodex_view),
+        ],
+        expand=True,
+    )
+    
     # View: Profile
     profile_view = Column(
         controls=[
@@ -1071,14 +1117,15 @@ def main(page: ft.Page):
                 padding=20,
             ),
             # Add achievements section
-            AchievementsSection(page),
+            AchievementsSection(page, router),
         ],
         horizontal_alignment=ft.CrossAxisAlignment.CENTER,
     )
     
     # View: Leaderboard
+    leaderboard_section = LeaderboardSection(page=page, api=api, router=router, live=live)
     leaderboard_view = Container(
-        content=LeaderboardSection(page=page),
+        content=leaderboard_section,
         padding=20,
     )
     
@@ -1108,7 +1155,7 @@ def main(page: ft.Page):
                     text="Biodex",
                     icon=Icons.MENU_BOOK_OUTLINED, 
                     content=Container(
-                      content=biodex_view,
+                      content=biodex_tab,
                       padding=padding.only(top=10, left=10, right=10),
                     ),
                 ),
@@ -1121,7 +1168,7 @@ def main(page: ft.Page):
                     text="Achievements",
                     icon=Icons.EMOJI_EVENTS_OUTLINED,
                     content=Container(
-                      content=AchievementsSection(page),
+                      content=AchievementsSection(page, router),
                       padding=padding.only(top=10, left=10, right=10),
                     ),
                 ),
@@ -1139,11 +1186,7 @@ def main(page: ft.Page):
         padding=0,
     )
     
-    # Store content area in page session for achievement navigation
-    page.session.set("content_area", content_area)
-    
     # Handle cleanup
-    page.on_view_pop = lambda _: stop_camera()
     page.on_disconnect = lambda _: stop_camera()
     
     # Start with login view
@@ -0,0 +1,52 @@
+"""
+Migration: key every stored sighting by its sightingID.
+Older sightings live under auto-generated document IDs, with comments
+inline and users' sighting lists pointing at those IDs. This moves them
+in batches on the configured backend (ANIMAGO_STORAGE_BACKEND). Progress
+is checkpointed after each batch, so an interrupted run picks up where
+it stopped; running it again after it has finished is a no-op.
+
+Run from src/:  python migrate_sighting_ids.py [--batch-size 200] [--restart]
+"""
+
+import argparse
+import time
+
+from config import DATA_DIR
+from firebase.firebase_config import derivative_worker, store
+
+CHECKPOINT_PATH = DATA_DIR / "migrate_sighting_ids.checkpoint"
+DONE = "done"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=200, help="sightings visited per batch")
+    parser.add_argument("--restart", action="store_true", help="ignore the saved checkpoint")
+    args = parser.parse_args()
+
+    checkpoint = None
+    if CHECKPOINT_PATH.exists() and not args.restart:
+        checkpoint = CHECKPOINT_PATH.read_text().strip() or None
+        if checkpoint == DONE:
+            print(f"Already migrated (delete {CHECKPOINT_PATH} or pass --restart to run again)")
+            return
+        print(f"Resuming after {checkpoint}")
+
+    moved = batches = 0
+    start = time.perf_counter()
+    while True:
+        count, checkpoint = store.rekey_sightings(args.batch_size, checkpoint)
+        moved += count
+        batches += 1
+        CHECKPOINT_PATH.write_text(checkpoint or DONE)
+        print(f"batch {batches}: moved {count} (total {moved}, {time.perf_counter() - start:.1f}s)")
+        if checkpoint is None:
+            break
+
+    print(f"Done: {moved} sightings re-keyed in {batches} batches")
+    derivative_worker.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -8,32 +8,52 @@ from pathlib import Path
 from uuid import UUID, uuid4
 
 from dotenv import load_dotenv
-from fastapi import Depends, FastAPI, File, Form, HTTPException, UploadFile
+from fastapi import (Depends, FastAPI, File, Form, HTTPException, UploadFile,
+                     WebSocket, WebSocketDisconnect)
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import (FileResponse, HTMLResponse, JSONResponse,
+                               Response)
 from fastapi.security import OAuth2PasswordBearer
+from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, EmailStr
 
 # Load environment variables first
 env_path = Path(__file__).parent.parent.parent / '.env'
 load_dotenv(env_path)
 
+import asyncio
 import base64
-import io
 import json
 import logging
-import time
-from datetime import datetime
+import string
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from typing import List, Optional
 
-import moondream as md
 import requests
-from PIL import Image
 
-from ..config import TEMP_DIR
+from ..achievements import AchievementEngine
+from ..analytics import SightingColumns
+from ..biodex import BiodexIndex
+from ..config import (ASSETS_DIR, DUPLICATE_CELL_DEGREES, DUPLICATE_MAX_DISTANCE,
+                      DUPLICATE_WINDOW_MINUTES, SAMPLE_TILES_MAX_ZOOM,
+                      SIGHTING_XP, TEMP_DIR, TILES_ARCHIVE, WORLD_MAP_IMAGE)
 from ..core import Animal, Location, User
-from ..firebase.firebase_config import add_sighting, add_user, db
+from ..core.serialization import decode, encode
+from ..dedupe import HASH_SAMPLE, DuplicateIndex, hash_to_hex, perceptual_hash
+from ..firebase.firebase_config import (add_comment, add_sighting, add_user,
+                                        get_comments_page,
+                                        get_user_sightings_page, store)
 from ..geo import GeoSystem
-from ..vision import VisionSystem
+from ..geo.clusters import ClusterIndex
+from ..geo.tiles import (MBTilesArchive, TileOverlay, TileServer,
+                         build_mbtiles_from_equirectangular)
+from ..leaderboard import PERIODS, Leaderboard, period_start
+from ..species import default_catalog
+from ..vision import (DESCRIPTION_PROMPT, SPECIES_PROMPT, Identification,
+                      VisionBackendError, VisionSystem, parse_species)
+from .live import EventHub
+from .uploads import SpooledImage, UploadLimitMiddleware, spool_upload
 
 # Set up logging first
 logging.basicConfig(level=logging.INFO)
@@ -45,12 +65,33 @@ logger.info(f"MOONDREAM_API_KEY configured: {'MOONDREAM_API_KEY' in os.environ}"
 logger.info(f"Current working directory: {os.getcwd()}")
 logger.info(f"Environment file path: {env_path}")
 
-app = FastAPI(title="AnimaGo API")
-vision_system = VisionSystem()
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with the core encoder (orjson when installed)."""
+
+    def render(self, content) -> bytes:
+        return encode(content)
+
+app = FastAPI(title="AnimaGo API", default_response_class=FastJSONResponse)
+MAP_PAGE_TEMPLATE = string.Template((Path(__file__).parent / "map.html").read_text())
+species_catalog = default_catalog()
+vision_system = VisionSystem(catalog=species_catalog)
 geo_system = GeoSystem()
+tile_server = TileServer(None, TileOverlay())
+cluster_index = ClusterIndex()
+sighting_columns = SightingColumns()
+achievement_engine = AchievementEngine(store, species_catalog)
+biodex_index = BiodexIndex(store, species_catalog)
+leaderboard = Leaderboard()
+live_hub = EventHub()
+# Per-sighting progress writes run off the event loop, one at a time and in arrival order,
+# so a user's older snapshot can never overwrite a newer one
+ingest_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest")
+duplicate_index = DuplicateIndex(DUPLICATE_MAX_DISTANCE, timedelta(minutes=DUPLICATE_WINDOW_MINUTES),
+                                 DUPLICATE_CELL_DEGREES)
 
 # Auth setup
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
 
 # Configure CORS for mobile client
 app.add_middleware(
@@ -61,6 +102,77 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Caps image request bodies while they stream in, before the multipart parser spools them
+app.add_middleware(UploadLimitMiddleware)
+
+# Leaflet and other bundled static files, so the map works offline
+app.mount("/assets", StaticFiles(directory=ASSETS_DIR), name="assets")
+
+def load_map_data():
+    """
+    Open (building from the bundled world image if needed) the tile archive,
+    then load every sighting once into the columnar store and derive the
+    map markers and clusters from it.
+    """
+    try:
+        if not TILES_ARCHIVE.exists():
+            logger.info(f"Building sample tile archive at {TILES_ARCHIVE}")
+            build_mbtiles_from_equirectangular(WORLD_MAP_IMAGE, TILES_ARCHIVE, SAMPLE_TILES_MAX_ZOOM)
+        tile_server.archive = MBTilesArchive(TILES_ARCHIVE)
+    except Exception as e:
+        logger.error(f"Tile archive unavailable, serving blank tiles: {str(e)}")
+    try:
+        # Recent sightings are indexed by perceptual hash during the same scan
+        sighting_columns.load(duplicate_index.seed(store.iter_sightings()))
+        lats, lngs = sighting_columns.points(sighting_columns.snapshot())
+        tile_server.load_points(lats, lngs)
+        cluster_index.load(lats, lngs)
+        logger.info(f"Loaded {len(lats)} sightings onto the map")
+    except Exception as e:
+        logger.error(f"Error loading sightings for the map: {str(e)}")
+    try:
+        achievement_engine.load()
+        if not len(achievement_engine) and len(sighting_columns):
+            # Progress predates the engine: replay the history once
+            achievement_engine.rebuild(store.iter_sightings())
+        logger.info(f"Loaded achievement progress for {len(achievement_engine)} users")
+    except Exception as e:
+        logger.error(f"Error loading achievement progress: {str(e)}")
+    try:
+        biodex_index.load()
+        if not len(biodex_index) and len(sighting_columns):
+            biodex_index.rebuild(store.iter_sightings())
+        logger.info(f"Loaded Biodex completion for {len(biodex_index)} users")
+    except Exception as e:
+        logger.error(f"Error loading Biodex completion: {str(e)}")
+    try:
+        leaderboard.load(store.iter_users())
+        # Daily/weekly counters start from this period's sightings
+        columns = sighting_columns.snapshot()
+        for period in ("daily", "weekly"):
+            mask = sighting_columns.mask(columns, since=period_start(period, datetime.now()))
+            counts = sighting_columns.count_by_user(columns, mask)
+            leaderboard.seed(period, {user_id: count * SIGHTING_XP for user_id, count in counts.items()})
+        logger.info("Loaded leaderboards")
+    except Exception as e:
+        logger.error(f"Error loading leaderboards: {str(e)}")
+
+async def run_ingest(function, *args):
+    """Run a blocking progress update (counters plus its store write) on the ingest thread."""
+    return await asyncio.get_running_loop().run_in_executor(ingest_executor, function, *args)
+
+def warm_up_vision():
+    try:
+        vision_system.backend.warm_up()
+    except Exception as e:
+        logger.error(f"Vision backend not ready: {str(e)}")
+
+@app.on_event("startup")
+async def startup():
+    # Local model weights load in the background while the indexes are built
+    asyncio.get_running_loop().run_in_executor(None, warm_up_vision)
+    await asyncio.to_thread(load_map_data)
+
 # Auth models
 class UserCreate(BaseModel):
     email: EmailStr
@@ -81,24 +193,35 @@ class UserResponse(BaseModel):
     xp: int
     userID: UUID
 
+class CommentCreate(BaseModel):
+    comment: str
+
 # Auth dependency
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     try:
         # Get user from Firebase by email (token will be email in this simple version)
-        user_ref = db.collection('users').where('email', '==', token).limit(1)
-        result = user_ref.get()
-        if not result:
+        user = await asyncio.to_thread(store.get_user_by_email, token)
+        if user is None:
             raise HTTPException(status_code=401, detail="Invalid credentials")
-        return result[0].to_dict()
+        return user
     except Exception as e:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+async def get_optional_user(token: Optional[str] = Depends(optional_oauth2_scheme)) -> Optional[dict]:
+    """The signed-in user, or None for anonymous requests and unknown tokens."""
+    if not token:
+        return None
+    try:
+        return await asyncio.to_thread(store.get_user_by_email, token)
+    except Exception:
+        return None
+
 @app.post("/auth/register", response_model=UserResponse)
 async def register(user: UserCreate):
     """Register a new user."""
     try:
         # Check if email already exists
-        existing_user = db.collection('users').where('email', '==', user.email).limit(1).get()
+        existing_user = await asyncio.to_thread(store.get_user_by_email, user.email)
         if existing_user:
             raise HTTPException(status_code=400, detail="Email already registered")
 
@@ -117,7 +240,7 @@ async def register(user: UserCreate):
         }
         
         # Add user to Firebase
-        add_user(user_data)
+        await asyncio.to_thread(add_user, user_data)
         
         # Return user data (excluding password)
         return UserResponse(**user_data)
@@ -131,13 +254,10 @@ async def login(user: UserLogin):
     """Login with email and password."""
     try:
         # Get user from Firebase
-        user_ref = db.collection('users').where('email', '==', user.email).limit(1)
-        result = user_ref.get()
+        user_data = await asyncio.to_thread(store.get_user_by_email, user.email)
         
-        if not result:
+        if user_data is None:
             raise HTTPException(status_code=401, detail="Invalid credentials")
-            
-        user_data = result[0].to_dict()
         
         # Check password (in production, this should be hashed!)
         if user_data["password"] != user.password:
@@ -157,6 +277,44 @@ async def login(user: UserLogin):
     except Exception as e:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+async def identify_upload(upload: SpooledImage, questions: List[str], max_animals: int = 1) -> List[Identification]:
+    """
+    Run the detector-then-vision-model cascade on a spooled upload, off the
+    event loop, with retries. Returns [] when the detector finds no animal.
+    """
+    max_retries = 3
+    retry_delay = 1  # seconds
+
+    def run() -> List[Identification]:
+        # Reduced-size decode straight from the spooled file, normalized (and enhanced if dark or flat)
+        with upload.open_for_inference() as image:
+            return vision_system.identify(image, questions, max_animals)
+
+    for attempt in range(max_retries):
+        try:
+            return await asyncio.to_thread(run)
+        except VisionBackendError:
+            raise  # Not configured; retrying cannot help
+        except Exception as e:
+            logger.error(f"Attempt {attempt + 1} failed: {str(e)}")
+            if attempt < max_retries - 1:
+                await asyncio.sleep(retry_delay)
+                continue
+            raise
+
+def detections_payload(identifications: List[Identification]) -> List[dict]:
+    """Detector boxes for the client; empty when the detector was unavailable and the full frame was used."""
+    return [
+        {"label": i.detection.label, "confidence": i.detection.confidence, "box": list(i.detection.box)}
+        for i in identifications
+        if i.detection is not None
+    ]
+
+def hash_upload(upload: SpooledImage) -> int:
+    """Perceptual hash of a spooled upload; JPEGs decode at 1/8 scale, so this is a few milliseconds."""
+    with upload.open_for_inference(HASH_SAMPLE) as image:
+        return perceptual_hash(image)
+
 @app.post("/vision/process")
 async def process_image(
     file: UploadFile = File(...),
@@ -165,89 +323,329 @@ async def process_image(
     altitude: float = Form(None),
     accuracy: float = Form(None),
     timestamp: str = Form(None),
+    sighting_id: str = Form(None),
     current_user: dict = Depends(get_current_user)
 ):
-    """Process uploaded image and detect animals."""
+    """
+    Process uploaded image and detect animals.
+    A client-generated sighting_id makes the upload idempotent: a retry
+    returns the sighting already stored under that ID. A near-duplicate of
+    one of the user's recent photos returns that sighting instead (nothing
+    stored, no XP); one of another user's nearby photos lends its
+    identification, skipping inference.
+    """
+    if sighting_id:
+        try:
+            sighting_id = str(UUID(sighting_id))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="sighting_id must be a UUID")
+        existing = await asyncio.to_thread(store.get_sighting, sighting_id)
+        if existing is not None:
+            return {
+                "species": existing.get("species"),
+                "description": existing.get("description"),
+                "sighting": existing
+            }
     try:
-        # Read image into memory
-        content = await file.read()
-        image_buffer = io.BytesIO(content)
-        
-        # Initialize model
-        api_key = os.getenv("MOONDREAM_API_KEY")
-        if not api_key:
-            raise HTTPException(status_code=500, detail="MOONDREAM_API_KEY not configured")
+        captured_at = datetime.fromisoformat(timestamp) if timestamp else datetime.now()
+    except ValueError:
+        captured_at = datetime.now()
+
+    # Streamed to TEMP_DIR; rejected early if it is not an image or over the size cap
+    upload = await spool_upload(file)
+    try:
+        phash = await asyncio.to_thread(hash_upload, upload)
+        duplicate = duplicate_index.find(phash, current_user["userID"], latitude, longitude, captured_at)
+        if duplicate is not None and duplicate.same_user:
+            existing = await asyncio.to_thread(store.get_sighting, duplicate.sighting.sightingID)
+            if existing is not None:
+                logger.info(f"Upload is a near-duplicate of sighting {duplicate.sighting.sightingID}")
+                return {
+                    "species": existing.get("species"),
+                    "description": existing.get("description"),
+                    "sighting": existing,
+                    "duplicateOf": duplicate.sighting.sightingID,
+                    "unlocked": []
+                }
+
+        if duplicate is not None and not duplicate.same_user:
+            # Someone nearby just submitted the same shot: reuse its identification
+            species = duplicate.sighting.species
+            species_id = duplicate.sighting.speciesID
+            description = duplicate.sighting.description
+            identifications = []
+        else:
+            identifications = await identify_upload(upload, [SPECIES_PROMPT, DESCRIPTION_PROMPT])
+            if not identifications:
+                # The detector found nothing at all in the frame. Permanent: nothing is stored
+                # and no XP is awarded, so the client should not retry
+                raise HTTPException(status_code=422, detail="No animal detected in the image")
+            identification = identifications[0]
+            species_answer, description = identification.answers
+            species = parse_species(species_answer)
             
-        model = md.vl(api_key=api_key)
+            # Map the free-text answer onto the catalog's canonical species
+            species_match = species_catalog.match(species)
+            species_id = None
+            if species_match is not None:
+                species = species_match.species.name
+                species_id = species_match.species.id
         
-        # Process image with retries
-        max_retries = 3
-        retry_delay = 1  # seconds
+        # Create sighting data
+        sighting_data = {
+            "userID": UUID(current_user["userID"]),
+            "timestamp": captured_at,
+            "coordinates": {
+                "lat": latitude,
+                "lng": longitude
+            },
+            "species": species,
+            "speciesID": species_id,
+            "description": description,
+            "perceptualHash": hash_to_hex(phash),
+        }
+        if sighting_id:
+            sighting_data["sightingID"] = UUID(sighting_id)
         
-        for attempt in range(max_retries):
-            try:
-                with Image.open(image_buffer) as image:
-                    # Reset buffer position for each attempt
-                    image_buffer.seek(0)
-                    
-                    # Encode image
-                    encoded_image = model.encode_image(image)
-                    
-                    # Get species
-                    species_result = model.query(encoded_image, "What species is in this image? Respond in the format 'Species: YOUR ANSWER HERE'")
-                    species = species_result["answer"].split(": ")[1] if ": " in species_result["answer"] else species_result["answer"]
-                    
-                    # Get description
-                    description_result = model.query(encoded_image, "Describe the animal in this image in detail.")
-                    description = description_result["answer"]
-                    
-                    # Create sighting data
-                    sighting_data = {
-                        "userID": UUID(current_user["userID"]),
-                        "timestamp": datetime.now(),
-                        "coordinates": {
-                            "lat": latitude,
-                            "lng": longitude
-                        },
-                        "species": species,
-                        "description": description,
-                    }
-                    
-                    # Save sighting
-                    add_sighting(sighting_data, str(current_user["userID"]), content)
-                    
-                    return {
-                        "species": species,
-                        "description": description,
-                        "sighting": sighting_data
-                    }
-                    
-            except Exception as e:
-                logger.error(f"Attempt {attempt + 1} failed: {str(e)}")
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
-                    continue
-                raise
+        # Save sighting; the stored original streams from the spooled file, which the derivative worker then owns
+        created = await asyncio.to_thread(
+            add_sighting, sighting_data, str(current_user["userID"]), upload.detach(), upload.digest, upload.content_type
+        )
+        if not created:
+            # A concurrent retry of this upload stored it first and awarded the XP
+            existing = await asyncio.to_thread(store.get_sighting, sighting_id)
+            return {
+                "species": existing.get("species"),
+                "description": existing.get("description"),
+                "sighting": existing
+            }
+        tile_server.add_sighting(latitude, longitude)
+        cluster_index.add(latitude, longitude)
+        sighting_columns.append(sighting_data)
+        duplicate_index.add(sighting_data)
+        rank_changes = leaderboard.award(str(current_user["userID"]), SIGHTING_XP, current_user)
+        await run_ingest(biodex_index.record, sighting_data)
+        unlocked = await run_ingest(achievement_engine.record, sighting_data)
+        
+        # Push deltas to live clients
+        live_hub.publish_sighting(sighting_data)
+        for period, (previous_rank, entry) in rank_changes.items():
+            live_hub.publish_rank(period, entry, previous_rank)
+        live_hub.publish_xp(sighting_data["userID"], rank_changes["all_time"][1]["xp"])
+        
+        return {
+            "species": species,
+            "description": description,
+            "sighting": sighting_data,
+            "animals": detections_payload(identifications),
+            "unlocked": unlocked
+        }
             
+    except HTTPException:
+        raise
+    except VisionBackendError as e:
+        raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
         logger.error(f"Server error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Server error: {str(e)}")
+    finally:
+        upload.discard()
+
+@app.get("/blobs/{digest}")
+async def get_blob(digest: str):
+    """Serve an image blob kept by the local storage backend."""
+    blob = store.local_blob(digest)
+    if blob is None:
+        raise HTTPException(status_code=404, detail="Blob not found")
+    path, content_type = blob
+    return FileResponse(path, media_type=content_type)
+
+@app.get("/tiles/{z}/{x}/{y}.png")
+async def get_tile(z: int, x: int, y: int):
+    """Base map tile with sighting markers composited on top."""
+    try:
+        tile = await asyncio.to_thread(tile_server.render_tile, z, x, y)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return Response(content=tile, media_type="image/png", headers={"Cache-Control": "public, max-age=60"})
+
+@app.get("/map", response_class=HTMLResponse)
+async def map_page(lat: float = 20.0, lng: float = 0.0, zoom: int = 2):
+    """Leaflet page for the app's WebView; pulls only the visible tiles."""
+    return MAP_PAGE_TEMPLATE.substitute(lat=lat, lng=lng, zoom=zoom)
+
+@app.websocket("/ws")
+async def live_updates(websocket: WebSocket, token: Optional[str] = None):
+    """
+    Stream delta events (sighting, xp, rank, comment) to a client.
+    Clients send {"type": "viewport", "bbox": [w, s, e, n]},
+    {"type": "follow", "users": [...]} or {"type": "leaderboard", "period": ...};
+    with a token, the signed-in user is always followed.
+    """
+    own_user_id = None
+    if token:
+        user = await asyncio.to_thread(store.get_user_by_email, token)
+        if user is None:
+            await websocket.close(code=1008)
+            return
+        own_user_id = str(user["userID"])
+    await websocket.accept()
+    subscriber = live_hub.connect()
+    if own_user_id:
+        live_hub.follow(subscriber, [own_user_id])
+
+    async def send_events():
+        while True:
+            await websocket.send_text(await subscriber.queue.get())
+
+    sender = asyncio.create_task(send_events())
+    try:
+        while True:
+            message = await websocket.receive_json()
+            kind = message.get("type") if isinstance(message, dict) else None
+            try:
+                if kind == "viewport":
+                    bbox = message.get("bbox")
+                    live_hub.set_viewport(subscriber, tuple(float(v) for v in bbox) if bbox else None)
+                elif kind == "follow":
+                    users = [str(u) for u in message.get("users", [])]
+                    live_hub.follow(subscriber, users + ([own_user_id] if own_user_id else []))
+                elif kind == "leaderboard":
+                    period = message.get("period")
+                    live_hub.watch_leaderboard(subscriber, period if period in PERIODS else None)
+            except (TypeError, ValueError):
+                await websocket.send_text(encode({"type": "error", "detail": f"Invalid {kind} message"}).decode())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        live_hub.disconnect(subscriber)
+
+@app.get("/geo/clusters")
+async def get_clusters(bbox: str, zoom: int) -> dict:
+    """Sighting clusters (centroid and count) inside bbox=west,south,east,north at a zoom level."""
+    try:
+        west, south, east, north = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be west,south,east,north")
+    return {"clusters": cluster_index.query(west, south, east, north, zoom)}
+
+@app.get("/geo/heatmap")
+async def get_heatmap(cell: float = 1.0, species: Optional[str] = None) -> dict:
+    """Sighting counts per grid cell (cell size in degrees), optionally for one species."""
+    cell = max(0.01, min(cell, 45.0))
+    columns = sighting_columns.snapshot()
+    mask = sighting_columns.mask(columns, species=species) if species else None
+    return {"cells": sighting_columns.heatmap(columns, cell, mask)}
 
-@app.get("/geo/nearby")
-async def get_nearby(lat: float, lon: float, radius: float = 1000) -> List[dict]:
+@app.get("/geo/nearby", response_class=FastJSONResponse)
+async def get_nearby(lat: float, lon: float, radius: float = 1000):
     """Get nearby animal sightings."""
     location = Location(latitude=lat, longitude=lon)
     # TODO: Get animals from database
     animals = []  # Placeholder until database integration
     nearby = geo_system.get_nearby_animals(location, animals, radius)
-    return [animal.__dict__ for animal in nearby]
+    # Encoded straight from the slotted dataclasses
+    return FastJSONResponse(nearby)
 
-@app.post("/users/sync")
-async def sync_user(user_data: dict) -> dict:
+@app.get("/users/{user_id}/sightings")
+async def user_sightings(user_id: str, limit: int = 24, cursor: Optional[str] = None) -> dict:
+    """Page through a user's sightings, newest first."""
+    limit = max(1, min(limit, 100))
+    sightings, next_cursor = await asyncio.to_thread(get_user_sightings_page, user_id, limit, cursor)
+    return {"sightings": sightings, "next_cursor": next_cursor}
+
+@app.get("/sightings/{sighting_id}/comments")
+async def sighting_comments(sighting_id: str, limit: int = 20, cursor: Optional[str] = None) -> dict:
+    """Page through a sighting's comments, newest first."""
+    limit = max(1, min(limit, 100))
+    comments, next_cursor = await asyncio.to_thread(get_comments_page, sighting_id, limit, cursor)
+    return {"comments": comments, "next_cursor": next_cursor}
+
+@app.post("/sightings/{sighting_id}/comments")
+async def post_comment(sighting_id: str, body: CommentCreate, current_user: dict = Depends(get_current_user)) -> dict:
+    """Comment on a sighting; returns the stored comment and the sighting's new count."""
+    text = body.comment.strip()
+    if not text or len(text) > 500:
+        raise HTTPException(status_code=400, detail="comment must be 1-500 characters")
+    result = await asyncio.to_thread(add_comment, sighting_id, str(current_user["userID"]), text)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Sighting not found")
+    comment, sighting = result
+    live_hub.publish_comment(sighting, comment, sighting["commentCount"])
+    return {"comment": comment, "commentCount": sighting["commentCount"], "latestComments": sighting["latestComments"]}
+
+@app.get("/users/{user_id}/stats")
+async def user_stats(user_id: str) -> dict:
+    """Sighting and species counts for a user, from the columnar store."""
+    columns = sighting_columns.snapshot()
+    mask = sighting_columns.mask(columns, user_id=user_id)
+    species_counts = sighting_columns.count_by_species(columns, mask)
+    return {
+        "sightings": int(mask.sum()),
+        "species_found": len(species_counts),
+        "species": species_counts,
+    }
+
+@app.get("/leaderboard")
+async def get_leaderboard(period: str = "all_time", limit: int = 20, cursor: Optional[str] = None) -> dict:
+    """Page through a leaderboard (daily, weekly or all_time), best first."""
+    if period not in PERIODS:
+        raise HTTPException(status_code=400, detail=f"period must be one of {', '.join(PERIODS)}")
+    limit = max(1, min(limit, 100))
+    try:
+        entries, next_cursor = leaderboard.page(period, limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"entries": entries, "next_cursor": next_cursor}
+
+@app.get("/leaderboard/around/{user_id}")
+async def get_leaderboard_around(user_id: str, period: str = "all_time", radius: int = 3) -> dict:
+    """A user's rank and the entries just above and below it."""
+    if period not in PERIODS:
+        raise HTTPException(status_code=400, detail=f"period must be one of {', '.join(PERIODS)}")
+    rank, entries = leaderboard.around(period, user_id, max(0, min(radius, 25)))
+    return {"rank": rank, "entries": entries}
+
+@app.get("/users/{user_id}/profile")
+async def user_profile(user_id: str) -> dict:
+    """Public profile summary, assembled from the in-memory indexes in one response."""
+    user = await asyncio.to_thread(store.get_user, user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    achievements = achievement_engine.achievements(user_id)
+    unlocked = sorted((a for a in achievements if a["unlocked"]), key=lambda a: a["unlockedAt"], reverse=True)
+    rank, _ = leaderboard.around("all_time", user_id, 0)
+    biodex = biodex_index.document(user_id)
+    return {
+        "userID": user_id,
+        "firstname": user.get("firstname", ""),
+        "lastname": user.get("lastname", ""),
+        "xp": user.get("xp", 0),
+        "rank": rank,
+        "sightings": len(user.get("sightings", [])),
+        "speciesFound": biodex["found"],
+        "biodexPercent": biodex["percent"],
+        "achievementsUnlocked": len(unlocked),
+        "recentAchievements": [{"key": a["key"], "title": a["title"], "unlockedAt": a["unlockedAt"]} for a in unlocked[:3]],
+    }
+
+@app.get("/users/{user_id}/biodex")
+async def user_biodex(user_id: str) -> dict:
+    """Biodex completion (found-species bitset, overall and per-biome percentages)."""
+    return biodex_index.document(user_id)
+
+@app.get("/users/{user_id}/achievements")
+async def user_achievements(user_id: str) -> dict:
+    """Progress towards every achievement, from the user's running counters."""
+    return {"achievements": achievement_engine.achievements(user_id)}
+
+@app.post("/users/sync", response_class=FastJSONResponse)
+async def sync_user(user_data: dict):
     """Sync user data with server."""
-    user = User(**user_data)
+    user = decode(User, user_data)
     # TODO: Sync with database
-    return user.__dict__ 
+    return FastJSONResponse(user)
 
 @app.get("/geo/user_town_location")
 async def user_town_location(latitude: float, longitude: float):
@@ -274,42 +672,44 @@ async def user_town_location(latitude: float, longitude: float):
     return {"error": f"Failed to retrieve location information: {response.text}"}
 
 @app.post("/moondream/describe")
-async def moondream_describe(file: UploadFile = File(...)):
+async def moondream_describe(file: UploadFile = File(...), current_user: Optional[dict] = Depends(get_optional_user)):
+    upload = await spool_upload(file)
     try:
-        # Read image into memory
-        content = await file.read()
-        image_buffer = io.BytesIO(content)
-        
-        # Initialize model
-        api_key = os.getenv("MOONDREAM_API_KEY")
-        if not api_key:
-            raise HTTPException(status_code=500, detail="MOONDREAM_API_KEY not configured")
-            
-        model = md.vl(api_key=api_key)
+        if current_user is not None:
+            # A re-shot of a sighting the user just saved: answer from it, without inference
+            phash = await asyncio.to_thread(hash_upload, upload)
+            duplicate = duplicate_index.find(phash, current_user["userID"])
+            if duplicate is not None:
+                return {
+                    "description": duplicate.sighting.description,
+                    "species": duplicate.sighting.species,
+                    "speciesID": duplicate.sighting.speciesID,
+                    "animalDetected": True,
+                    "animals": [],
+                    "duplicateOf": duplicate.sighting.sightingID,
+                }
+        identifications = await identify_upload(upload, [SPECIES_PROMPT])
+        if not identifications:
+            return {"description": "No animal detected", "species": None, "speciesID": None,
+                    "animalDetected": False, "animals": []}
+        description, = identifications[0].answers
+        answer = parse_species(description)
+        species_match = species_catalog.match(answer)
         
-        # Process image with retries
-        max_retries = 3
-        retry_delay = 1  # seconds
-        
-        for attempt in range(max_retries):
-            try:
-                with Image.open(image_buffer) as image:
-                    # Reset buffer position for each attempt
-                    image_buffer.seek(0)
-                    
-                    # Process image
-                    encoded_image = model.encode_image(image)
-                    description = model.query(encoded_image, "What species is in this image? Respond in the format 'Species: YOUR ANSWER HERE'")["answer"]
-                    
-                    return {"description": description}
-                    
-            except Exception as e:
-                logger.error(f"Attempt {attempt + 1} failed: {str(e)}")
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
-                    continue
-                raise
+        return {
+            "description": description,
+            "species": species_match.species.name if species_match else answer,
+            "speciesID": species_match.species.id if species_match else None,
+            "animalDetected": True,
+            "animals": detections_payload(identifications),
+        }
             
+    except HTTPException:
+        raise
+    except VisionBackendError as e:
+        raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
         logger.error(f"Server error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Server error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Server error: {str(e)}")
+    finally:
+        upload.discard()
@@ -0,0 +1,182 @@
+"""
+Live event fan-out for the /ws endpoint.
+Subscribers register a map viewport (as 1-degree geo cells), the users
+they follow and the leaderboard they are looking at. The ingest path
+publishes small delta events; each event is encoded once and queued only
+for the subscribers whose cells, users or board it touches.
+"""
+
+import asyncio
+import math
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+try:
+    from ..core.serialization import encode
+except ImportError:
+    from core.serialization import encode
+
+CELL_DEGREES = 1.0
+# Viewports covering more cells than this subscribe to the whole world
+MAX_VIEWPORT_CELLS = 2048
+MAX_FOLLOWED_USERS = 100
+# Events buffered per slow client before the oldest are dropped
+QUEUE_SIZE = 256
+
+Cell = Tuple[int, int]
+
+ROWS = int(180 / CELL_DEGREES)
+COLS = int(360 / CELL_DEGREES)
+
+
+def cell_of(lat: float, lng: float) -> Cell:
+    row = min(ROWS - 1, max(0, math.floor((lat + 90.0) / CELL_DEGREES)))
+    col = math.floor(((lng + 180.0) % 360.0) / CELL_DEGREES)
+    return row, col
+
+
+def cells_in_bbox(west: float, south: float, east: float, north: float) -> Optional[Set[Cell]]:
+    """Cells overlapping the bbox, or None if there are too many (subscribe to everything)."""
+    first_row, _ = cell_of(south, 0.0)
+    last_row, _ = cell_of(north, 0.0)
+    if east - west >= 360.0:
+        return None
+    _, first_col = cell_of(0.0, west)
+    _, last_col = cell_of(0.0, east)
+    width = (last_col - first_col) % COLS + 1  # wraps across the antimeridian
+    if (last_row - first_row + 1) * width > MAX_VIEWPORT_CELLS:
+        return None
+    return {
+        (row, (first_col + i) % COLS)
+        for row in range(first_row, last_row + 1)
+        for i in range(width)
+    }
+
+
+class Subscriber:
+    __slots__ = ("queue", "cells", "world", "users", "period")
+
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.cells: Set[Cell] = set()
+        self.world = False
+        self.users: Set[str] = set()
+        self.period: Optional[str] = None
+
+    def push(self, message: str):
+        if self.queue.full():
+            # A client that cannot keep up loses the oldest deltas, not the newest
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+
+class EventHub:
+    """Routing tables from cell, user and leaderboard period to subscribers; call only on the event loop."""
+
+    def __init__(self):
+        self._by_cell: Dict[Cell, Set[Subscriber]] = {}
+        self._world: Set[Subscriber] = set()
+        self._by_user: Dict[str, Set[Subscriber]] = {}
+        self._by_period: Dict[str, Set[Subscriber]] = {}
+
+    def connect(self) -> Subscriber:
+        return Subscriber()
+
+    def disconnect(self, subscriber: Subscriber):
+        self.set_viewport(subscriber, None)
+        self.follow(subscriber, ())
+        self.watch_leaderboard(subscriber, None)
+
+    @staticmethod
+    def _remove(index: Dict, key, subscriber: Subscriber):
+        members = index.get(key)
+        if members is not None:
+            members.discard(subscriber)
+            if not members:
+                del index[key]
+
+    # Subscriptions
+    def set_viewport(self, subscriber: Subscriber, bbox: Optional[Tuple[float, float, float, float]]):
+        """Replace the subscriber's viewport; bbox is (west, south, east, north), None to clear."""
+        for cell in subscriber.cells:
+            self._remove(self._by_cell, cell, subscriber)
+        self._world.discard(subscriber)
+        subscriber.cells, subscriber.world = set(), False
+        if bbox is None:
+            return
+        cells = cells_in_bbox(*bbox)
+        if cells is None:
+            subscriber.world = True
+            self._world.add(subscriber)
+            return
+        subscriber.cells = cells
+        for cell in cells:
+            self._by_cell.setdefault(cell, set()).add(subscriber)
+
+    def follow(self, subscriber: Subscriber, user_ids: Iterable[str]):
+        """Replace the set of users whose XP, sightings and comments the subscriber receives."""
+        for user_id in subscriber.users:
+            self._remove(self._by_user, user_id, subscriber)
+        subscriber.users = {str(user_id) for user_id in user_ids}
+        if len(subscriber.users) > MAX_FOLLOWED_USERS:
+            subscriber.users = set(sorted(subscriber.users)[:MAX_FOLLOWED_USERS])
+        for user_id in subscriber.users:
+            self._by_user.setdefault(user_id, set()).add(subscriber)
+
+    def watch_leaderboard(self, subscriber: Subscriber, period: Optional[str]):
+        if subscriber.period is not None:
+            self._remove(self._by_period, subscriber.period, subscriber)
+        subscriber.period = period
+        if period is not None:
+            self._by_period.setdefault(period, set()).add(subscriber)
+
+    # Publishing
+    @staticmethod
+    def _send(subscribers: Iterable[Subscriber], event: dict):
+        message = None
+        for subscriber in subscribers:
+            if message is None:
+                message = encode(event).decode()  # once per event, not per client
+            subscriber.push(message)
+
+    def _located(self, user_id: str, coordinates: Optional[dict]) -> Set[Subscriber]:
+        targets = set(self._by_user.get(user_id, ()))
+        if coordinates and coordinates.get("lat") is not None and coordinates.get("lng") is not None:
+            targets |= self._by_cell.get(cell_of(coordinates["lat"], coordinates["lng"]), set())
+            targets |= self._world
+        return targets
+
+    def publish_sighting(self, sighting: dict):
+        """A new sighting: to viewers of its cell and followers of its user."""
+        user_id = str(sighting.get("userID"))
+        event = {
+            "type": "sighting",
+            "sightingID": sighting.get("sightingID"),
+            "userID": user_id,
+            "species": sighting.get("species"),
+            "speciesID": sighting.get("speciesID"),
+            "description": sighting.get("description"),
+            "timestamp": sighting.get("timestamp"),
+            "coordinates": sighting.get("coordinates"),
+            "sightingURL": sighting.get("sightingURL"),
+            "thumbURL": sighting.get("thumbURL"),
+        }
+        self._send(self._located(user_id, sighting.get("coordinates")), event)
+
+    def publish_xp(self, user_id: str, xp: int):
+        """A user's total XP changed: to their followers."""
+        user_id = str(user_id)
+        self._send(self._by_user.get(user_id, ()), {"type": "xp", "userID": user_id, "xp": xp})
+
+    def publish_rank(self, period: str, entry: dict, previous_rank: Optional[int]):
+        """A user's place on a board changed: to everyone viewing that board."""
+        self._send(self._by_period.get(period, ()), {"type": "rank", "period": period, "previousRank": previous_rank, **entry})
+
+    def publish_comment(self, sighting: dict, comment: dict, count: int):
+        """A new comment: to viewers of the sighting's cell and followers of its owner."""
+        event = {
+            "type": "comment",
+            "sightingID": sighting.get("sightingID"),
+            "comment": comment,
+            "commentCount": count,
+        }
+        self._send(self._located(str(sighting.get("userID")), sighting.get("coordinates")), event)
@@ -0,0 +1,150 @@
+"""
+Streamed image uploads.
+UploadLimitMiddleware caps the request body of the image endpoints as it
+arrives (Starlette spools the whole multipart body before a handler runs,
+so the cap has to live below it). The handler then copies the upload
+chunk by chunk into a temp file under TEMP_DIR, sniffing and hashing it,
+so a request never holds the whole photo in memory. The same file is
+decoded at a reduced scale for inference and streamed to blob storage.
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Mapping, Optional
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from PIL import Image
+
+from ..config import INFERENCE_MAX_SIDE, MAX_UPLOAD_BYTES, TEMP_DIR, UPLOAD_CHUNK_BYTES
+
+# Image endpoints whose request bodies are capped before they are parsed
+UPLOAD_PATHS = frozenset({"/vision/process", "/moondream/describe"})
+# Room for the multipart boundaries and form fields around the file
+MULTIPART_OVERHEAD = 64 * 1024
+
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"RIFF", "image/webp"),
+)
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    """Image content type from the leading bytes, or None if it is not a supported image."""
+    for signature, content_type in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            if content_type == "image/webp" and head[8:12] != b"WEBP":
+                return None
+            return content_type
+    return None
+
+
+def exceeds_upload_limit(headers: Mapping[str, str], max_bytes: int = MAX_UPLOAD_BYTES) -> bool:
+    """True if the declared Content-Length is already over the cap (chunked bodies are checked while spooling)."""
+    length = headers.get("content-length")
+    return length is not None and length.isdigit() and int(length) > max_bytes + MULTIPART_OVERHEAD
+
+
+def _too_large(max_bytes: int) -> str:
+    return f"Image larger than {max_bytes // (1024 * 1024)} MB"
+
+
+class UploadLimitMiddleware:
+    """
+    ASGI middleware for UPLOAD_PATHS: 413 straight away when Content-Length
+    is over the cap, otherwise counts body bytes as they are received and
+    aborts with 413 once they pass it (chunked or mis-declared bodies).
+    """
+
+    def __init__(self, app, max_bytes: int = MAX_UPLOAD_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in UPLOAD_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        if exceeds_upload_limit(headers, self.max_bytes):
+            response = JSONResponse(status_code=413, content={"detail": _too_large(self.max_bytes)})
+            await response(scope, receive, send)
+            return
+
+        limit = self.max_bytes + MULTIPART_OVERHEAD
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside the form parser; FastAPI passes HTTPExceptions through
+                    raise HTTPException(status_code=413, detail=_too_large(self.max_bytes))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+class SpooledImage:
+    """An uploaded image on disk, with its size, SHA-256 digest and sniffed content type."""
+
+    __slots__ = ("path", "size", "digest", "content_type")
+
+    def __init__(self, path: Path, size: int, digest: str, content_type: str):
+        self.path: Optional[Path] = path
+        self.size = size
+        self.digest = digest
+        self.content_type = content_type
+
+    def open_for_inference(self, max_side: int = INFERENCE_MAX_SIDE) -> Image.Image:
+        """Open the image; JPEGs decode at the smallest DCT scale still >= max_side."""
+        image = Image.open(self.path)
+        image.draft("RGB", (max_side, max_side))
+        return image
+
+    def detach(self) -> Path:
+        """Hand the file to a new owner; discard() no longer deletes it."""
+        path, self.path = self.path, None
+        return path
+
+    def discard(self):
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+            self.path = None
+
+
+async def spool_upload(file: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES) -> SpooledImage:
+    """
+    Copy an upload to TEMP_DIR in UPLOAD_CHUNK_BYTES chunks, hashing as it goes.
+    Rejects non-images (415) on the first chunk and files over the cap (413);
+    the partial file is removed on any error. By the time this runs the body
+    has already been received, within UploadLimitMiddleware's cap.
+    """
+    fd, name = tempfile.mkstemp(dir=TEMP_DIR, prefix="upload-")
+    path = Path(name)
+    digest = hashlib.sha256()
+    size = 0
+    content_type = None
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                if content_type is None:
+                    content_type = sniff_content_type(chunk)
+                    if content_type is None:
+                        raise HTTPException(status_code=415, detail="Upload must be a JPEG, PNG or WebP image")
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(status_code=413, detail=_too_large(max_bytes))
+                digest.update(chunk)
+                out.write(chunk)
+        if size == 0:
+            raise HTTPException(status_code=400, detail="Empty upload")
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return SpooledImage(path, size, digest.hexdigest(), content_type)
@@ -1,45 +1,208 @@
 """
 API client for AnimaGo mobile app.
-Handles communication with the backend server.
+Handles communication with the backend server over one long-lived
+connection pool, with retries and request timing hooks.
 """
 
 import asyncio
-import json
+import io
+import time
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
 import httpx
 
-from ..config import APP_VERSION
-from ..core import Animal, Location, User
+try:
+    from ..config import API_BASE_URL, APP_VERSION
+    from ..core import Animal, Location, User
+    from ..core.serialization import decode, decode_list, encode, loads
+except ImportError:  # imported as the top-level ``services`` package by the Flet app
+    from config import API_BASE_URL, APP_VERSION
+    from core import Animal, Location, User
+    from core.serialization import decode, decode_list, encode, loads
+
+try:
+    import h2  # Enables HTTP/2 in httpx (the ``http2`` extra)
+except ImportError:
+    h2 = None
+
+# Statuses worth retrying: the server or a proxy was temporarily unavailable
+RETRY_STATUSES = {502, 503, 504}
+
+# on_timing(method, url, status_code or None, elapsed seconds, attempt)
+TimingHook = Callable[[str, str, Optional[int], float, int], None]
+
+
+class APIError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
 
 
 class APIClient:
-    def __init__(self, base_url: str = None):
-        """Initialize API client."""
-        self.base_url = base_url or "http://localhost:8000"
-        self.client = httpx.AsyncClient(timeout=30.0)
+    def __init__(
+        self,
+        base_url: str = None,
+        timeout: float = 30.0,
+        max_connections: int = 10,
+        retries: int = 3,
+        backoff: float = 0.5,
+    ):
+        """Initialize API client; the connection pool is created on first use."""
+        self.base_url = (base_url or API_BASE_URL).rstrip("/")
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.retries = retries
+        self.backoff = backoff
         self.version = APP_VERSION
-        
-    async def upload_image(self, image_path: Path, location: Location) -> Dict:
-        """Upload image for processing."""
-        files = {"file": open(image_path, "rb")}
+        self.timing_hooks: List[TimingHook] = []
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=h2 is not None,
+                timeout=self.timeout,
+                headers={"User-Agent": f"AnimaGo/{self.version}"},
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=60.0,
+                ),
+            )
+        return self._client
+
+    def add_timing_hook(self, hook: TimingHook):
+        """Call hook after every request attempt."""
+        self.timing_hooks.append(hook)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def request(self, method: str, url: str, idempotent: bool = None, **kwargs) -> httpx.Response:
+        """
+        Send a request, retrying with exponential backoff.
+        Non-idempotent requests are only retried when the connection could not
+        be made, so a POST is never sent twice. ``files`` may be a callable
+        returning fresh file objects, so retried uploads start from byte 0.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+        files = kwargs.pop("files", None)
+
+        for attempt in range(self.retries + 1):
+            if files is not None:
+                kwargs["files"] = files() if callable(files) else files
+            start = time.perf_counter()
+            status = None
+            try:
+                response = await self.client.request(method, url, **kwargs)
+                status = response.status_code
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+                if attempt == self.retries:
+                    raise
+            except httpx.TransportError:
+                if not idempotent or attempt == self.retries:
+                    raise
+            else:
+                if not (idempotent and status in RETRY_STATUSES and attempt < self.retries):
+                    return response
+            finally:
+                elapsed = time.perf_counter() - start
+                for hook in self.timing_hooks:
+                    hook(method, url, status, elapsed, attempt)
+            await asyncio.sleep(self.backoff * (2 ** attempt))
+
+    async def _json(self, method: str, url: str, json=None, **kwargs):
+        """Send (optionally) a JSON body and decode the JSON reply, both via the core encoder."""
+        if json is not None:
+            kwargs["content"] = encode(json)
+            kwargs["headers"] = {**kwargs.get("headers", {}), "Content-Type": "application/json"}
+        response = await self.request(method, url, **kwargs)
+        if response.status_code != 200:
+            try:
+                detail = loads(response.content).get("detail", response.text)
+            except (ValueError, AttributeError):
+                detail = response.text
+            raise APIError(response.status_code, str(detail))
+        return loads(response.content)
+
+    @staticmethod
+    def _auth(token: Optional[str]) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {token}"} if token else {}
+
+    @staticmethod
+    def _image_files(image_bytes: bytes, filename: str = "image.jpg", content_type: str = "image/jpeg"):
+        # httpx streams file objects in chunks; wrapping the bytes avoids another copy
+        return lambda: {"file": (filename, io.BytesIO(image_bytes), content_type)}
+
+    # Auth
+    async def register(self, email: str, password: str, firstname: str, lastname: str, colorblind: bool = False) -> Dict:
+        return await self._json("POST", "/auth/register", json={
+            "email": email,
+            "password": password,
+            "firstname": firstname,
+            "lastname": lastname,
+            "colorblind": colorblind,
+        })
+
+    async def login(self, email: str, password: str) -> Dict:
+        return await self._json("POST", "/auth/login", json={"email": email, "password": password})
+
+    # Vision
+    async def describe_image(self, image_bytes: bytes, token: str = None) -> Dict:
+        """Species description from Moondream; safe to retry, nothing is stored."""
+        return await self._json(
+            "POST", "/moondream/describe",
+            files=self._image_files(image_bytes),
+            headers=self._auth(token),
+            idempotent=True,
+        )
+
+    async def process_image(
+        self, image_bytes: bytes, location: Location, token: str = None, sighting_id: str = None
+    ) -> Dict:
+        """
+        Upload a capture for identification and save it as a sighting.
+        With a client-generated sighting_id the server deduplicates, so the
+        upload is safe to retry.
+        """
         data = {
             "latitude": location.latitude,
             "longitude": location.longitude,
             "altitude": location.altitude,
             "accuracy": location.accuracy,
-            "timestamp": location.timestamp.isoformat()
+            "timestamp": location.timestamp.isoformat(),
+            "sighting_id": sighting_id,
         }
-        
-        async with self.client as client:
-            response = await client.post(
-                f"{self.base_url}/vision/process",
-                files=files,
-                data=data
-            )
-            return response.json()
-            
+        # Optional form fields are omitted rather than sent empty
+        data = {key: value for key, value in data.items() if value is not None}
+        return await self._json(
+            "POST", "/vision/process",
+            files=self._image_files(image_bytes),
+            data=data,
+            headers=self._auth(token),
+            idempotent=sighting_id is not None,
+        )
+
+    async def upload_image(self, image_path: Path, location: Location, token: str = None) -> Dict:
+        """Upload image for processing."""
+        image_bytes = await asyncio.to_thread(Path(image_path).read_bytes)
+        return await self.process_image(image_bytes, location, token)
+
+    async def download(self, url: str) -> bytes:
+        """Fetch raw bytes (e.g. a sighting image) through the shared pool."""
+        response = await self.request("GET", url, follow_redirects=True)
+        if response.status_code != 200:
+            raise APIError(response.status_code, f"Failed to download {url}")
+        return response.content
+
+    # Geo and users
     async def get_nearby_animals(self, location: Location, radius: float = 1000) -> List[Animal]:
         """Get animals near the specified location."""
         params = {
@@ -47,19 +210,59 @@ class APIClient:
             "lon": location.longitude,
             "radius": radius
         }
-        
-        async with self.client as client:
-            response = await client.get(
-                f"{self.base_url}/geo/nearby",
-                params=params
-            )
-            return [Animal(**data) for data in response.json()]
-            
+        data = await self._json("GET", "/geo/nearby", params=params)
+        return decode_list(Animal, data)
+
+    async def get_leaderboard(self, period: str = "all_time", limit: int = 20, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """One page of a leaderboard; returns (entries, next_cursor)."""
+        params = {"period": period, "limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        data = await self._json("GET", "/leaderboard", params=params)
+        return data["entries"], data["next_cursor"]
+
+    async def get_leaderboard_around(self, user_id: str, period: str = "all_time", radius: int = 3) -> dict:
+        """A user's rank and the entries around it: {"rank", "entries"}."""
+        return await self._json("GET", f"/leaderboard/around/{user_id}", params={"period": period, "radius": radius})
+
+    async def get_profile(self, user_id: str) -> dict:
+        """A user's public profile summary."""
+        return await self._json("GET", f"/users/{user_id}/profile")
+
+    async def get_biodex(self, user_id: str) -> dict:
+        """A user's Biodex completion document."""
+        return await self._json("GET", f"/users/{user_id}/biodex")
+
+    async def get_achievements(self, user_id: str) -> List[dict]:
+        """Progress towards every achievement for a user."""
+        data = await self._json("GET", f"/users/{user_id}/achievements")
+        return data["achievements"]
+
+    async def user_sightings(self, user_id: str, limit: int = 24, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """One page of a user's sightings, newest first; returns (sightings, next_cursor)."""
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        data = await self._json("GET", f"/users/{user_id}/sightings", params=params)
+        return data["sightings"], data["next_cursor"]
+
+    async def get_comments(self, sighting_id: str, limit: int = 20, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """One page of a sighting's comments, newest first; returns (comments, next_cursor)."""
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        data = await self._json("GET", f"/sightings/{sighting_id}/comments", params=params)
+        return data["comments"], data["next_cursor"]
+
+    async def post_comment(self, sighting_id: str, comment: str, token: str = None) -> dict:
+        """Comment on a sighting: {"comment", "commentCount", "latestComments"}."""
+        return await self._json(
+            "POST", f"/sightings/{sighting_id}/comments",
+            json={"comment": comment},
+            headers=self._auth(token),
+        )
+
     async def sync_user_data(self, user: User) -> User:
         """Sync user data with the server."""
-        async with self.client as client:
-            response = await client.post(
-                f"{self.base_url}/users/sync",
-                json=user.__dict__
-            )
-            return User(**response.json()) 
\ No newline at end of file
+        data = await self._json("POST", "/users/sync", json=user)
+        return decode(User, data)
@@ -0,0 +1,168 @@
+"""
+Async image loading for the Flet app.
+Fetches remote images over a pooled HTTP client with bounded concurrency
+and keeps them in a two-tier cache (in-memory LRU + on-disk).
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0',
+    'Origin': 'http://127.0.0.1:15341'
+}
+
+# Used when the server sends no Cache-Control max-age
+DEFAULT_MAX_AGE = 24 * 60 * 60
+
+
+class ImageLoader:
+    def __init__(self, cache_dir: Path, memory_items: int = 256, max_concurrency: int = 6, timeout: float = 15.0):
+        """Set up the caches; the HTTP client is created on first use."""
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.memory_items = memory_items
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._memory: "OrderedDict[str, str]" = OrderedDict()  # url -> base64
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: dict = {}  # url -> Task, so concurrent requests share one download
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=DEFAULT_HEADERS,
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # Memory tier
+    def get_cached(self, url: str) -> Optional[str]:
+        """Return the base64 image if it is in the memory cache (no I/O)."""
+        src = self._memory.get(url)
+        if src is not None:
+            self._memory.move_to_end(url)
+        return src
+
+    def _remember(self, url: str, src: str):
+        self._memory[url] = src
+        self._memory.move_to_end(url)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    # Disk tier
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode()).hexdigest()
+        folder = self.cache_dir / key[:2]
+        return folder / key, folder / f"{key}.json"
+
+    def _read_disk(self, url: str):
+        data_path, meta_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text())
+            if meta.get("url") != url:
+                return None, None
+            return data_path.read_bytes(), meta
+        except (OSError, ValueError):
+            return None, None
+
+    def _write_disk(self, url: str, data: Optional[bytes], meta: dict):
+        data_path, meta_path = self._paths(url)
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+        if data is not None:
+            data_path.write_bytes(data)
+        meta_path.write_text(json.dumps(meta))
+
+    @staticmethod
+    def _max_age(response: httpx.Response) -> int:
+        cache_control = response.headers.get("Cache-Control", "")
+        if "no-store" in cache_control or "no-cache" in cache_control:
+            return 0
+        match = re.search(r"max-age=(\d+)", cache_control)
+        return int(match.group(1)) if match else DEFAULT_MAX_AGE
+
+    # Loading
+    async def load(self, url: str) -> Optional[str]:
+        """Return the image at url as base64, or None if it cannot be fetched."""
+        if not url:
+            return None
+        src = self.get_cached(url)
+        if src is not None:
+            return src
+
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._load(url))
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        return await task
+
+    async def _load(self, url: str) -> Optional[str]:
+        data, meta = await asyncio.to_thread(self._read_disk, url)
+
+        # Fresh on disk: no network at all
+        if data is not None and meta.get("expires", 0) > time.time():
+            src = base64.b64encode(data).decode()
+            self._remember(url, src)
+            return src
+
+        client = self._get_client()
+        headers = {}
+        if data is not None and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+
+        try:
+            async with self._semaphore:
+                response = await client.get(url, headers=headers)
+        except httpx.HTTPError as e:
+            print(f"Error loading image {url}: {str(e)}")
+            # Serve a stale copy rather than nothing when offline
+            return self._from_stale(url, data)
+
+        if response.status_code == 304 and data is not None:
+            meta["expires"] = time.time() + self._max_age(response)
+            await asyncio.to_thread(self._write_disk, url, None, meta)
+        elif response.status_code == 200:
+            data = response.content
+            meta = {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "content_type": response.headers.get("Content-Type", "image/jpeg"),
+                "expires": time.time() + self._max_age(response),
+            }
+            await asyncio.to_thread(self._write_disk, url, data, meta)
+        else:
+            print(f"Failed to load image from {url}: {response.status_code}")
+            return self._from_stale(url, data)
+
+        src = base64.b64encode(data).decode()
+        self._remember(url, src)
+        return src
+
+    def _from_stale(self, url: str, data: Optional[bytes]) -> Optional[str]:
+        if data is None:
+            return None
+        src = base64.b64encode(data).decode()
+        self._remember(url, src)
+        return src
@@ -0,0 +1,101 @@
+"""
+Live updates for the Flet app.
+Holds one WebSocket to the server's /ws endpoint, replays the current
+subscription (followed users, leaderboard period) after every reconnect,
+and dispatches the delta events it receives to registered handlers.
+"""
+
+import asyncio
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Set
+from urllib.parse import quote
+
+from websockets.asyncio.client import ClientConnection, connect
+from websockets.exceptions import WebSocketException
+
+try:
+    from ..config import API_BASE_URL
+    from ..core.serialization import encode, loads
+except ImportError:  # imported as the top-level ``services`` package by the Flet app
+    from config import API_BASE_URL
+    from core.serialization import encode, loads
+
+EventHandler = Callable[[dict], None]
+
+
+class LiveUpdates:
+    def __init__(self, base_url: Optional[str] = None, min_delay: float = 1.0, max_delay: float = 60.0):
+        base_url = (base_url or API_BASE_URL).rstrip("/")
+        self.url = "ws" + base_url[len("http"):] + "/ws" if base_url.startswith("http") else base_url + "/ws"
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.token: Optional[str] = None
+        self._handlers: Dict[str, List[EventHandler]] = defaultdict(list)
+        self._users: Set[str] = set()
+        self._period: Optional[str] = None
+        self._socket: Optional[ClientConnection] = None
+        self._running = False
+
+    def on(self, event_type: str, handler: EventHandler):
+        """Call handler(event) for every event of this type ("sighting", "xp", "rank", "comment")."""
+        self._handlers[event_type].append(handler)
+
+    async def _send(self, message: dict):
+        if self._socket is None:
+            return  # Sent with the rest of the subscription on connect
+        try:
+            await self._socket.send(encode(message).decode())
+        except WebSocketException:
+            pass
+
+    async def follow(self, user_id: str):
+        """Also receive XP and sightings for this user."""
+        if str(user_id) not in self._users:
+            self._users.add(str(user_id))
+            await self._send({"type": "follow", "users": sorted(self._users)})
+
+    async def watch_leaderboard(self, period: Optional[str]):
+        """Receive rank changes on this board (None to stop)."""
+        self._period = period
+        await self._send({"type": "leaderboard", "period": period})
+
+    def _dispatch(self, event: dict):
+        for handler in self._handlers.get(event.get("type"), ()):
+            try:
+                handler(event)
+            except Exception as e:
+                print(f"Error handling live {event.get('type')} event: {e}")
+
+    async def run(self, token: Optional[str] = None):
+        """Connect and keep reconnecting with backoff until stop(); safe to call again to switch user."""
+        self.token = token
+        if self._running:
+            if self._socket is not None:
+                await self._socket.close()  # Reconnects with the new token
+            return
+        self._running = True
+        delay = self.min_delay
+        while self._running:
+            url = f"{self.url}?token={quote(self.token)}" if self.token else self.url
+            try:
+                async with connect(url) as socket:
+                    self._socket = socket
+                    delay = self.min_delay
+                    if self._users:
+                        await self._send({"type": "follow", "users": sorted(self._users)})
+                    if self._period:
+                        await self._send({"type": "leaderboard", "period": self._period})
+                    async for message in socket:
+                        self._dispatch(loads(message))
+            except (OSError, WebSocketException) as e:
+                print(f"Live updates disconnected: {e}")
+            finally:
+                self._socket = None
+            if self._running:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_delay)
+
+    async def stop(self):
+        self._running = False
+        if self._socket is not None:
+            await self._socket.close()
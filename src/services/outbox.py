@@ -0,0 +1,259 @@
+"""
+Durable outbox for sightings captured while offline.
+Captures are written to SQLite first and uploaded by a background task
+in small batches, backing off while the server is unreachable. Each
+capture carries a client-generated sighting ID, so re-sending one after
+a dropped response never creates a duplicate.
+"""
+
+import asyncio
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import httpx
+
+try:
+    from ..core import Location
+    from .api import APIClient, APIError
+except ImportError:  # imported as the top-level ``services`` package by the Flet app
+    from core import Location
+    from services.api import APIClient, APIError
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    sighting_id TEXT PRIMARY KEY,
+    token TEXT NOT NULL,
+    image BLOB NOT NULL,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    accuracy REAL,
+    captured_at TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox(next_attempt_at, captured_at);
+"""
+
+# Client errors that will not go away by retrying; the capture is parked
+PERMANENT_STATUSES = {400, 413, 415, 422}
+
+
+@dataclass
+class PendingCapture:
+    sighting_id: str
+    token: str
+    image: bytes
+    location: Location
+    attempts: int
+
+
+@dataclass
+class ParkedCapture:
+    """A capture the server rejected for good; kept until the user retries or discards it."""
+    sighting_id: str
+    captured_at: datetime
+    attempts: int
+    error: str
+
+
+class CaptureOutbox:
+    def __init__(self, db_path: Path, base_delay: float = 5.0, max_delay: float = 15 * 60):
+        """Open (or create) the outbox database."""
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # sqlite3 connections are not shareable across threads; keep one per thread
+        self._local = threading.local()
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, image: bytes, location: Location, token: str) -> str:
+        """Persist a capture and return its sighting ID."""
+        sighting_id = str(uuid.uuid4())
+        self._connect().execute(
+            "INSERT INTO outbox (sighting_id, token, image, latitude, longitude, accuracy, captured_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                sighting_id, token, sqlite3.Binary(image), location.latitude, location.longitude,
+                location.accuracy, location.timestamp.isoformat(),
+            ),
+        )
+        return sighting_id
+
+    def due(self, limit: int) -> List[PendingCapture]:
+        """Oldest captures whose backoff has elapsed."""
+        rows = self._connect().execute(
+            "SELECT sighting_id, token, image, latitude, longitude, accuracy, captured_at, attempts "
+            "FROM outbox WHERE next_attempt_at <= ? ORDER BY captured_at LIMIT ?",
+            (time.time(), limit),
+        ).fetchall()
+        return [
+            PendingCapture(
+                sighting_id=row[0],
+                token=row[1],
+                image=bytes(row[2]),
+                location=Location(
+                    latitude=row[3],
+                    longitude=row[4],
+                    accuracy=row[5],
+                    timestamp=datetime.fromisoformat(row[6]),
+                ),
+                attempts=row[7],
+            )
+            for row in rows
+        ]
+
+    def next_due_in(self) -> Optional[float]:
+        """Seconds until the next capture is due, or None if the outbox is empty."""
+        row = self._connect().execute("SELECT MIN(next_attempt_at) FROM outbox").fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+
+    def mark_sent(self, sighting_id: str):
+        self._connect().execute("DELETE FROM outbox WHERE sighting_id = ?", (sighting_id,))
+
+    def mark_failed(self, sighting_id: str, error: str, permanent: bool = False):
+        """Schedule a retry with exponential backoff and jitter."""
+        conn = self._connect()
+        row = conn.execute("SELECT attempts FROM outbox WHERE sighting_id = ?", (sighting_id,)).fetchone()
+        if row is None:
+            return
+        attempts = row[0] + 1
+        if permanent:
+            # Keep the photo, but stop retrying it automatically
+            next_attempt = float("inf")
+        else:
+            delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+            next_attempt = time.time() + delay * random.uniform(0.5, 1.0)
+        conn.execute(
+            "UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE sighting_id = ?",
+            (attempts, next_attempt, error, sighting_id),
+        )
+
+    def parked(self) -> List[ParkedCapture]:
+        """Captures no longer retried automatically, newest first."""
+        rows = self._connect().execute(
+            "SELECT sighting_id, captured_at, attempts, last_error FROM outbox "
+            "WHERE next_attempt_at = ? ORDER BY captured_at DESC",
+            (float("inf"),),
+        ).fetchall()
+        return [
+            ParkedCapture(sighting_id=row[0], captured_at=datetime.fromisoformat(row[1]), attempts=row[2], error=row[3] or "")
+            for row in rows
+        ]
+
+    def retry(self, sighting_id: str):
+        """Make a parked capture due again."""
+        self._connect().execute("UPDATE outbox SET next_attempt_at = 0 WHERE sighting_id = ?", (sighting_id,))
+
+    def discard(self, sighting_id: str):
+        self.mark_sent(sighting_id)
+
+    def defer_all(self, delay: float):
+        """Push every due capture back, e.g. when the server is unreachable."""
+        self._connect().execute(
+            "UPDATE outbox SET next_attempt_at = ? WHERE next_attempt_at <= ?",
+            (time.time() + delay, time.time() + delay),
+        )
+
+    def pending_count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+
+class OutboxSync:
+    def __init__(
+        self,
+        outbox: CaptureOutbox,
+        api: APIClient,
+        batch_size: int = 4,
+        idle_interval: float = 60.0,
+        on_synced: Optional[Callable[[str, dict], None]] = None,
+        on_parked: Optional[Callable[[str, str], None]] = None,
+    ):
+        """
+        Background uploader for a CaptureOutbox.
+        :param on_synced: Called with (sighting_id, server response) after each upload
+        :param on_parked: Called with (sighting_id, error) when the server rejects a capture for good
+        """
+        self.outbox = outbox
+        self.api = api
+        self.batch_size = batch_size
+        self.idle_interval = idle_interval
+        self.on_synced = on_synced
+        self.on_parked = on_parked
+        self._wake: Optional[asyncio.Event] = None
+        self._offline_delay = outbox.base_delay
+
+    def kick(self):
+        """Sync now rather than waiting for the next scheduled attempt."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def run(self):
+        """Upload due captures forever; run on the app's event loop."""
+        self._wake = asyncio.Event()
+        while True:
+            try:
+                await self.sync_once()
+            except Exception as e:
+                print(f"Error syncing outbox: {str(e)}")
+
+            wait = await asyncio.to_thread(self.outbox.next_due_in)
+            wait = self.idle_interval if wait is None else min(wait, self.idle_interval)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def sync_once(self) -> int:
+        """Upload due captures batch by batch; returns how many were sent."""
+        sent = 0
+        while True:
+            batch = await asyncio.to_thread(self.outbox.due, self.batch_size)
+            if not batch:
+                return sent
+            results = await asyncio.gather(*(self._upload(capture) for capture in batch))
+            if not any(results):
+                return sent
+            sent += sum(results)
+
+    async def _upload(self, capture: PendingCapture) -> bool:
+        try:
+            result = await self.api.process_image(
+                capture.image, capture.location, capture.token, sighting_id=capture.sighting_id
+            )
+        except httpx.TransportError as e:
+            # Server unreachable: back everything off together instead of per item
+            print(f"Outbox offline, retrying in {self._offline_delay:.0f}s: {str(e)}")
+            await asyncio.to_thread(self.outbox.defer_all, self._offline_delay)
+            self._offline_delay = min(self.outbox.max_delay, self._offline_delay * 2)
+            return False
+        except APIError as e:
+            permanent = e.status_code in PERMANENT_STATUSES
+            await asyncio.to_thread(self.outbox.mark_failed, capture.sighting_id, e.detail, permanent)
+            if permanent and self.on_parked:
+                self.on_parked(capture.sighting_id, e.detail)
+            return False
+
+        self._offline_delay = self.outbox.base_delay
+        await asyncio.to_thread(self.outbox.mark_sent, capture.sighting_id)
+        if self.on_synced:
+            self.on_synced(capture.sighting_id, result)
+        return True
@@ -0,0 +1,215 @@
+"""
+Species catalog for AnimaGo.
+Canonical integer species IDs with common names, scientific names and
+synonyms, plus a fuzzy index that maps free-text model answers
+("red fox.", "Vulpes vulpes", "a Red Fox in the snow") to a species ID.
+"""
+
+import json
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from ..core import AnimalRarity
+except ImportError:  # imported as the top-level ``species`` package by the Flet app
+    from core import AnimalRarity
+
+CATALOG_PATH = Path(__file__).parent / "catalog.json"
+
+# Filler words the model puts around a name
+STOPWORDS = {"a", "an", "the", "this", "is", "of", "in", "on", "it", "looks", "like", "appears", "to", "be", "species"}
+# Punctuation that ends a phrase ("a fox, near the barn")
+PHRASE_BREAKS = re.compile(r"[,.;:!?()\[\]/\n]+")
+# Answers remembered per catalog
+MATCH_CACHE_SIZE = 4096
+# Minimum trigram similarity (Dice coefficient) for a fuzzy match, and for each of its words
+MIN_SIMILARITY = 0.6
+MIN_WORD_SIMILARITY = 0.5
+# Score of a multi-word name found at the end of a longer phrase ("baby red fox")
+HEAD_MATCH_SCORE = 0.9
+
+
+@dataclass(frozen=True, slots=True)
+class Species:
+    id: int
+    name: str
+    scientific_name: str
+    group: str  # "bird", "mammal", "insect", "reptile", "amphibian"
+    synonyms: Tuple[str, ...]
+    rarity: AnimalRarity
+    biome: str
+
+
+@dataclass(frozen=True, slots=True)
+class SpeciesMatch:
+    species: Species
+    score: float  # 1.0 for exact name/synonym matches
+
+
+def normalize(text: str) -> str:
+    """Lowercase ASCII words separated by single spaces; punctuation dropped."""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text.lower()).split())
+
+
+def noun_phrases(text: str) -> Tuple[str, ...]:
+    """
+    Normalized runs of words between punctuation and filler words:
+    "It looks like a barn owl, in the snow" -> ("barn owl", "snow").
+    """
+    phrases = []
+    for part in PHRASE_BREAKS.split(text):
+        words: List[str] = []
+        for word in normalize(part).split() + [""]:
+            if word and word not in STOPWORDS:
+                words.append(word)
+            elif words:
+                phrases.append(" ".join(words))
+                words = []
+    return tuple(phrases)
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _similarity(a: str, b: str) -> float:
+    grams_a, grams_b = _trigrams(a), _trigrams(b)
+    return 2.0 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+
+
+def _same_words(a: str, b: str) -> bool:
+    """Word by word spelling variants, so "arctic fox" is not "arctic owl"."""
+    words_a, words_b = a.split(), b.split()
+    return len(words_a) == len(words_b) and all(
+        _similarity(x, y) >= MIN_WORD_SIMILARITY for x, y in zip(words_a, words_b)
+    )
+
+
+class SpeciesCatalog:
+    def __init__(self, species: List[Species]):
+        """Index species by ID, by every normalized name, and by name trigrams."""
+        self.species: Dict[int, Species] = {s.id: s for s in species}
+        self._exact: Dict[str, int] = {}
+        names: List[Tuple[str, int]] = []
+        for s in species:
+            for name in (s.name, s.scientific_name, *s.synonyms):
+                key = normalize(name)
+                if key and key not in self._exact:
+                    self._exact[key] = s.id
+                    names.append((key, s.id))
+
+        self._names = names
+        self._name_trigram_counts = [len(_trigrams(key)) for key, _ in names]
+        self._trigram_index: Dict[str, List[int]] = defaultdict(list)
+        for position, (key, _) in enumerate(names):
+            for gram in _trigrams(key):
+                self._trigram_index[gram].append(position)
+        self._cache: Dict[Tuple[str, ...], Optional[Tuple[int, float]]] = {}
+
+    @classmethod
+    def load(cls, path: Path = CATALOG_PATH) -> "SpeciesCatalog":
+        data = json.loads(Path(path).read_text())
+        return cls([
+            Species(
+                id=int(row["id"]),
+                name=row["name"],
+                scientific_name=row.get("scientificName", ""),
+                group=row.get("group", "unknown"),
+                synonyms=tuple(row.get("synonyms", ())),
+                rarity=AnimalRarity(row.get("rarity", "common")),
+                biome=row.get("biome", "unknown"),
+            )
+            for row in data["species"]
+        ])
+
+    def __len__(self):
+        return len(self.species)
+
+    def get(self, species_id: int) -> Optional[Species]:
+        return self.species.get(species_id)
+
+    def count_by_biome(self) -> Dict[str, int]:
+        counts: Dict[str, int] = defaultdict(int)
+        for s in self.species.values():
+            counts[s.biome] += 1
+        return dict(counts)
+
+    def _fuzzy(self, key: str) -> Optional[Tuple[int, float]]:
+        grams = _trigrams(key)
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for position in self._trigram_index.get(gram, ()):
+                shared[position] += 1
+        candidates = []
+        for position, count in shared.items():
+            score = 2.0 * count / (len(grams) + self._name_trigram_counts[position])
+            if score >= MIN_SIMILARITY:
+                candidates.append((score, position))
+        for score, position in sorted(candidates, reverse=True):
+            name, species_id = self._names[position]
+            if _same_words(key, name):
+                return species_id, score
+        return None
+
+    def _match_phrases(self, key: str, phrases: Tuple[str, ...]) -> Optional[Tuple[int, float]]:
+        # 1. The whole answer is a known name
+        species_id = self._exact.get(key)
+        if species_id is not None:
+            return species_id, 1.0
+
+        # 2. A whole noun phrase of a longer answer is a known name. Only whole
+        # phrases count: "arctic fox" or "barn owl" must not match the generic
+        # synonyms "fox" and "owl" with full confidence
+        for phrase in phrases:
+            species_id = self._exact.get(phrase)
+            if species_id is not None:
+                return species_id, 1.0
+
+        # 3. A multi-word name heads a phrase with extra modifiers ("baby red fox");
+        # single generic words ("fox" in "arctic fox") do not count
+        for phrase in phrases:
+            words = phrase.split()
+            for start in range(1, len(words) - 1):
+                species_id = self._exact.get(" ".join(words[start:]))
+                if species_id is not None:
+                    return species_id, HEAD_MATCH_SCORE
+
+        # 4. Misspellings and variants, phrase by phrase
+        best = None
+        for phrase in phrases or (key,):
+            found = self._fuzzy(phrase)
+            if found is not None and (best is None or found[1] > best[1]):
+                best = found
+        return best
+
+    def match(self, text: Optional[str]) -> Optional[SpeciesMatch]:
+        """Best catalog species for a free-text answer, or None if nothing is close."""
+        key = normalize(text or "")
+        if not key:
+            return None
+        phrases = noun_phrases(text)
+        cache_key = (key, *phrases)
+        if cache_key in self._cache:
+            found = self._cache[cache_key]
+        else:
+            found = self._match_phrases(key, phrases)
+            if len(self._cache) >= MATCH_CACHE_SIZE:
+                self._cache.clear()
+            self._cache[cache_key] = found
+        if found is None:
+            return None
+        species_id, score = found
+        return SpeciesMatch(self.species[species_id], score)
+
+
+@lru_cache(maxsize=1)
+def default_catalog() -> SpeciesCatalog:
+    """The bundled catalog, loaded once per process."""
+    return SpeciesCatalog.load()
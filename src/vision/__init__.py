@@ -3,42 +3,145 @@ Computer vision functionality for AnimaGo.
 Handles animal detection, segmentation, and image processing.
 """
 
-import os
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import uuid4
 
 import cv2
-import moondream as md
 import numpy as np
 from PIL import Image
 
-from ..core import Animal, Location
+try:
+    from ..config import (DETECTOR_EMPTY_CONFIDENCE, DETECTOR_IMAGE_SIZE,
+                          DETECTOR_MIN_CONFIDENCE, MAX_ANIMALS_PER_IMAGE,
+                          MOONDREAM_MODEL, VISION_BACKEND, VISION_THREADS,
+                          YOLO_MODEL)
+    from ..core import Animal, AnimalRarity, Location
+except ImportError:  # imported as the top-level ``vision`` package (bench_vision.py)
+    from config import (DETECTOR_EMPTY_CONFIDENCE, DETECTOR_IMAGE_SIZE,
+                        DETECTOR_MIN_CONFIDENCE, MAX_ANIMALS_PER_IMAGE,
+                        MOONDREAM_MODEL, VISION_BACKEND, VISION_THREADS,
+                        YOLO_MODEL)
+    from core import Animal, AnimalRarity, Location
+from .backends import VisionBackend, VisionBackendError, create_backend
+from .detector import AnimalDetector, Detection, crop_detection
+from .preprocess import enhance, measure_quality, normalize_image
+
+SPECIES_PROMPT = "What species is in this image? Respond in the format 'Species: YOUR ANSWER HERE'"
+DESCRIPTION_PROMPT = "Describe the animal in this image in detail."
+
+
+def parse_species(answer: str) -> str:
+    """The species name from an answer to SPECIES_PROMPT."""
+    return answer.split(": ")[1] if ": " in answer else answer
+
+
+@dataclass(frozen=True, slots=True)
+class Identification:
+    """One animal found by the cascade and the vision model's answers about its crop."""
+    detection: Optional[Detection]  # None when the full frame was asked (no COCO animal, or no detector)
+    answers: Tuple[str, ...]
+
+
+def default_backend() -> VisionBackend:
+    """The backend configured for this deployment (ANIMAGO_VISION_BACKEND)."""
+    if VISION_BACKEND == "local":
+        # Checked here so a misconfigured server stops at startup, not on its first photo
+        if not MOONDREAM_MODEL.is_file():
+            raise VisionBackendError(
+                f"ANIMAGO_VISION_BACKEND=local but no Moondream weights at {MOONDREAM_MODEL}; "
+                "download a .mf file there or set ANIMAGO_MOONDREAM_MODEL"
+            )
+        return create_backend("local", model_path=MOONDREAM_MODEL, threads=VISION_THREADS)
+    return create_backend("hosted")
 
 
 class VisionSystem:
-    def __init__(self):
-        """Initialize API client only - models will be loaded on demand."""
-        self.moondream = md.vl(api_key=os.getenv("MOONDREAM_API_KEY"))
+    def __init__(self, backend: Optional[VisionBackend] = None, catalog=None):
+        """Use the given backend, or the configured one; local models are loaded on demand."""
+        self.backend = backend or default_backend()
+        self.catalog = catalog  # Optional species catalog for canonical names and rarity
         self._yolo = None
         self._sam = None
+
+    @property
+    def yolo(self) -> AnimalDetector:
+        if self._yolo is None:
+            self._yolo = AnimalDetector(
+                YOLO_MODEL, DETECTOR_IMAGE_SIZE, DETECTOR_MIN_CONFIDENCE, DETECTOR_EMPTY_CONFIDENCE
+            )
+        return self._yolo
     
-    def process_image(self, image_path: Path) -> List[Animal]:
-        """Process an image and return detected animals."""
-        # For testing, just do basic image load and Moondream query
-        image = Image.open(image_path)
-        encoded_image = self.moondream.encode_image(image)
-        
-        # Simple test query
-        result = self.moondream.query(encoded_image, "What animals do you see in this image?")
-        print(f"Moondream response: {result}")
+    def process_image(self, image_path: Path, location: Location) -> List[Animal]:
+        """Process an image and return detected animals, with boxes and confidences in metadata."""
+        with Image.open(image_path) as image:
+            identifications = self.identify(image, [SPECIES_PROMPT, DESCRIPTION_PROMPT])
         
-        # Return empty list for now
-        return []
+        animals = []
+        for identification in identifications:
+            species_answer, description = identification.answers
+            species = parse_species(species_answer)
+            rarity = AnimalRarity.UNDISCOVERED
+            match = self.catalog.match(species) if self.catalog is not None else None
+            if match is not None:
+                species, rarity = match.species.name, match.species.rarity
+            detection = identification.detection
+            animals.append(Animal(
+                id=str(uuid4()),
+                name=species,
+                species=species,
+                rarity=rarity,
+                confidence=detection.confidence if detection else 0.0,
+                location=location,
+                image_path=str(image_path),
+                metadata={
+                    "description": description,
+                    "label": detection.label if detection else None,
+                    "box": list(detection.box) if detection else None,
+                },
+            ))
+        return animals
+
+    def identify(
+        self, image: Image.Image, questions: Sequence[str], max_animals: int = MAX_ANIMALS_PER_IMAGE
+    ) -> List[Identification]:
+        """
+        The cascade: YOLO scans a small copy of the prepared frame, then the
+        vision model answers the questions about each COCO animal crop (most
+        confident first), or about the whole frame when YOLO cannot name the
+        animal (most catalog species) or is unavailable. Only a frame in
+        which YOLO finds nothing at all returns [] without calling the
+        vision model. Blocking, call off the event loop.
+        """
+        frame = self.prepare_image(image)
+        scan = self.yolo.detect(frame)
+        if scan is not None and scan.empty:
+            return []
+        if scan is None or not scan.animals:
+            return [Identification(None, tuple(self.backend.ask(frame, questions)))]
+        return [
+            Identification(detection, tuple(self.backend.ask(crop_detection(frame, detection), questions)))
+            for detection in scan.animals[:max_animals]
+        ]
+    
+    def ask(self, image: Image.Image, questions: Sequence[str]) -> List[str]:
+        """Prepare the image, encode it once and answer every question; blocking, call off the event loop."""
+        return self.backend.ask(self.prepare_image(image), questions)
     
+    def prepare_image(self, image: Image.Image) -> Image.Image:
+        """Normalize an opened image for inference, enhancing it only if that helps."""
+        image = normalize_image(image)
+        rgb = np.asarray(image)
+        enhanced = self.enhance_image(rgb)
+        return image if enhanced is rgb else Image.fromarray(enhanced)
+
     def enhance_image(self, image: np.ndarray) -> np.ndarray:
-        """Enhance image quality for better detection."""
-        # TODO: Implement image enhancement
-        return image
+        """Enhance image quality for better detection; returns the input itself when it is already good."""
+        quality = measure_quality(image)
+        if not quality.needs_enhancement:
+            return image
+        return enhance(image, quality)
     
     def segment_animal(self, image: np.ndarray, box: Tuple[int, int, int, int]) -> np.ndarray:
         """Segment animal from background using SAM."""
@@ -0,0 +1,162 @@
+"""
+Vision-language backends for VisionSystem.
+The hosted backend calls the Moondream cloud API; the local backend runs
+quantized Moondream weights on the CPU with ONNX Runtime, so inference
+needs no network and costs nothing per call. Select one per deployment
+with ANIMAGO_VISION_BACKEND ("hosted" or "local").
+"""
+
+import os
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, List, Optional, Sequence
+
+import moondream as md
+from PIL import Image
+
+try:
+    import onnxruntime as ort  # The ``local-vision`` extra
+    from moondream import onnx_vl
+except ImportError:
+    ort = None
+
+
+class VisionBackendError(Exception):
+    """The backend is not configured or could not be loaded."""
+
+
+class VisionBackend(ABC):
+    """Encodes an image once, then answers any number of questions about it."""
+
+    name = "backend"
+
+    @abstractmethod
+    def encode_image(self, image: Image.Image) -> Any:
+        """Encode a prepared RGB image; the result is only meaningful to this backend."""
+
+    @abstractmethod
+    def query(self, encoded: Any, question: str) -> str:
+        """Answer a question about an encoded image."""
+
+    def ask(self, image: Image.Image, questions: Sequence[str]) -> List[str]:
+        """Encode once and answer every question, in order."""
+        encoded = self.encode_image(image)
+        return [self.query(encoded, question) for question in questions]
+
+    def warm_up(self):
+        """Load models now instead of on the first request."""
+
+    def close(self):
+        """Release models and worker threads."""
+
+
+class HostedMoondreamBackend(VisionBackend):
+    name = "hosted"
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key if api_key is not None else os.getenv("MOONDREAM_API_KEY")
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        # Created on first use, so the server starts (and other backends work) without a key
+        if self._model is None:
+            if not self.api_key:
+                raise VisionBackendError("MOONDREAM_API_KEY not configured")
+            with self._lock:
+                if self._model is None:
+                    self._model = md.vl(api_key=self.api_key)
+        return self._model
+
+    def warm_up(self):
+        self.model
+
+    def encode_image(self, image: Image.Image) -> Any:
+        return self.model.encode_image(image)
+
+    def query(self, encoded: Any, question: str) -> str:
+        return self.model.query(encoded, question)["answer"]
+
+
+class _ConfiguredOrt:
+    """
+    onnxruntime as moondream's loader sees it: identical, except that
+    SessionOptions() comes back with our thread settings. moondream builds
+    its sessions internally and takes no options of its own.
+    """
+
+    def __init__(self, session_options):
+        self.SessionOptions = session_options
+
+    def __getattr__(self, name):
+        return getattr(ort, name)
+
+
+class LocalMoondreamBackend(VisionBackend):
+    """
+    Quantized Moondream weights (a .mf file) on ONNX Runtime. The model is
+    loaded once and every call runs on one dedicated thread, so its sessions
+    are never entered concurrently. Each session runs its operators
+    sequentially on at most ``threads`` intra-op threads, leaving the other
+    cores to the derivative worker, the tile server and the detector.
+    """
+
+    name = "local"
+    _load_lock = threading.Lock()  # onnx_vl's module-level ort is swapped while loading
+
+    def __init__(self, model_path: Path, threads: int = 1):
+        self.model_path = Path(model_path)
+        if ort is None:
+            raise VisionBackendError("onnxruntime is not installed (pip install 'AnimaGo[local-vision]')")
+        if not self.model_path.is_file():
+            raise VisionBackendError(f"Moondream weights not found at {self.model_path}")
+        self.threads = max(1, threads)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vision-local")
+        self._model = None
+
+    def _session_options(self) -> "ort.SessionOptions":
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        return options
+
+    def _load(self):
+        with self._load_lock:
+            onnx_vl.ort = _ConfiguredOrt(self._session_options)
+            try:
+                return md.vl(model=str(self.model_path))
+            finally:
+                onnx_vl.ort = ort
+
+    def _call(self, method: str, *args) -> Any:
+        def run():
+            if self._model is None:
+                self._model = self._load()
+            return getattr(self._model, method)(*args)
+        return self._executor.submit(run).result()
+
+    def warm_up(self):
+        self._call("encode_image", Image.new("RGB", (64, 64)))
+
+    def encode_image(self, image: Image.Image) -> Any:
+        return self._call("encode_image", image)
+
+    def query(self, encoded: Any, question: str) -> str:
+        return self._call("query", encoded, question)["answer"]
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._model = None
+
+
+def create_backend(backend: str = "hosted", **options) -> VisionBackend:
+    """Create a vision backend by name ("hosted" or "local")."""
+    if backend == "hosted":
+        return HostedMoondreamBackend(**options)
+    if backend == "local":
+        return LocalMoondreamBackend(**options)
+    raise ValueError(f"Unknown vision backend: {backend}")
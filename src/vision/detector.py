@@ -0,0 +1,128 @@
+"""
+Cheap first stage of the vision cascade.
+YOLOv8n runs on the CPU on a small copy of the frame. When it finds one
+of the COCO animal classes, the expensive vision-language model sees one
+crop per animal instead of the whole photo. Most catalog species (foxes,
+deer, squirrels, insects, reptiles...) are not COCO classes, so a frame
+with objects but no COCO animal still goes to the model whole; only a
+frame in which YOLO finds nothing at all, even at a low confidence, is
+skipped.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from PIL import Image
+
+try:
+    from ultralytics import YOLO  # The ``detector`` extra
+except ImportError:
+    YOLO = None
+
+logger = logging.getLogger(__name__)
+
+# COCO class IDs YOLOv8 was trained on that are animals
+ANIMAL_CLASSES = {
+    14: "bird", 15: "cat", 16: "dog", 17: "horse", 18: "sheep",
+    19: "cow", 20: "elephant", 21: "bear", 22: "zebra", 23: "giraffe",
+}
+# Context kept around a box, as a fraction of its size, so the crop still shows habitat
+CROP_MARGIN = 0.15
+# Boxes covering more of the frame than this are sent as the full frame
+FULL_FRAME_AREA = 0.8
+
+Box = Tuple[int, int, int, int]
+
+
+@dataclass(frozen=True, slots=True)
+class Detection:
+    label: str
+    confidence: float
+    box: Box  # (left, top, right, bottom) in pixels of the frame that was detected on
+
+
+@dataclass(frozen=True, slots=True)
+class Scan:
+    animals: List[Detection]  # COCO animals above min_confidence, most confident first
+    empty: bool  # No object of any class, even at empty_confidence: nothing for the vision model to see
+
+
+def crop_detection(frame: Image.Image, detection: Detection, margin: float = CROP_MARGIN) -> Image.Image:
+    """The detection's box plus a margin, clamped to the frame; the frame itself for near-full boxes."""
+    width, height = frame.size
+    left, top, right, bottom = detection.box
+    if (right - left) * (bottom - top) >= FULL_FRAME_AREA * width * height:
+        return frame
+    pad_x = (right - left) * margin
+    pad_y = (bottom - top) * margin
+    return frame.crop((
+        max(0, int(left - pad_x)),
+        max(0, int(top - pad_y)),
+        min(width, int(right + pad_x + 0.5)),
+        min(height, int(bottom + pad_y + 0.5)),
+    ))
+
+
+class AnimalDetector:
+    """YOLOv8n animal boxes plus an is-anything-there check; the model is loaded on first use."""
+
+    def __init__(
+        self, model_path: Path, image_size: int = 320, min_confidence: float = 0.25, empty_confidence: float = 0.05,
+    ):
+        self.model_path = model_path
+        self.image_size = image_size
+        self.min_confidence = min_confidence
+        self.empty_confidence = empty_confidence
+        self._model = None
+        self._failed = False
+        # The ultralytics predictor keeps per-call state, so calls are serialized
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._model is None and not self._failed:
+            try:
+                if YOLO is None:
+                    raise ImportError("ultralytics is not installed (pip install 'AnimaGo[detector]')")
+                self._model = YOLO(str(self.model_path))
+            except Exception as e:
+                self._failed = True
+                logger.error(f"Animal detector unavailable, sending full frames: {str(e)}")
+        return self._model
+
+    def detect(self, frame: Image.Image) -> Optional[Scan]:
+        """The animals in the frame and whether it is empty; None if the detector could not be loaded."""
+        with self._lock:
+            model = self._load()
+            if model is None:
+                return None
+            # Downscale ourselves (one cheap pass) rather than letting YOLO letterbox the full frame
+            scale = min(1.0, self.image_size / max(frame.size))
+            small = frame if scale == 1.0 else frame.resize(
+                (max(1, round(frame.width * scale)), max(1, round(frame.height * scale))),
+                Image.Resampling.BILINEAR, reducing_gap=2.0,
+            )
+            results = model.predict(
+                small,
+                imgsz=self.image_size,
+                # Every class, so objects YOLO cannot name as animals still mark the frame as non-empty
+                conf=min(self.empty_confidence, self.min_confidence),
+                device="cpu",
+                verbose=False,
+            )
+        boxes = results[0].boxes
+        scale_x = frame.width / small.width
+        scale_y = frame.height / small.height
+        detections = [
+            Detection(
+                label=ANIMAL_CLASSES[int(cls)],
+                confidence=float(conf),
+                box=(int(x0 * scale_x), int(y0 * scale_y), int(x1 * scale_x + 0.5), int(y1 * scale_y + 0.5)),
+            )
+            for (x0, y0, x1, y1), conf, cls in zip(boxes.xyxy.tolist(), boxes.conf.tolist(), boxes.cls.tolist())
+            if int(cls) in ANIMAL_CLASSES and conf >= self.min_confidence
+        ]
+        detections.sort(key=lambda detection: -detection.confidence)
+        return Scan(detections, empty=len(boxes) == 0)
@@ -0,0 +1,112 @@
+"""
+Image normalization before inference.
+Phone JPEGs, PNG screenshots and rotated captures are brought to one
+shape: upright, 8-bit sRGB, longest edge INFERENCE_MAX_SIDE. A cheap
+quality score decides whether a frame is dark, flat or noisy enough for
+CLAHE / denoising to help; good frames pass through untouched.
+"""
+
+import io
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+from PIL import Image, ImageOps
+
+try:
+    from ..config import INFERENCE_MAX_SIDE
+except ImportError:  # imported as the top-level ``vision`` package
+    from config import INFERENCE_MAX_SIDE
+
+try:
+    from PIL import ImageCms
+    SRGB_PROFILE = ImageCms.createProfile("sRGB")
+except (ImportError, OSError):  # Pillow built without littleCMS
+    ImageCms = None
+
+# Quality thresholds on 8-bit luma
+DARK_BRIGHTNESS = 70.0  # mean
+FLAT_CONTRAST = 35.0  # standard deviation
+NOISY_SIGMA = 6.0  # estimated Gaussian noise
+
+# Immerkaer's fast noise estimator: a Laplacian difference that cancels image structure
+NOISE_KERNEL = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+
+
+@dataclass(frozen=True, slots=True)
+class ImageQuality:
+    brightness: float
+    contrast: float
+    noise: float
+
+    @property
+    def is_dark(self) -> bool:
+        return self.brightness < DARK_BRIGHTNESS
+
+    @property
+    def is_flat(self) -> bool:
+        return self.contrast < FLAT_CONTRAST
+
+    @property
+    def is_noisy(self) -> bool:
+        return self.noise > NOISY_SIGMA
+
+    @property
+    def needs_enhancement(self) -> bool:
+        return self.is_dark or self.is_flat
+
+
+def _to_srgb(image: Image.Image) -> Image.Image:
+    """8-bit RGB in sRGB: embedded ICC profiles (Display P3, Adobe RGB) converted, alpha flattened onto white."""
+    icc = image.info.get("icc_profile")
+    if icc and ImageCms is not None and image.mode in ("RGB", "RGBA", "CMYK"):
+        try:
+            source = ImageCms.ImageCmsProfile(io.BytesIO(icc))
+            image = ImageCms.profileToProfile(image, source, SRGB_PROFILE, outputMode="RGB")
+        except ImageCms.PyCMSError:
+            pass  # Unreadable profile: treat the pixels as sRGB
+    if image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info):
+        rgba = image.convert("RGBA")
+        background = Image.new("RGBA", rgba.size, (255, 255, 255, 255))
+        return Image.alpha_composite(background, rgba).convert("RGB")
+    if image.mode in ("I;16", "I"):
+        # 16-bit greyscale PNGs: scale to 8 bits rather than clipping
+        array = np.asarray(image, dtype=np.uint32) >> 8
+        return Image.fromarray(array.astype(np.uint8)).convert("RGB")
+    return image.convert("RGB")
+
+
+def normalize_image(image: Image.Image, max_side: int = INFERENCE_MAX_SIDE) -> Image.Image:
+    """Upright, 8-bit sRGB image with its longest edge at most max_side."""
+    # JPEG only, and only before the pixels are loaded: decode at a reduced DCT scale
+    image.draft("RGB", (max_side, max_side))
+    image = ImageOps.exif_transpose(image)
+    image = _to_srgb(image)
+    if max(image.size) > max_side:
+        # reducing_gap box-reduces by an integer factor first, then a cheap bilinear pass
+        image.thumbnail((max_side, max_side), Image.Resampling.BILINEAR, reducing_gap=2.0)
+    return image
+
+
+def measure_quality(rgb: np.ndarray) -> ImageQuality:
+    """Brightness, contrast and estimated noise of an RGB uint8 array."""
+    gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+    mean, std = cv2.meanStdDev(gray)
+    height, width = gray.shape
+    if height < 3 or width < 3:
+        return ImageQuality(float(mean[0, 0]), float(std[0, 0]), 0.0)
+    response = cv2.filter2D(gray.astype(np.float32), -1, NOISE_KERNEL)[1:-1, 1:-1]
+    noise = float(np.sqrt(np.pi / 2.0) * np.abs(response).sum() / (6.0 * (width - 2) * (height - 2)))
+    return ImageQuality(float(mean[0, 0]), float(std[0, 0]), noise)
+
+
+def enhance(rgb: np.ndarray, quality: ImageQuality) -> np.ndarray:
+    """Denoise (if noisy) then equalize local contrast on the L channel; colours are kept."""
+    if quality.is_noisy:
+        # Before CLAHE, which would otherwise amplify the noise along with the detail. An
+        # edge-preserving bilateral pass costs ~10 ms here; non-local means is ~100x that
+        rgb = cv2.bilateralFilter(rgb, 5, min(75.0, quality.noise * 3.0), 5)
+    lab = cv2.cvtColor(rgb, cv2.COLOR_RGB2LAB)
+    clip = 3.0 if quality.is_dark else 2.0
+    lab[..., 0] = cv2.createCLAHE(clipLimit=clip, tileGridSize=(8, 8)).apply(lab[..., 0])
+    return cv2.cvtColor(lab, cv2.COLOR_LAB2RGB)
@@ -0,0 +1,116 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.achievements import AchievementEngine
+from src.species import default_catalog
+
+START = datetime(2025, 1, 6, 12, 0)
+
+
+class MemoryStore:
+    """The two DataStore calls the engine makes."""
+
+    def __init__(self):
+        self.progress = {}
+
+    def save_progress(self, user_id, snapshot):
+        self.progress[user_id] = snapshot
+
+    def iter_progress(self):
+        return iter(self.progress.items())
+
+
+@pytest.fixture
+def engine():
+    return AchievementEngine(MemoryStore(), default_catalog())
+
+
+def _sighting(user_id, at, species_id=1, lat=42.36):
+    return {
+        "sightingID": f"{user_id}-{at.isoformat()}-{species_id}",
+        "userID": user_id,
+        "speciesID": species_id,
+        "timestamp": at.isoformat(),
+        "coordinates": {"lat": lat, "lng": -71.09},
+    }
+
+
+def _progress(engine, user_id):
+    return {a["key"]: a for a in engine.achievements(user_id)}
+
+
+def test_counters_update_per_sighting(engine):
+    assert engine.record(_sighting("u1", START)) == ["first_catch"]
+    unlocked = engine.record(_sighting("u1", START.replace(hour=22), species_id=16))  # Bald Eagle, at night
+
+    assert set(unlocked) == {"first_flight", "night_explorer", "citizen_scientist"}
+    snapshot = engine.store.progress["u1"]
+    assert snapshot["sightings"] == 2
+    assert snapshot["species"] == [1, 16]
+    assert snapshot["nightSpecies"] == [16]
+    assert snapshot["rareFinds"] == 1
+    assert _progress(engine, "u1")["trailblazer"]["progress"] == pytest.approx(0.2)
+
+
+def test_unknown_species_count_as_uncatalogued(engine):
+    engine.record({"userID": "u1", "species": "Zorblax", "timestamp": START.isoformat()})
+    assert engine.store.progress["u1"]["uncatalogued"] == 1
+    assert _progress(engine, "u1")["evolutionary_mystery"]["unlocked"]
+
+
+def test_southern_hemisphere_flips_the_season(engine):
+    engine.record(_sighting("u1", START, lat=-33.9))  # January in Sydney
+    assert engine.store.progress["u1"]["seasons"] == ["summer"]
+
+
+def test_daily_streak_unlocks_on_a_roll(engine):
+    for day in range(6):
+        engine.record(_sighting("u1", START + timedelta(days=day)))
+    assert not _progress(engine, "u1")["on_a_roll"]["unlocked"]
+    assert engine.record(_sighting("u1", START + timedelta(days=6))) == ["on_a_roll"]
+
+
+def test_gap_resets_the_streak_but_keeps_the_best(engine):
+    for day in (0, 1, 2, 5):
+        engine.record(_sighting("u1", START + timedelta(days=day)))
+    snapshot = engine.store.progress["u1"]
+    assert snapshot["streak"] == 1
+    assert snapshot["bestStreak"] == 3
+
+
+def test_late_capture_does_not_rewrite_the_streak(engine):
+    engine.record(_sighting("u1", START + timedelta(days=3)))
+    engine.record(_sighting("u1", START))
+    snapshot = engine.store.progress["u1"]
+    assert snapshot["lastDay"] == (START + timedelta(days=3)).date().isoformat()
+    assert snapshot["streak"] == 1
+
+
+def test_rebuild_in_any_store_order_matches_live_recording(engine):
+    history = [_sighting("u1", START + timedelta(days=day, hours=day % 3), species_id=1 + day % 5) for day in range(8)]
+    history += [_sighting("u2", START + timedelta(days=day * 2)) for day in range(4)]
+    for sighting in history:
+        engine.record(sighting)
+    live = {user_id: dict(snapshot) for user_id, snapshot in engine.store.progress.items()}
+
+    shuffled = list(history)
+    random.Random(5).shuffle(shuffled)
+    rebuilt = AchievementEngine(MemoryStore(), default_catalog())
+    rebuilt.rebuild(shuffled)
+
+    for user_id, snapshot in live.items():
+        replayed = rebuilt.store.progress[user_id]
+        assert set(replayed.pop("unlocked")) == set(snapshot.pop("unlocked"))
+        assert replayed == snapshot
+    assert live["u1"]["bestStreak"] == 8
+    assert _progress(rebuilt, "u1")["on_a_roll"]["unlocked"]
+
+
+def test_load_restores_saved_progress(engine):
+    engine.record(_sighting("u1", START))
+    restored = AchievementEngine(engine.store, default_catalog())
+    restored.load()
+    assert len(restored) == 1
+    assert _progress(restored, "u1")["first_catch"]["unlocked"]
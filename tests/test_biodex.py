@@ -0,0 +1,91 @@
+from src.biodex import BiodexIndex, SpeciesBitset
+from src.species import default_catalog
+
+
+def test_from_ids_membership_and_count():
+    found = SpeciesBitset.from_ids([0, 3, 64, 3])
+    assert len(found) == 3
+    assert 0 in found and 3 in found and 64 in found
+    assert 1 not in found
+    assert -1 not in found
+
+
+def test_with_id_returns_a_new_set():
+    empty = SpeciesBitset()
+    found = empty.with_id(5)
+    assert 5 in found
+    assert len(empty) == 0
+    assert found.with_id(5).bits == found.bits
+
+
+def test_hex_round_trip():
+    found = SpeciesBitset.from_ids([1, 2, 200])
+    assert SpeciesBitset.from_hex(found.to_hex()).bits == found.bits
+    assert SpeciesBitset().to_hex() == "0"
+    assert SpeciesBitset.from_hex(None).bits == 0
+    assert SpeciesBitset.from_hex("").bits == 0
+
+
+def test_count_in_masks_by_biome():
+    found = SpeciesBitset.from_ids([1, 2, 3, 10])
+    forest = SpeciesBitset.from_ids([1, 2, 7])
+    assert found.count_in(forest) == 2
+    assert found.count_in(SpeciesBitset()) == 0
+
+
+class MemoryStore:
+    def __init__(self):
+        self.writes = []
+
+    def save_biodex(self, user_id, document):
+        self.writes.append((user_id, document))
+
+    def iter_biodex(self):
+        latest = {}
+        for user_id, document in self.writes:
+            latest[user_id] = document
+        return iter(latest.items())
+
+
+def _index():
+    return BiodexIndex(MemoryStore(), default_catalog())
+
+
+def test_record_writes_only_when_a_species_is_new():
+    index = _index()
+    assert index.record({"userID": "u1", "speciesID": 1})
+    assert not index.record({"userID": "u1", "speciesID": 1})
+    assert not index.record({"userID": "u1", "species": "Zorblax"})
+    assert len(index.store.writes) == 1
+
+    assert index.record({"userID": "u1", "species": "raccoon"})  # Matched through the catalog
+    assert index.document("u1")["found"] == 2
+    assert len(index.store.writes) == 2
+
+
+def test_document_counts_per_biome():
+    index = _index()
+    catalog = index.catalog
+    fox = catalog.get(1)
+    index.record({"userID": "u1", "speciesID": fox.id})
+    document = index.document("u1")
+
+    assert document["total"] == len(catalog)
+    assert document["biomes"][fox.biome]["found"] == 1
+    assert document["biomes"][fox.biome]["total"] == catalog.count_by_biome()[fox.biome]
+    assert index.document("nobody")["found"] == 0
+
+
+def test_rebuild_and_load_agree_with_recording():
+    history = [{"userID": "u1", "speciesID": n} for n in (1, 2, 2, 10)] + [{"userID": "u2", "speciesID": 16}]
+    recorded = _index()
+    for sighting in history:
+        recorded.record(sighting)
+    rebuilt = _index()
+    rebuilt.rebuild(history)
+    restored = BiodexIndex(rebuilt.store, rebuilt.catalog)
+    restored.load()
+
+    for user_id in ("u1", "u2"):
+        assert rebuilt.document(user_id)["bits"] == recorded.document(user_id)["bits"]
+        assert restored.document(user_id)["bits"] == recorded.document(user_id)["bits"]
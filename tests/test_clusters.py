@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from src.geo.clusters import ClusterIndex
+
+WORLD = (-180.0, -85.0, 180.0, 85.0)
+
+
+def _points(count, seed=3):
+    rng = random.Random(seed)
+    return [rng.uniform(-60, 60) for _ in range(count)], [rng.uniform(-170, 170) for _ in range(count)]
+
+
+def _total(clusters):
+    return sum(cluster["count"] for cluster in clusters)
+
+
+def test_every_zoom_accounts_for_every_point():
+    lats, lngs = _points(1000)
+    index = ClusterIndex(max_zoom=10)
+    index.load(lats, lngs)
+
+    assert len(index) == 1000
+    for zoom in range(0, 11):
+        assert _total(index.query(*WORLD, zoom)) == 1000
+
+
+def test_clusters_split_as_zoom_increases():
+    lats, lngs = _points(500)
+    index = ClusterIndex(max_zoom=12)
+    index.load(lats, lngs)
+
+    counts = [len(index.query(*WORLD, zoom)) for zoom in range(0, 13)]
+    assert counts == sorted(counts)
+    assert counts[0] < counts[-1]
+
+
+def test_incremental_add_matches_load():
+    lats, lngs = _points(300)
+    loaded = ClusterIndex(max_zoom=8)
+    loaded.load(lats, lngs)
+    added = ClusterIndex(max_zoom=8)
+    for lat, lng in zip(lats, lngs):
+        added.add(lat, lng)
+
+    for zoom in (0, 4, 8):
+        expected = sorted((c["count"], round(c["lat"], 6), round(c["lng"], 6)) for c in loaded.query(*WORLD, zoom))
+        actual = sorted((c["count"], round(c["lat"], 6), round(c["lng"], 6)) for c in added.query(*WORLD, zoom))
+        assert actual == expected
+
+
+def test_single_cluster_sits_at_the_centroid():
+    index = ClusterIndex(max_zoom=4)
+    index.load([10.0, 10.0], [20.0, 20.0])
+    (cluster,) = index.query(*WORLD, 0)
+    assert cluster["count"] == 2
+    assert cluster["lat"] == pytest.approx(10.0)
+    assert cluster["lng"] == pytest.approx(20.0)
+
+
+def test_bounding_box_only_returns_clusters_inside():
+    index = ClusterIndex(max_zoom=12)
+    index.load([42.36, 42.37, -33.86], [-71.09, -71.10, 151.21])
+
+    boston = index.query(-72.0, 42.0, -70.0, 43.0, 12)
+    assert _total(boston) == 2
+    assert all(-72.0 <= c["lng"] <= -70.0 for c in boston)
+
+
+def test_query_across_the_antimeridian():
+    index = ClusterIndex(max_zoom=6)
+    index.load([-17.7, -14.3, 0.0], [178.0, -170.7, 0.0])
+    assert _total(index.query(170.0, -30.0, -160.0, 0.0, 6)) == 2
+
+
+def test_zoom_is_clamped_to_the_indexed_levels():
+    index = ClusterIndex(min_zoom=2, max_zoom=5)
+    index.load([1.0, 2.0], [1.0, 2.0])
+    assert index.query(*WORLD, 0) == index.query(*WORLD, 2)
+    assert index.query(*WORLD, 20) == index.query(*WORLD, 5)
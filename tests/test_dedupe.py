@@ -0,0 +1,127 @@
+import random
+from datetime import datetime, timedelta
+
+from PIL import Image, ImageDraw
+
+from src.dedupe import BKTree, DuplicateIndex, hash_from_hex, hash_to_hex, perceptual_hash
+
+
+def _sighting(sighting_id, user_id, phash, at, lat=42.36, lng=-71.09, species="Red Fox"):
+    return {
+        "sightingID": sighting_id,
+        "userID": user_id,
+        "perceptualHash": hash_to_hex(phash),
+        "timestamp": at.isoformat(),
+        "coordinates": {"lat": lat, "lng": lng},
+        "species": species,
+    }
+
+
+def test_bktree_search_matches_brute_force():
+    rng = random.Random(7)
+    keys = [rng.getrandbits(64) for _ in range(500)]
+    # A few near-copies so small radii have something to find
+    keys += [key ^ (1 << rng.randrange(64)) for key in keys[:50]]
+    tree = BKTree()
+    for index, key in enumerate(keys):
+        tree.add(key, index)
+    assert len(tree) == len(keys)
+
+    for query in keys[:20] + [rng.getrandbits(64) for _ in range(20)]:
+        for radius in (0, 3, 10, 24):
+            expected = sorted(
+                ((query ^ key).bit_count(), index)
+                for index, key in enumerate(keys)
+                if (query ^ key).bit_count() <= radius
+            )
+            assert sorted(tree.search(query, radius)) == expected
+
+
+def test_bktree_keeps_every_item_with_the_same_hash():
+    tree = BKTree()
+    tree.add(0xABC, "first")
+    tree.add(0xABC, "second")
+    assert sorted(item for _, item in tree.search(0xABC, 0)) == ["first", "second"]
+    assert BKTree().search(0xABC, 64) == []
+
+
+def test_hash_hex_round_trip():
+    assert hash_from_hex(hash_to_hex(2**64 - 1)) == 2**64 - 1
+    assert hash_to_hex(1) == "0000000000000001"
+    assert hash_from_hex(None) is None
+    assert hash_from_hex("not hex") is None
+
+
+def test_perceptual_hash_survives_resizing_but_not_a_different_image():
+    image = Image.new("RGB", (640, 480), "white")
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((100, 80, 400, 380), fill="brown")
+    draw.rectangle((420, 300, 600, 460), fill="green")
+    other = image.transpose(Image.Transpose.FLIP_TOP_BOTTOM)
+
+    original = perceptual_hash(image)
+    assert (original ^ perceptual_hash(image.resize((320, 240)))).bit_count() <= 4
+    assert (original ^ perceptual_hash(other)).bit_count() > 8
+
+
+def test_same_user_repeat_is_found_anywhere():
+    now = datetime.now()
+    index = DuplicateIndex(max_distance=8)
+    index.add(_sighting("s1", "u1", 0xF0F0, now - timedelta(minutes=5)))
+
+    match = index.find(0xF0F1, "u1", lat=10.0, lng=10.0, captured=now)
+    assert match is not None
+    assert match.same_user
+    assert match.distance == 1
+    assert match.sighting.sightingID == "s1"
+
+
+def test_other_user_only_matches_nearby():
+    now = datetime.now()
+    index = DuplicateIndex(max_distance=8, cell_degrees=0.01)
+    index.add(_sighting("s1", "u1", 0xF0F0, now))
+
+    nearby = index.find(0xF0F0, "u2", lat=42.365, lng=-71.095, captured=now)
+    assert nearby is not None and not nearby.same_user
+    assert nearby.sighting.species == "Red Fox"
+    assert index.find(0xF0F0, "u2", lat=43.0, lng=-71.09, captured=now) is None
+    assert index.find(0xF0F0, "u2", captured=now) is None
+
+
+def test_matches_respect_distance_and_window():
+    now = datetime.now()
+    index = DuplicateIndex(max_distance=2, window=timedelta(minutes=30))
+    index.add(_sighting("s1", "u1", 0b1111, now))
+
+    assert index.find(0b1111 ^ 0b0111, "u1", captured=now) is None
+    assert index.find(0b1111, "u1", captured=now + timedelta(hours=1)) is None
+    assert index.find(0b1111, "u1", captured=now + timedelta(minutes=10)) is not None
+
+
+def test_sightings_without_a_hash_are_ignored():
+    index = DuplicateIndex()
+    index.add({"sightingID": "s1", "userID": "u1", "timestamp": datetime.now().isoformat()})
+    assert len(index) == 0
+
+
+def test_seed_passes_everything_through_but_indexes_only_recent():
+    now = datetime.now()
+    index = DuplicateIndex(window=timedelta(hours=1))
+    sightings = [
+        _sighting("old", "u1", 0x1, now - timedelta(days=2)),
+        _sighting("new", "u1", 0x2, now - timedelta(minutes=1)),
+    ]
+    assert [s["sightingID"] for s in index.seed(sightings)] == ["old", "new"]
+    assert len(index) == 1
+
+
+def test_prune_drops_expired_sightings():
+    now = datetime.now()
+    index = DuplicateIndex(window=timedelta(hours=1))
+    index.add(_sighting("old", "u1", 0x1, now - timedelta(hours=3)))
+    index.add(_sighting("new", "u2", 0x2, now))
+    index._prune((now - timedelta(hours=1)).timestamp())
+
+    assert len(index) == 1
+    assert index.find(0x1, "u1", captured=now - timedelta(hours=3)) is None
+    assert index.find(0x2, "u2", captured=now).sighting.sightingID == "new"
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+from src.leaderboard import Leaderboard, RankedBoard, _decode_cursor, _encode_cursor, period_start
+
+
+def _collect(board: Leaderboard, period: str, limit: int):
+    entries, cursor = board.page(period, limit)
+    pages = [entries]
+    while cursor:
+        entries, cursor = board.page(period, limit, cursor)
+        pages.append(entries)
+    return pages
+
+
+def test_ranked_board_orders_by_score_then_user_id():
+    board = RankedBoard.from_scores({"b": 10, "a": 10, "c": 30, "zero": 0})
+    assert len(board) == 3  # Zero scores are not on the board
+    assert board.slice(0, 10) == [(1, "c", 30), (2, "a", 10), (3, "b", 10)]
+    assert board.rank("b") == 3
+    assert board.rank("zero") is None
+
+
+def test_set_and_add_move_the_user():
+    board = RankedBoard.from_scores({"a": 5, "b": 10})
+    assert board.add("a", 10) == 15
+    assert board.rank("a") == 1
+    board.set("b", 20)
+    assert board.slice(0, 2) == [(1, "b", 20), (2, "a", 15)]
+    assert len(board) == 2
+
+
+def test_cursor_round_trip():
+    cursor = _encode_cursor(120, "user:with:colons")
+    assert _decode_cursor(cursor) == (-120, "user:with:colons")
+
+
+def test_pages_cover_the_board_once_in_order():
+    board = Leaderboard()
+    board.load({"userID": f"u{i}", "xp": (i * 7) % 13} for i in range(40))
+    pages = _collect(board, "all_time", 6)
+
+    flat = [entry for page in pages for entry in page]
+    expected = board._boards["all_time"].slice(0, 100)
+    assert [(e["rank"], e["userID"], e["xp"]) for e in flat] == expected
+    assert all(len(page) == 6 for page in pages[:-1])
+
+
+def test_last_page_has_no_cursor():
+    board = Leaderboard()
+    board.load([{"userID": "a", "xp": 3}, {"userID": "b", "xp": 2}])
+    entries, cursor = board.page("all_time", 2)
+    assert len(entries) == 2
+    assert cursor is None
+
+
+def test_cursor_is_stable_while_scores_change():
+    board = Leaderboard()
+    board.load([{"userID": name, "xp": xp} for name, xp in [("a", 50), ("b", 40), ("c", 30), ("d", 20), ("e", 10)]])
+    first, cursor = board.page("all_time", 2)
+    assert [e["userID"] for e in first] == ["a", "b"]
+
+    # A user below the cursor jumps above it; the next page neither repeats nor skips anyone below
+    board.award("d", 100)
+    second, _ = board.page("all_time", 2, cursor)
+    assert [e["userID"] for e in second] == ["c", "e"]
+
+
+def test_around_returns_the_window_at_the_users_rank():
+    board = Leaderboard()
+    board.load({"userID": f"u{i}", "xp": 100 - i} for i in range(10))
+    rank, entries = board.around("all_time", "u5", 2)
+    assert rank == 6
+    assert [e["userID"] for e in entries] == ["u3", "u4", "u5", "u6", "u7"]
+    assert board.around("all_time", "nobody", 2) == (None, [])
+
+
+def test_period_boards_reset_when_the_period_rolls_over():
+    now = [datetime(2025, 3, 5, 12, 0)]  # A Wednesday
+    board = Leaderboard(clock=lambda: now[0])
+    board.award("a", 10)
+    now[0] += timedelta(days=1)
+    board.award("b", 5)
+
+    assert [e["userID"] for e in board.page("daily", 10)[0]] == ["b"]
+    assert [e["userID"] for e in board.page("weekly", 10)[0]] == ["a", "b"]
+    assert period_start("weekly", now[0]) == datetime(2025, 3, 3)
@@ -0,0 +1,148 @@
+import threading
+
+import pytest
+
+from src.datastore import LATEST_COMMENTS, image_blob_path
+from src.datastore.local_store import LocalDataStore, _dumps
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalDataStore(tmp_path / "animago.db", tmp_path / "blobs")
+
+
+def _user(user_id, xp=0):
+    return {"userID": user_id, "email": f"{user_id}@example.com", "firstname": "A", "lastname": "B", "xp": xp}
+
+
+def _sighting(sighting_id, user_id="u1", created_at="2025-01-01T12:00:00"):
+    return {"sightingID": sighting_id, "userID": user_id, "species": "Red Fox", "createdAt": created_at,
+            "commentCount": 0, "latestComments": []}
+
+
+def _legacy_sighting(store, doc_id, sighting, comments=()):
+    """A sighting stored under an auto-generated key, as before rekeying, with comments inline."""
+    body = {**sighting, "comments": list(comments)}
+    store._connect().execute(
+        "INSERT INTO sightings (doc_id, sighting_id, user_id, created_at, body) VALUES (?, ?, ?, ?, ?)",
+        (doc_id, sighting["sightingID"], sighting["userID"], sighting["createdAt"], _dumps(body)),
+    )
+
+
+def test_users_round_trip(store):
+    store.add_user(_user("u1"))
+    assert store.get_user("u1")["email"] == "u1@example.com"
+    assert store.get_user_by_email("u1@example.com")["userID"] == "u1"
+    assert store.get_user("missing") is None
+
+    store.record_user_sighting("u1", "s1", xp=100)
+    store.record_user_sighting("u1", "s1", xp=100)
+    user = store.get_user("u1")
+    assert user["xp"] == 200
+    assert user["sightings"] == ["s1"]
+
+
+def test_sightings_round_trip_and_page_newest_first(store):
+    for n in range(5):
+        store.add_sighting(_sighting(f"s{n}", created_at=f"2025-01-0{n + 1}T12:00:00"))
+    store.add_sighting(_sighting("other", user_id="u2"))
+
+    assert store.get_sighting("s3")["species"] == "Red Fox"
+    assert [s["sightingID"] for s in store.get_sightings(["s4", "missing", "s0"])] == ["s4", "s0"]
+    store.update_sighting("s3", {"thumbURL": "thumb"})
+    assert store.get_sighting("s3")["thumbURL"] == "thumb"
+    with pytest.raises(KeyError):
+        store.update_sighting("missing", {"thumbURL": "thumb"})
+
+    first, cursor = store.list_user_sightings("u1", 2)
+    second, cursor = store.list_user_sightings("u1", 2, cursor)
+    third, cursor = store.list_user_sightings("u1", 2, cursor)
+    assert [s["sightingID"] for s in first + second + third] == ["s4", "s3", "s2", "s1", "s0"]
+    assert cursor is None
+    assert len(list(store.iter_sightings())) == 6
+
+
+def test_progress_biodex_and_blobs_round_trip(store):
+    store.save_progress("u1", {"sightings": 3})
+    store.save_biodex("u1", {"bits": "6"})
+    assert dict(store.iter_progress()) == {"u1": {"sightings": 3}}
+    assert dict(store.iter_biodex()) == {"u1": {"bits": "6"}}
+
+    digest, url = store.put_image(b"png bytes", "image/png")
+    assert store.put_image(b"png bytes", "image/png") == (digest, url)
+    assert store.blob_exists(image_blob_path(digest, "image/png"))
+    path, content_type = store.local_blob(digest)
+    assert path.read_bytes() == b"png bytes"
+    assert content_type == "image/png"
+
+
+def test_add_comment_counts_and_keeps_the_latest_few(store):
+    store.add_sighting(_sighting("s1"))
+    assert store.add_comment("missing", {"comment": "hi"}) is None
+
+    total = LATEST_COMMENTS + 2
+    for n in range(total):
+        stored, sighting = store.add_comment("s1", {"userID": "u2", "comment": f"c{n}"})
+        assert stored["commentID"]
+    assert sighting["commentCount"] == total
+    assert [c["comment"] for c in sighting["latestComments"]] == [f"c{n}" for n in range(2, total)]
+    assert store.get_sighting("s1")["commentCount"] == total
+
+    newest, cursor = store.list_comments("s1", 2)
+    assert [c["comment"] for c in newest] == [f"c{total - 1}", f"c{total - 2}"]
+    rest, cursor = store.list_comments("s1", total, cursor)
+    assert len(rest) == total - 2 and cursor is None
+
+
+def test_rekey_moves_sightings_comments_and_user_lists(store):
+    store.add_user({**_user("u1"), "sightings": ["auto-1", "auto-2"]})
+    _legacy_sighting(store, "auto-1", _sighting("s1"), comments=[{"userID": "u2", "comment": "old"}])
+    _legacy_sighting(store, "auto-2", _sighting("s2"))
+    store.add_sighting(_sighting("s3"))  # Already keyed by its sightingID
+
+    moved, checkpoint = store.rekey_sightings(batch_size=10)
+    assert (moved, checkpoint) == (2, None)
+
+    sighting = store.get_sighting("s1")
+    assert "comments" not in sighting
+    assert sighting["commentCount"] == 1
+    assert [c["comment"] for c in sighting["latestComments"]] == ["old"]
+    assert [c["comment"] for c in store.list_comments("s1", 10)[0]] == ["old"]
+    assert store.get_sighting("auto-1") is None
+    assert store.get_user("u1")["sightings"] == ["s1", "s2"]
+    assert store.rekey_sightings(batch_size=10) == (0, None)
+
+
+def test_rekey_resumes_from_its_checkpoint(store):
+    for n in range(5):
+        _legacy_sighting(store, f"auto-{n}", _sighting(f"s{n}"))
+    moved, checkpoint = store.rekey_sightings(batch_size=2)
+    total = moved
+    while checkpoint is not None:
+        moved, checkpoint = store.rekey_sightings(batch_size=2, after=checkpoint)
+        total += moved
+    assert total == 5
+    assert sorted(s["sightingID"] for s in store.iter_sightings()) == [f"s{n}" for n in range(5)]
+
+
+def test_add_sighting_keeps_the_first_writer(store):
+    assert store.add_sighting({"sightingID": "s1", "userID": "u1", "species": "Red Fox"}) == "s1"
+    assert store.add_sighting({"sightingID": "s1", "userID": "u1", "species": "Raccoon"}) is None
+    assert store.get_sighting("s1")["species"] == "Red Fox"
+
+
+def test_concurrent_inserts_of_one_id_create_it_once(store):
+    barrier = threading.Barrier(8)
+    results = []
+
+    def insert(n):
+        barrier.wait()
+        results.append(store.add_sighting({"sightingID": "s1", "userID": "u1", "attempt": n}))
+
+    threads = [threading.Thread(target=insert, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count("s1") == 1
+    assert results.count(None) == 7
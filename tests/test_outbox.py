@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from src.core import Location
+from src.services import outbox as outbox_module
+from src.services.api import APIError
+from src.services.outbox import CaptureOutbox, OutboxSync
+
+NOW = 1_700_000_000.0
+
+
+@pytest.fixture
+def outbox(tmp_path, monkeypatch):
+    monkeypatch.setattr(outbox_module.time, "time", lambda: NOW)
+    # Upper end of the jitter range, so each delay is the full backoff
+    monkeypatch.setattr(outbox_module.random, "uniform", lambda low, high: high)
+    return CaptureOutbox(tmp_path / "outbox.db", base_delay=5.0, max_delay=60.0)
+
+
+def _next_attempt(outbox, sighting_id):
+    return outbox._connect().execute(
+        "SELECT next_attempt_at FROM outbox WHERE sighting_id = ?", (sighting_id,)
+    ).fetchone()[0]
+
+
+def test_new_capture_is_due_at_once(outbox):
+    sighting_id = outbox.enqueue(b"jpeg", Location(42.36, -71.09), "token")
+    (capture,) = outbox.due(10)
+    assert capture.sighting_id == sighting_id
+    assert capture.image == b"jpeg"
+    assert capture.attempts == 0
+    assert outbox.next_due_in() == 0.0
+
+
+def test_backoff_doubles_up_to_the_cap(outbox):
+    sighting_id = outbox.enqueue(b"jpeg", Location(42.36, -71.09), "token")
+    delays = []
+    for _ in range(6):
+        outbox.mark_failed(sighting_id, "offline")
+        delays.append(_next_attempt(outbox, sighting_id) - NOW)
+    assert delays == [5.0, 10.0, 20.0, 40.0, 60.0, 60.0]
+    assert outbox.due(10) == []
+    assert outbox.next_due_in() == 60.0
+
+
+def test_jitter_stays_within_half_to_full_delay(tmp_path, monkeypatch):
+    monkeypatch.setattr(outbox_module.time, "time", lambda: NOW)
+    outbox = CaptureOutbox(tmp_path / "outbox.db", base_delay=8.0, max_delay=60.0)
+    for _ in range(20):
+        sighting_id = outbox.enqueue(b"jpeg", Location(0.0, 0.0), "token")
+        outbox.mark_failed(sighting_id, "offline")
+        assert 4.0 <= _next_attempt(outbox, sighting_id) - NOW <= 8.0
+
+
+def test_permanent_failure_is_parked(outbox):
+    sighting_id = outbox.enqueue(b"jpeg", Location(42.36, -71.09), "token")
+    outbox.mark_failed(sighting_id, "HTTP 422", permanent=True)
+    assert _next_attempt(outbox, sighting_id) == float("inf")
+    assert outbox.due(10) == []
+    assert outbox.pending_count() == 1
+
+
+def test_mark_sent_removes_the_capture(outbox):
+    sighting_id = outbox.enqueue(b"jpeg", Location(42.36, -71.09), "token")
+    outbox.mark_sent(sighting_id)
+    assert outbox.pending_count() == 0
+    assert outbox.next_due_in() is None
+    outbox.mark_failed(sighting_id, "late failure")  # Unknown IDs are ignored
+    assert outbox.pending_count() == 0
+
+
+def test_defer_all_pushes_due_captures_back(outbox):
+    outbox.enqueue(b"jpeg", Location(42.36, -71.09), "token")
+    outbox.defer_all(30.0)
+    assert outbox.due(10) == []
+    assert outbox.next_due_in() == 30.0
+
+
+def test_parked_captures_can_be_listed_retried_and_discarded(outbox):
+    first = outbox.enqueue(b"one", Location(42.36, -71.09), "token")
+    second = outbox.enqueue(b"two", Location(42.36, -71.09), "token")
+    outbox.mark_failed(first, "HTTP 415", permanent=True)
+    outbox.mark_failed(second, "HTTP 422", permanent=True)
+    assert {capture.error for capture in outbox.parked()} == {"HTTP 415", "HTTP 422"}
+
+    outbox.retry(first)
+    assert [capture.sighting_id for capture in outbox.due(10)] == [first]
+    assert [capture.sighting_id for capture in outbox.parked()] == [second]
+
+    outbox.discard(second)
+    assert outbox.parked() == []
+    assert outbox.pending_count() == 1
+
+
+def test_sync_reports_permanent_rejections(outbox):
+    class RejectingAPI:
+        async def process_image(self, image, location, token, sighting_id=None):
+            raise APIError(422, "No animal detected in the image")
+
+    parked = []
+    sync = OutboxSync(outbox, RejectingAPI(), on_parked=lambda sighting_id, error: parked.append((sighting_id, error)))
+    sighting_id = outbox.enqueue(b"jpeg", Location(42.36, -71.09), "token")
+
+    assert asyncio.run(sync.sync_once()) == 0
+    assert parked == [(sighting_id, "No animal detected in the image")]
+    assert [capture.sighting_id for capture in outbox.parked()] == [sighting_id]
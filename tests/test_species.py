@@ -0,0 +1,57 @@
+import pytest
+
+from src.species import HEAD_MATCH_SCORE, default_catalog, noun_phrases
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return default_catalog()
+
+
+@pytest.mark.parametrize(
+    "text, name",
+    [
+        ("Red Fox", "Red Fox"),
+        ("fox", "Red Fox"),
+        ("Trash panda", "Raccoon"),
+        ("a deer, in the woods", "White-tailed Deer"),
+    ],
+)
+def test_exact_names_and_synonyms(catalog, text, name):
+    match = catalog.match(text)
+    assert match.species.name == name
+    assert match.score == 1.0
+
+
+def test_name_at_the_end_of_a_phrase(catalog):
+    match = catalog.match("a cute red fox")
+    assert match.species.name == "Red Fox"
+    assert match.score == HEAD_MATCH_SCORE
+
+
+@pytest.mark.parametrize("text, name", [("raccon", "Raccoon"), ("bald eagel", "Bald Eagle")])
+def test_misspellings_match_below_exact(catalog, text, name):
+    match = catalog.match(text)
+    assert match.species.name == name
+    assert match.score < 1.0
+
+
+@pytest.mark.parametrize("text", ["Arctic fox", "barn owl", "fox squirrel"])
+def test_other_animals_sharing_a_word_do_not_match(catalog, text):
+    # A catalog name inside a different species' name is not that species
+    assert catalog.match(text) is None
+
+
+@pytest.mark.parametrize("text", [None, "", "   ", "a blurry photo"])
+def test_nothing_to_match(catalog, text):
+    assert catalog.match(text) is None
+
+
+def test_repeated_lookups_are_cached(catalog):
+    first = catalog.match("bald eagel")
+    assert catalog.match("bald eagel") == first
+    assert any(key[0] == "bald eagel" for key in catalog._cache)
+
+
+def test_noun_phrases_split_on_punctuation_and_stopwords():
+    assert noun_phrases("It looks like a red fox, in the snow") == ("red fox", "snow")
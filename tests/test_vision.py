@@ -0,0 +1,117 @@
+from typing import Any, List
+
+from PIL import Image
+
+from src.vision import VisionSystem
+from src.vision.backends import VisionBackend
+from src.vision.detector import AnimalDetector, Detection, Scan
+
+
+class RecordingBackend(VisionBackend):
+    """Answers every question with the size of the image it was shown."""
+
+    name = "recording"
+
+    def __init__(self):
+        self.images: List[Image.Image] = []
+
+    def encode_image(self, image: Image.Image) -> Any:
+        self.images.append(image)
+        return image.size
+
+    def query(self, encoded: Any, question: str) -> str:
+        return f"Species: {encoded[0]}x{encoded[1]}"
+
+
+class FixedDetector:
+    def __init__(self, scan):
+        self.scan = scan
+
+    def detect(self, frame):
+        return self.scan
+
+
+class FakeBoxes:
+    def __init__(self, rows):
+        self.xyxy = FakeColumn([row[:4] for row in rows])
+        self.conf = FakeColumn([row[4] for row in rows])
+        self.cls = FakeColumn([row[5] for row in rows])
+        self._rows = rows
+
+    def __len__(self):
+        return len(self._rows)
+
+
+class FakeColumn(list):
+    def tolist(self):
+        return list(self)
+
+
+class FakeYolo:
+    """Stands in for a loaded ultralytics model returning fixed boxes."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def predict(self, image, **kwargs):
+        return [type("Result", (), {"boxes": FakeBoxes(self.rows)})()]
+
+
+def _system(scan):
+    system = VisionSystem(backend=RecordingBackend())
+    system._yolo = FixedDetector(scan)
+    return system
+
+
+def _frame():
+    return Image.new("RGB", (400, 300), "green")
+
+
+def test_non_coco_species_reaches_the_vision_model():
+    # A fox, deer or squirrel: YOLO sees objects but none of its animal classes
+    system = _system(Scan(animals=[], empty=False))
+    identifications = system.identify(_frame(), ["What species?"])
+
+    assert len(identifications) == 1
+    assert identifications[0].detection is None
+    assert system.backend.images[0].size == (400, 300)
+
+
+def test_empty_frame_skips_the_vision_model():
+    system = _system(Scan(animals=[], empty=True))
+    assert system.identify(_frame(), ["What species?"]) == []
+    assert system.backend.images == []
+
+
+def test_coco_animals_are_cropped():
+    bird = Detection("bird", 0.9, (10, 10, 110, 60))
+    system = _system(Scan(animals=[bird], empty=False))
+    (identification,) = system.identify(_frame(), ["What species?"])
+
+    assert identification.detection == bird
+    assert system.backend.images[0].size[0] < 400
+
+
+def test_missing_detector_sends_the_full_frame():
+    system = _system(None)
+    (identification,) = system.identify(_frame(), ["What species?"])
+    assert identification.detection is None
+
+
+def test_detector_keeps_confident_animals_and_reports_other_objects():
+    detector = AnimalDetector(model_path=None, image_size=320, min_confidence=0.25, empty_confidence=0.05)
+    detector._model = FakeYolo([
+        (0, 0, 100, 100, 0.8, 16),  # dog
+        (0, 0, 50, 50, 0.1, 15),  # cat, too unsure to crop
+        (0, 0, 80, 80, 0.6, 77),  # teddy bear: an object, not a COCO animal
+    ])
+    scan = detector.detect(_frame())
+    assert [detection.label for detection in scan.animals] == ["dog"]
+    assert not scan.empty
+
+    detector._model = FakeYolo([(0, 0, 80, 80, 0.3, 58)])  # potted plant only
+    scan = detector.detect(_frame())
+    assert scan.animals == [] and not scan.empty
+
+    detector._model = FakeYolo([])
+    assert detector.detect(_frame()).empty